@@ -2,31 +2,157 @@
 Instrument `rq` to trace rq scheduled jobs.
 """
 
-from typing import Collection
+import sys
+from types import ModuleType
+from typing import Any, Callable, Collection, Dict, List, Set
 
-import rq.queue
 from opentelemetry import trace
 from opentelemetry.instrumentation.instrumentor import BaseInstrumentor
 from opentelemetry.instrumentation.utils import unwrap
 from opentelemetry.semconv._incubating.attributes.messaging_attributes import (
     MessagingOperationTypeValues,
 )
-from wrapt import wrap_function_wrapper
+from wrapt import register_post_import_hook, wrap_function_wrapper
 
 from opentelemetry_instrumentation_rq import utils
+from opentelemetry_instrumentation_rq.control import (
+    DEFAULT_CONTROL_KEY,
+    InstrumentationControl,
+    get_control,
+    set_control,
+)
 from opentelemetry_instrumentation_rq.instrumentor import TraceInstrumentWrapper
 
 
 class RQInstrumentor(BaseInstrumentor):
-    """An instrumentor of rq"""
+    """An instrumentor of rq
+
+    rq modules are not imported by the instrumentor. Each of them is wrapped
+    once the application imports it. Since `rq/__init__.py` imports
+    `rq.queue`, `rq.job` and `rq.worker`, they are all wrapped as soon as
+    any rq module is imported, producers included; only modules rq imports
+    lazily, such as `rq.worker_pool` and `rq.results`, are wrapped on use.
+    """
+
+    _kwargs: Dict[str, Any] = {}
+    _is_instrumenting: bool = False
+    _pending_modules: Set[str] = set()
+    _wrapped_methods: Dict[str, List[str]] = {}
 
     def instrumentation_dependencies(self) -> Collection[str]:
         return ("rq >= 1.15",)
 
     def _instrument(self, **kwargs):
+        """Instrument rq
+
+        Keyword Args:
+            allocation_sample_every (int): Trace memory allocations of one in N
+                `Job.perform` calls with `tracemalloc`, disabled by default
+            asyncio_loop_monitor_interval (float): Wake-up interval (seconds) of
+                the loop monitor running beside coroutine jobs, disabled by default
+            asyncio_stall_threshold (float): Loop lag (seconds) counted as a
+                stall by the loop monitor, 0.1 by default
+            autoscaling_window (float): Window (seconds) of the per-queue load
+                gauges for autoscalers, disabled by default
+            control_key (str): Redis hash of the instrumentation level per
+                queue, `rq:instrumentation:control` by default
+            control_refresh_interval (float): Time (seconds) the levels of
+                `control_key` are cached for, disabled by default
+            group_publish_spans (bool): Trace a `publish` span for every job of
+                `Group.enqueue_many`, enabled by default
+            heartbeat_late_threshold (float): Lateness (seconds) of a worker
+                heartbeat adding a `rq.worker.heartbeat.late` event to the
+                `consume` span, disabled by default
+            queue_wait_span (bool): Emit a `queue_wait` span beside the `consume`
+                span, from the enqueueing of the job until a worker starts it,
+                disabled by default
+            serializer_timing (bool): Measure time and bytes of the job
+                serializer on `publish`, `schedule` and `consume` spans, disabled
+                by default
+            slo_budgets (Dict[str, float]): Budget (seconds) from the enqueue of
+                a job per SLO class given by `deadline.job_deadline`, empty by
+                default
+        """
+        self._kwargs = kwargs
+        self._is_instrumenting = True
+
+        control_refresh_interval = kwargs.get("control_refresh_interval")
+        if control_refresh_interval is not None:
+            set_control(
+                InstrumentationControl(
+                    key=kwargs.get("control_key", DEFAULT_CONTROL_KEY),
+                    refresh_interval=control_refresh_interval,
+                )
+            )
+
+        module_instrumentors: Dict[str, Callable[[ModuleType], None]] = {
+            "rq.queue": self._instrument_queue,
+            "rq.job": self._instrument_job,
+            "rq.worker": self._instrument_worker,
+            "rq.worker_pool": self._instrument_worker_pool,
+            "rq.results": self._instrument_results,
+            "rq.group": self._instrument_group,
+        }
+        for module_name, instrument_module in module_instrumentors.items():
+            # Hooks of modules not imported yet are still registered from a
+            # previous `instrument` call
+            if module_name in self._pending_modules:
+                continue
+
+            self._pending_modules.add(module_name)
+            register_post_import_hook(
+                self._get_post_import_hook(module_name, instrument_module),
+                module_name,
+            )
+
+    def _get_post_import_hook(
+        self, module_name: str, instrument_module: Callable[[ModuleType], None]
+    ) -> Callable[[ModuleType], None]:
+        """Wrap a rq module once it is imported, if still instrumenting"""
+
+        def post_import_hook(module: ModuleType):
+            self._pending_modules.discard(module_name)
+            if self._is_instrumenting and module_name not in self._wrapped_methods:
+                instrument_module(module)
+
+        return post_import_hook
+
+    def _wrap(self, module: ModuleType, name: str, wrapper: Callable):
+        """Wrap `Class.method` in module and remember it for uninstrumentation"""
+        wrap_function_wrapper(module, name, wrapper)
+        self._wrapped_methods.setdefault(module.__name__, []).append(name)
+
+    def _instrument_queue(self, module: ModuleType):
+        from opentelemetry_instrumentation_rq.deadline import DeadlineAttachHook
+        from opentelemetry_instrumentation_rq.dependents import (
+            DependentsReleaseInstrumentation,
+            ReleaseLinkHook,
+        )
+        from opentelemetry_instrumentation_rq.payload import PayloadSizeHook
+
+        deadline_hook = DeadlineAttachHook(
+            slo_budgets=self._kwargs.get("slo_budgets", {})
+        )
+        producer_hooks = [PayloadSizeHook(), deadline_hook]
+        if self._kwargs.get("serializer_timing"):
+            from opentelemetry_instrumentation_rq.serialization import SerializationHook
+
+            producer_hooks.append(SerializationHook())
+        publish_hooks = [*producer_hooks, ReleaseLinkHook()]
+        autoscaling_window = self._kwargs.get("autoscaling_window")
+        if autoscaling_window:
+            from opentelemetry_instrumentation_rq.queue_load import (
+                ArrivalHook,
+                QueueLoadMetrics,
+            )
+
+            # Observed by producers and workers, which both import `rq.queue`
+            QueueLoadMetrics(window=autoscaling_window)
+            publish_hooks.append(ArrivalHook())
+
         # Instrumentation for task producer
-        wrap_function_wrapper(
-            "rq.queue",
+        self._wrap(
+            module,
             "Queue._enqueue_job",
             TraceInstrumentWrapper(
                 span_kind=trace.SpanKind.PRODUCER,
@@ -38,11 +164,12 @@ class RQInstrumentor(BaseInstrumentor):
                 argument_info_list=[
                     utils.get_argument_info(utils.RQElementName.JOB, 0)
                 ],
+                hooks=publish_hooks,
             ),
         )
 
-        wrap_function_wrapper(
-            "rq.queue",
+        self._wrap(
+            module,
             "Queue.schedule_job",
             TraceInstrumentWrapper(
                 span_kind=trace.SpanKind.PRODUCER,
@@ -54,11 +181,12 @@ class RQInstrumentor(BaseInstrumentor):
                 argument_info_list=[
                     utils.get_argument_info(utils.RQElementName.JOB, 0)
                 ],
+                hooks=producer_hooks,
             ),
         )
 
-        wrap_function_wrapper(
-            "rq.queue",
+        self._wrap(
+            module,
             "Queue.setup_dependencies",
             TraceInstrumentWrapper(
                 span_kind=trace.SpanKind.PRODUCER,
@@ -70,29 +198,38 @@ class RQInstrumentor(BaseInstrumentor):
                 argument_info_list=[
                     utils.get_argument_info(utils.RQElementName.JOB, 0)
                 ],
+                hooks=[deadline_hook],
             ),
         )
 
-        # Instrumentation for task consumer
-        wrap_function_wrapper(
-            "rq.worker",
-            "Worker.perform_job",
-            TraceInstrumentWrapper(
-                span_kind=trace.SpanKind.CONSUMER,
-                operation_type=MessagingOperationTypeValues.PROCESS.value,
-                operation_name="consume",
-                should_propagate=True,
-                should_flush=True,
-                instance_info=utils.get_instance_info(utils.RQElementName.WORKER),
-                argument_info_list=[
-                    utils.get_argument_info(utils.RQElementName.JOB, 0),
-                    utils.get_argument_info(utils.RQElementName.QUEUE, 1),
-                ],
-            ),
+        # Release of dependents, see also `_instrument_job`
+        dependents_release = DependentsReleaseInstrumentation()
+        self._wrap(
+            module, "Queue.enqueue_dependents", dependents_release.enqueue_dependents
+        )
+        self._wrap(module, "Queue._enqueue_job", dependents_release.enqueue_job)
+
+    def _instrument_job(self, module: ModuleType):
+        # `rq.job` imports asyncio already, unlike this package
+        from opentelemetry_instrumentation_rq.coroutine import CoroutineJobWrapper
+        from opentelemetry_instrumentation_rq.dependents import (
+            DependentsReleaseInstrumentation,
+        )
+        from opentelemetry_instrumentation_rq.payload import capture_payload_sizes
+        from opentelemetry_instrumentation_rq.results import (
+            ResultPersistenceInstrumentation,
         )
+        from opentelemetry_instrumentation_rq.retry import RetryCounter
+
+        perform_hooks = []
+        allocation_sample_every = self._kwargs.get("allocation_sample_every", 0)
+        if allocation_sample_every:
+            from opentelemetry_instrumentation_rq.allocation import AllocationTracer
 
-        wrap_function_wrapper(
-            "rq.job",
+            perform_hooks.append(AllocationTracer(allocation_sample_every))
+
+        self._wrap(
+            module,
             "Job.perform",
             TraceInstrumentWrapper(
                 span_kind=trace.SpanKind.CLIENT,
@@ -102,11 +239,47 @@ class RQInstrumentor(BaseInstrumentor):
                 should_flush=False,
                 instance_info=utils.get_instance_info(utils.RQElementName.JOB),
                 argument_info_list=[],
+                hooks=perform_hooks,
+            ),
+        )
+        self._wrap(
+            module,
+            "Job._execute",
+            CoroutineJobWrapper(
+                loop_monitor_interval=self._kwargs.get(
+                    "asyncio_loop_monitor_interval", 0
+                ),
+                stall_threshold=self._kwargs.get("asyncio_stall_threshold", 0.1),
             ),
         )
 
-        wrap_function_wrapper(
-            "rq.job",
+        # Instrumentation for result persistence, see also `_instrument_worker`
+        # and `_instrument_results`
+        result_persistence = ResultPersistenceInstrumentation()
+        self._wrap(module, "Job._handle_success", result_persistence.handle_success)
+        self._wrap(module, "Job.to_dict", result_persistence.to_dict)
+
+        # Dependents checked while releasing them, see also `_instrument_queue`
+        dependents_release = DependentsReleaseInstrumentation()
+        self._wrap(
+            module, "Job.dependencies_are_met", dependents_release.dependencies_are_met
+        )
+
+        # Retries of failed jobs, attempts are traced by `RetryHook`
+        self._wrap(module, "Job.retry", RetryCounter())
+
+        # Payload sizes of enqueued jobs, set on spans by `PayloadSizeHook`
+        self._wrap(module, "Job.to_dict", capture_payload_sizes)
+
+        if self._kwargs.get("serializer_timing"):
+            from opentelemetry_instrumentation_rq.serialization import (
+                time_deserialize_data,
+            )
+
+            self._wrap(module, "Job._deserialize_data", time_deserialize_data)
+
+        self._wrap(
+            module,
             "Job.execute_success_callback",
             TraceInstrumentWrapper(
                 span_kind=trace.SpanKind.CLIENT,
@@ -118,8 +291,8 @@ class RQInstrumentor(BaseInstrumentor):
                 argument_info_list=[],
             ),
         )
-        wrap_function_wrapper(
-            "rq.job",
+        self._wrap(
+            module,
             "Job.execute_failure_callback",
             TraceInstrumentWrapper(
                 span_kind=trace.SpanKind.CLIENT,
@@ -131,8 +304,8 @@ class RQInstrumentor(BaseInstrumentor):
                 argument_info_list=[],
             ),
         )
-        wrap_function_wrapper(
-            "rq.job",
+        self._wrap(
+            module,
             "Job.execute_stopped_callback",
             TraceInstrumentWrapper(
                 span_kind=trace.SpanKind.CLIENT,
@@ -145,9 +318,74 @@ class RQInstrumentor(BaseInstrumentor):
             ),
         )
 
+    def _instrument_worker(self, module: ModuleType):
+        from opentelemetry_instrumentation_rq import horse_metrics
+        from opentelemetry_instrumentation_rq.deadline import DeadlineHook
+        from opentelemetry_instrumentation_rq.duration import ProcessDurationHook
+        from opentelemetry_instrumentation_rq.fork import ForkMonitor, ForkTimingHook
+        from opentelemetry_instrumentation_rq.group import GroupCompletionHook
+        from opentelemetry_instrumentation_rq.heartbeat import HeartbeatMonitor
+        from opentelemetry_instrumentation_rq.horse import HorseMonitor
+        from opentelemetry_instrumentation_rq.process_metrics import ProcessMetrics
+        from opentelemetry_instrumentation_rq.queue_wait import (
+            QueueWaitHook,
+            record_dequeue_time,
+        )
+        from opentelemetry_instrumentation_rq.results import (
+            ResultPersistenceInstrumentation,
+        )
+        from opentelemetry_instrumentation_rq.retry import RetryHook
+
+        consumer_hooks = [
+            ForkTimingHook(),
+            ProcessDurationHook(),
+            RetryHook(),
+            QueueWaitHook(emit_span=self._kwargs.get("queue_wait_span", False)),
+            DeadlineHook(),
+        ]
+        if self._kwargs.get("serializer_timing"):
+            from opentelemetry_instrumentation_rq.serialization import (
+                DeserializationHook,
+            )
+
+            consumer_hooks.append(DeserializationHook())
+        heartbeat_late_threshold = self._kwargs.get("heartbeat_late_threshold")
+        if heartbeat_late_threshold is not None:
+            from opentelemetry_instrumentation_rq.heartbeat import LateHeartbeatHook
+
+            consumer_hooks.append(LateHeartbeatHook())
+
+        # Instrumentation for task consumer
+        self._wrap(
+            module,
+            "Worker.perform_job",
+            TraceInstrumentWrapper(
+                span_kind=trace.SpanKind.CONSUMER,
+                operation_type=MessagingOperationTypeValues.PROCESS.value,
+                operation_name="consume",
+                should_propagate=True,
+                should_flush=True,
+                instance_info=utils.get_instance_info(utils.RQElementName.WORKER),
+                argument_info_list=[
+                    utils.get_argument_info(utils.RQElementName.JOB, 0),
+                    utils.get_argument_info(utils.RQElementName.QUEUE, 1),
+                ],
+                hooks=consumer_hooks,
+            ),
+        )
+
+        self._wrap(module, "Worker.dequeue_job_and_maintain_ttl", record_dequeue_time)
+
+        # Result persistence, within the `handle_job_success` span
+        result_persistence = ResultPersistenceInstrumentation()
+        self._wrap(
+            module, "Worker.handle_job_success", result_persistence.handle_job_success
+        )
+
         # Instrumentation for task status handler
-        wrap_function_wrapper(
-            "rq.worker",
+        group_completion_hook = GroupCompletionHook()
+        self._wrap(
+            module,
             "Worker.handle_job_success",
             TraceInstrumentWrapper(
                 span_kind=trace.SpanKind.CLIENT,
@@ -160,10 +398,11 @@ class RQInstrumentor(BaseInstrumentor):
                     utils.get_argument_info(utils.RQElementName.JOB),
                     utils.get_argument_info(utils.RQElementName.QUEUE),
                 ],
+                hooks=[group_completion_hook],
             ),
         )
-        wrap_function_wrapper(
-            "rq.worker",
+        self._wrap(
+            module,
             "Worker.handle_job_failure",
             TraceInstrumentWrapper(
                 span_kind=trace.SpanKind.CLIENT,
@@ -176,19 +415,107 @@ class RQInstrumentor(BaseInstrumentor):
                     utils.get_argument_info(utils.RQElementName.JOB),
                     utils.get_argument_info(utils.RQElementName.QUEUE),
                 ],
+                hooks=[group_completion_hook],
             ),
         )
 
-    def _uninstrument(self, **kwargs):
-        unwrap(rq.worker.Worker, "handle_job_success")
-        unwrap(rq.worker.Worker, "handle_job_failure")
+        if self._kwargs.get("autoscaling_window"):
+            from opentelemetry_instrumentation_rq.queue_load import (
+                register_queues,
+                track_execution,
+            )
+
+            self._wrap(module, "Worker.register_birth", register_queues)
+            # Overridden by `SimpleWorker`, which performs jobs without forking
+            self._wrap(module, "Worker.execute_job", track_execution)
+            self._wrap(module, "SimpleWorker.execute_job", track_execution)
+
+        instrumentation_control = get_control()
+        if instrumentation_control is not None:
+            # Work-horses inherit the levels read by the worker
+            self._wrap(
+                module,
+                "Worker.fork_work_horse",
+                instrumentation_control.fork_work_horse,
+            )
+
+        # Cost of `os.fork`, the time-to-perform of horses is on `consume` spans
+        self._wrap(module, "Worker.fork_work_horse", ForkMonitor())
+
+        # Measurements of work-horses, recorded by the worker once they exit
+        self._wrap(module, "Worker.fork_work_horse", horse_metrics.fork_work_horse)
+        self._wrap(
+            module, "Worker.monitor_work_horse", horse_metrics.monitor_work_horse
+        )
 
-        unwrap(rq.job.Job, "execute_success_callback")
-        unwrap(rq.job.Job, "execute_failure_callback")
-        unwrap(rq.job.Job, "execute_stopped_callback")
+        # Heartbeats of the worker, late ones are reported by `LateHeartbeatHook`
+        heartbeat_monitor = HeartbeatMonitor(late_threshold=heartbeat_late_threshold)
+        self._wrap(module, "Worker.heartbeat", heartbeat_monitor.heartbeat)
+        self._wrap(
+            module, "Worker.maintain_heartbeats", heartbeat_monitor.maintain_heartbeats
+        )
+        if heartbeat_late_threshold is not None:
+            self._wrap(
+                module, "Worker.fork_work_horse", heartbeat_monitor.fork_work_horse
+            )
+
+        # Resource usage of worker processes and work-horses, read from `/proc`
+        process_metrics = ProcessMetrics()
+        self._wrap(module, "Worker.register_birth", process_metrics.register_birth)
+        self._wrap(module, "Worker.register_death", process_metrics.register_death)
+
+        # Instrumentation for work-horses dying without ending their spans
+        horse_monitor = HorseMonitor()
+        self._wrap(module, "Worker.fork_work_horse", horse_monitor.fork_work_horse)
+        self._wrap(
+            module, "Worker.monitor_work_horse", horse_monitor.monitor_work_horse
+        )
+        self._wrap(
+            module,
+            "Worker.handle_work_horse_killed",
+            horse_monitor.handle_work_horse_killed,
+        )
 
-        unwrap(rq.worker.Worker, "perform_job")
-        unwrap(rq.job.Job, "perform")
+    def _instrument_worker_pool(self, module: ModuleType):
+        from opentelemetry_instrumentation_rq.worker_pool import (
+            WorkerPoolInstrumentation,
+        )
+
+        # Instrumentation for worker lifecycle in pool manager
+        instrumentation = WorkerPoolInstrumentation()
+        self._wrap(module, "WorkerPool.start_worker", instrumentation.start_worker)
+        self._wrap(
+            module, "WorkerPool.handle_dead_worker", instrumentation.handle_dead_worker
+        )
+        self._wrap(module, "WorkerPool.check_workers", instrumentation.check_workers)
+
+    def _instrument_results(self, module: ModuleType):
+        from opentelemetry_instrumentation_rq.results import (
+            ResultPersistenceInstrumentation,
+        )
+
+        result_persistence = ResultPersistenceInstrumentation()
+        self._wrap(module, "Result.serialize", result_persistence.serialize)
+
+    def _instrument_group(self, module: ModuleType):
+        from opentelemetry_instrumentation_rq.group import GroupInstrumentation
+
+        # Instrumentation for batches of jobs of a group, rq >= 2.0
+        self._wrap(
+            module,
+            "Group.enqueue_many",
+            GroupInstrumentation(
+                publish_spans=self._kwargs.get("group_publish_spans", True)
+            ),
+        )
+
+    def _uninstrument(self, **kwargs):
+        self._is_instrumenting = False
+        set_control(None)
 
-        unwrap(rq.queue.Queue, "schedule_job")
-        unwrap(rq.queue.Queue, "_enqueue_job")
+        for module_name, names in self._wrapped_methods.items():
+            module = sys.modules[module_name]
+            for name in names:
+                class_name, method_name = name.split(".")
+                unwrap(getattr(module, class_name), method_name)
+        self._wrapped_methods.clear()
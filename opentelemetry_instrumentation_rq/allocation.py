@@ -0,0 +1,118 @@
+"""Allocation snapshots for sampled jobs, based on `tracemalloc`"""
+
+import tracemalloc
+import zlib
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
+
+from opentelemetry import trace
+
+from opentelemetry_instrumentation_rq import (
+    horse_metrics,
+    rq_attributes,
+    rq_metrics,
+    utils,
+)
+from opentelemetry_instrumentation_rq.instrumentor import SpanHook
+
+if TYPE_CHECKING:
+    from rq.job import Job
+    from rq.queue import Queue
+    from rq.worker import Worker
+
+_SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(inclusive=False, filename_pattern=tracemalloc.__file__),
+    tracemalloc.Filter(inclusive=False, filename_pattern=__file__),
+]
+
+
+def should_sample(job_id: str, sample_every: int) -> bool:
+    """Decide whether a job is sampled, one in `sample_every` jobs
+
+    The decision is derived from the job id instead of a counter, since
+    work-horses are forked from the same parent state and would otherwise
+    all agree on the same decision.
+    """
+    if sample_every <= 0:
+        return False
+    return zlib.crc32(job_id.encode()) % sample_every == 0
+
+
+def format_top_sites(
+    differences: List[tracemalloc.StatisticDiff], limit: int
+) -> List[str]:
+    """Format the largest allocation sites as `file:line +size B`"""
+    growing = [stat for stat in differences if stat.size_diff > 0]
+    growing.sort(key=lambda stat: stat.size_diff, reverse=True)
+
+    sites = []
+    for stat in growing[:limit]:
+        frame = stat.traceback[0]
+        sites.append(f"{frame.filename}:{frame.lineno} +{stat.size_diff} B")
+    return sites
+
+
+class AllocationTracer(SpanHook):
+    """Trace memory allocations of one in N `Job.perform` calls
+
+    For sampled jobs, `tracemalloc` is started (unless already tracing)
+    and snapshots before/after the call are compared. The net allocated
+    bytes and top allocation sites are attached to the span, and the net
+    bytes are recorded in a per-function histogram. Unsampled jobs do not
+    touch `tracemalloc` at all.
+    """
+
+    def __init__(self, sample_every: int, top_sites_limit: int = 5):
+        self.sample_every = sample_every
+        self.top_sites_limit = top_sites_limit
+
+        meter = horse_metrics.get_meter(__name__)
+        self.allocated_bytes = meter.create_histogram(
+            name=rq_metrics.JOB_ALLOCATED_BYTES,
+            unit="By",
+            description="Net bytes allocated while performing a sampled job",
+        )
+
+    def on_start(
+        self,
+        span: trace.Span,
+        rq_input: Dict[utils.RQElementName, Union["Job", "Queue", "Worker"]],
+    ) -> Any:
+        job: Optional["Job"] = rq_input.get(utils.RQElementName.JOB)
+        if not span.is_recording() or not should_sample(job.id, self.sample_every):
+            return None
+
+        started_here = not tracemalloc.is_tracing()
+        if started_here:
+            tracemalloc.start()
+        return started_here, tracemalloc.take_snapshot()
+
+    def on_end(
+        self,
+        span: trace.Span,
+        rq_input: Dict[utils.RQElementName, Union["Job", "Queue", "Worker"]],
+        state: Any,
+        exception: Optional[BaseException],
+    ) -> None:
+        if state is None:
+            return
+
+        started_here, before = state
+        after = tracemalloc.take_snapshot()
+        if started_here:
+            tracemalloc.stop()
+
+        differences = after.filter_traces(_SNAPSHOT_FILTERS).compare_to(
+            before.filter_traces(_SNAPSHOT_FILTERS), "lineno"
+        )
+        net_bytes = sum(stat.size_diff for stat in differences)
+
+        span.set_attribute(rq_attributes.JOB_ALLOCATION_NET_BYTES, net_bytes)
+        span.set_attribute(
+            rq_attributes.JOB_ALLOCATION_TOP_SITES,
+            format_top_sites(differences, self.top_sites_limit),
+        )
+
+        job: "Job" = rq_input.get(utils.RQElementName.JOB)
+        self.allocated_bytes.record(
+            max(net_bytes, 0), {rq_attributes.JOB_FUNCTION: job.func_name}
+        )
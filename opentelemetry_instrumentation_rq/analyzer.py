@@ -0,0 +1,379 @@
+"""Offline analysis of rq spans exported as OTLP JSON
+
+Span dumps are streamed: top-level JSON documents (one `TracesData` per
+line as written by the collector file exporter, concatenated or pretty
+printed documents, or Jaeger API responses wrapping it in `result`) are
+decoded one at a time, and every span is reduced to the few timestamps
+needed before the next document is read. A single document is decoded
+as a whole though: dumps of one huge pretty printed `TracesData` need
+memory for all of it.
+
+Publish, consume and perform spans are joined by trace and `rq.job.id`
+to report queue-wait (end of the `publish` span until the start of the
+`consume` span of the same attempt), service time (the `perform` span, or
+the `consume` span when no `perform` span was exported) and failures per
+queue and per function.
+
+Usage: python -m opentelemetry_instrumentation_rq.analyzer [options] FILE...
+"""
+
+import argparse
+import bisect
+import csv
+import gzip
+import io
+import json
+import math
+import re
+import sys
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import (
+    IO,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from opentelemetry import trace
+from opentelemetry.semconv._incubating.attributes import messaging_attributes
+
+from opentelemetry_instrumentation_rq import rq_attributes
+
+PERCENTILES = (50, 90, 95, 99)
+
+_CHUNK_SIZE = 1 << 20
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+_SPAN_KINDS = {
+    kind: trace.SpanKind(value - 1)
+    for value, kind in enumerate(
+        (
+            "SPAN_KIND_INTERNAL",
+            "SPAN_KIND_SERVER",
+            "SPAN_KIND_CLIENT",
+            "SPAN_KIND_PRODUCER",
+            "SPAN_KIND_CONSUMER",
+        ),
+        start=1,
+    )
+}
+_STATUS_ERROR = (2, "STATUS_CODE_ERROR")
+
+
+class SpanRecord(NamedTuple):
+    """Fields of an exported span used by the analysis"""
+
+    trace_id: str
+    span_id: str
+    parent_span_id: str
+    name: str
+    kind: trace.SpanKind
+    start_time: int
+    end_time: int
+    attributes: Dict[str, Any]
+    links: List[Tuple[str, str]]
+    is_error: bool
+
+
+def percentile(values: Sequence[float], p: float) -> float:
+    """Nearest-rank percentile of sorted values"""
+    rank = math.ceil(p / 100 * len(values))
+    return values[min(max(rank, 1), len(values)) - 1]
+
+
+def iter_documents(stream: IO[str], chunk_size: int = _CHUNK_SIZE) -> Iterator[Any]:
+    """Decode consecutive top-level JSON objects of a text stream
+
+    Documents are decoded in place from an offset of the buffer, which is
+    only compacted when more text is read.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    offset = 0
+    read_size = chunk_size
+    while True:
+        offset = _WHITESPACE.match(buffer, offset).end()
+        if offset < len(buffer):
+            try:
+                document, end = decoder.raw_decode(buffer, offset)
+            except json.JSONDecodeError:
+                pass
+            else:
+                yield document
+                offset = end
+                read_size = chunk_size
+                continue
+
+        chunk = stream.read(read_size)
+        if not chunk:
+            if offset < len(buffer):
+                # Raise the decoding error of the truncated document
+                decoder.raw_decode(buffer, offset)
+            return
+        buffer = buffer[offset:] + chunk
+        offset = 0
+        # Grow reads while a document is incomplete, to decode it in linear time
+        read_size = max(read_size, len(buffer))
+
+
+def _attribute_value(value: Dict[str, Any]) -> Any:
+    if "stringValue" in value:
+        return value["stringValue"]
+    if "intValue" in value:
+        return int(value["intValue"])
+    if "doubleValue" in value:
+        return float(value["doubleValue"])
+    if "boolValue" in value:
+        return value["boolValue"]
+    if "arrayValue" in value:
+        return [
+            _attribute_value(item) for item in value["arrayValue"].get("values", [])
+        ]
+    return None
+
+
+def _span_kind(kind: Any) -> trace.SpanKind:
+    if isinstance(kind, int):
+        return trace.SpanKind(max(kind - 1, 0))
+    return _SPAN_KINDS.get(kind, trace.SpanKind.INTERNAL)
+
+
+def iter_spans(document: Dict[str, Any]) -> Iterator[SpanRecord]:
+    """Spans of an OTLP JSON `TracesData` document"""
+    if "result" in document:
+        document = document["result"]
+    for resource_spans in document.get("resourceSpans", []):
+        for scope_spans in resource_spans.get("scopeSpans", []):
+            for span in scope_spans.get("spans", []):
+                yield SpanRecord(
+                    trace_id=span.get("traceId", ""),
+                    span_id=span.get("spanId", ""),
+                    parent_span_id=span.get("parentSpanId", ""),
+                    name=span.get("name", ""),
+                    kind=_span_kind(span.get("kind", 0)),
+                    start_time=int(span.get("startTimeUnixNano", 0)),
+                    end_time=int(span.get("endTimeUnixNano", 0)),
+                    attributes={
+                        attribute["key"]: _attribute_value(attribute.get("value", {}))
+                        for attribute in span.get("attributes", [])
+                    },
+                    links=[
+                        (link.get("traceId", ""), link.get("spanId", ""))
+                        for link in span.get("links", [])
+                    ],
+                    is_error=span.get("status", {}).get("code") in _STATUS_ERROR,
+                )
+
+
+def read_spans(paths: Iterable[str]) -> Iterator[SpanRecord]:
+    """Stream spans of OTLP JSON / JSONL files, gzipped or not, `-` for stdin"""
+    for path in paths:
+        if path == "-":
+            stream: IO[str] = sys.stdin
+        elif path.endswith(".gz"):
+            stream = io.TextIOWrapper(gzip.open(path), encoding="utf-8")
+        else:
+            stream = open(path, encoding="utf-8")
+        try:
+            for document in iter_documents(stream):
+                yield from iter_spans(document)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+
+@dataclass
+class _JobSpans:
+    queue: str = ""
+    function: str = ""
+    publish_ends: List[int] = field(default_factory=list)
+    # (start, end, span id, error) of every `consume` span
+    consumes: List[Tuple[int, int, str, bool]] = field(default_factory=list)
+
+
+class Attempt(NamedTuple):
+    """One execution of a job, joined from its spans"""
+
+    trace_id: str
+    job_id: str
+    queue: str
+    function: str
+    queue_wait: Optional[float]
+    service_time: float
+    failed: bool
+
+
+class SpanJoiner:
+    """Join publish, consume and perform spans of jobs
+
+    Only the timestamps of the spans of interest are kept while spans are
+    added, so memory grows with the number of jobs rather than the size of
+    the dump.
+    """
+
+    def __init__(self):
+        self._jobs: Dict[Tuple[str, str], _JobSpans] = defaultdict(_JobSpans)
+        # Duration and error of `perform` spans by their parent span id
+        self._performs: Dict[str, Tuple[int, bool]] = {}
+
+    def add(self, span: SpanRecord):
+        attributes = span.attributes
+        operation = attributes.get(messaging_attributes.MESSAGING_OPERATION_NAME)
+        if operation == "perform":
+            self._performs[span.parent_span_id] = (
+                span.end_time - span.start_time,
+                span.is_error,
+            )
+            return
+
+        job_id = attributes.get(rq_attributes.JOB_ID)
+        if job_id is None or operation not in ("publish", "consume"):
+            return
+
+        job = self._jobs[(span.trace_id, job_id)]
+        job.queue = attributes.get(
+            messaging_attributes.MESSAGING_DESTINATION_NAME, job.queue
+        )
+        job.function = attributes.get(rq_attributes.JOB_FUNCTION, job.function)
+        if operation == "publish":
+            job.publish_ends.append(span.end_time)
+        else:
+            job.consumes.append(
+                (span.start_time, span.end_time, span.span_id, span.is_error)
+            )
+
+    def attempts(self) -> Iterator[Attempt]:
+        for (trace_id, job_id), job in self._jobs.items():
+            publish_ends = sorted(job.publish_ends)
+            for start, end, span_id, consume_error in sorted(job.consumes):
+                index = bisect.bisect_right(publish_ends, start)
+                queue_wait = (start - publish_ends[index - 1]) / 1e9 if index else None
+                duration, perform_error = self._performs.get(
+                    span_id, (end - start, False)
+                )
+                yield Attempt(
+                    trace_id=trace_id,
+                    job_id=job_id,
+                    queue=job.queue,
+                    function=job.function,
+                    queue_wait=queue_wait,
+                    service_time=duration / 1e9,
+                    failed=consume_error or perform_error,
+                )
+
+
+def _summarize(values: List[float], prefix: str) -> Dict[str, Optional[float]]:
+    values.sort()
+    summary: Dict[str, Optional[float]] = {}
+    for p in PERCENTILES:
+        summary[f"{prefix}_p{p}"] = percentile(values, p) if values else None
+    summary[f"{prefix}_max"] = values[-1] if values else None
+    return summary
+
+
+def summarize_attempts(
+    attempts: Iterable[Attempt], group_by: Sequence[str]
+) -> List[Dict[str, Any]]:
+    """Attempts, failures and percentiles (seconds) per group"""
+    groups: Dict[Tuple, Dict[str, List]] = defaultdict(
+        lambda: {"queue_wait": [], "service_time": [], "failures": []}
+    )
+    for attempt in attempts:
+        group = groups[tuple(getattr(attempt, key) for key in group_by)]
+        if attempt.queue_wait is not None:
+            group["queue_wait"].append(attempt.queue_wait)
+        group["service_time"].append(attempt.service_time)
+        group["failures"].append(attempt.failed)
+
+    rows = []
+    for key, group in sorted(groups.items()):
+        count = len(group["service_time"])
+        failures = sum(group["failures"])
+        rows.append(
+            {
+                **dict(zip(group_by, key)),
+                "attempts": count,
+                "failures": failures,
+                "failure_rate": failures / count,
+                **_summarize(group["queue_wait"], "queue_wait"),
+                **_summarize(group["service_time"], "service_time"),
+            }
+        )
+    return rows
+
+
+def write_report(rows: List[Dict[str, Any]], output_format: str, output: IO[str]):
+    if output_format == "json":
+        json.dump(rows, output, indent=2)
+        output.write("\n")
+        return
+
+    if not rows:
+        return
+    if output_format == "csv":
+        writer = csv.DictWriter(output, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+        return
+
+    columns = list(rows[0])
+    cells = [
+        [
+            (
+                f"{row[column]:.4f}"
+                if isinstance(row[column], float)
+                else "-" if row[column] is None else str(row[column])
+            )
+            for column in columns
+        ]
+        for row in rows
+    ]
+    widths = [
+        max(len(column), *(len(row[index]) for row in cells))
+        for index, column in enumerate(columns)
+    ]
+    for line in [columns, *cells]:
+        output.write(
+            "  ".join(cell.ljust(width) for cell, width in zip(line, widths)).rstrip()
+            + "\n"
+        )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m opentelemetry_instrumentation_rq.analyzer",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("paths", nargs="+", metavar="FILE")
+    parser.add_argument(
+        "--group-by",
+        choices=["queue", "function", "queue,function"],
+        default="queue,function",
+    )
+    parser.add_argument("--format", choices=["text", "csv", "json"], default="text")
+    parser.add_argument("--output", "-o", help="file to write, stdout by default")
+    args = parser.parse_args(argv)
+
+    joiner = SpanJoiner()
+    for span in read_spans(args.paths):
+        joiner.add(span)
+    rows = summarize_attempts(joiner.attempts(), args.group_by.split(","))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="") as output:
+            write_report(rows, args.format, output)
+    else:
+        write_report(rows, args.format, sys.stdout)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""Runtime control of the instrumentation level through a Redis key"""
+
+import time
+import zlib
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple, Union
+
+if TYPE_CHECKING:
+    from redis import Redis
+    from rq.job import Job
+    from rq.worker import Worker
+
+DEFAULT_CONTROL_KEY = "rq:instrumentation:control"
+# Field of the control key applying to queues without their own field
+DEFAULT_QUEUE_FIELD = "*"
+
+
+class InstrumentationLevel:
+    """Values of the control key fields, besides sample rates"""
+
+    OFF = "off"
+    MINIMAL = "minimal"
+    FULL = "full"
+
+
+_LEVELS = (
+    InstrumentationLevel.OFF,
+    InstrumentationLevel.MINIMAL,
+    InstrumentationLevel.FULL,
+)
+
+
+def _decode(value: Union[bytes, str]) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _parse_level(value: str) -> Optional[Union[str, float]]:
+    if value in _LEVELS:
+        return value
+    try:
+        rate = float(value)
+    except ValueError:
+        return None
+    return min(max(rate, 0.0), 1.0)
+
+
+def is_job_sampled(job_id: str, rate: float) -> bool:
+    """Whether a job is within a sample rate, the same for every process"""
+    return zlib.crc32(job_id.encode()) < rate * 0x100000000
+
+
+class InstrumentationControl:
+    """Instrumentation level per queue, read from a Redis hash
+
+    Every field of the hash is a queue name, or `*` for other queues, with
+    a level: `off` traces nothing, `minimal` only traces the spans carrying
+    the trace context from producers to workers (`publish`, `schedule`,
+    `setup dependencies`, `consume`) without the hooks only setting
+    attributes, and `full` traces everything. Hooks changing `job.meta` or
+    other state run at every level, see `SpanHook.changes_state`. A sample
+    rate between 0 and 1 traces that fraction of the jobs fully and nothing
+    of the others, decided by a hash of the job ID so that producers and
+    workers agree. Queues without level are fully traced.
+
+    The hash is read at most once per `refresh_interval`, with the
+    connection of the job being traced. Workers also read it before
+    forking, so that work-horses inherit fresh levels instead of reading
+    them for every job. Levels are kept when Redis cannot be read.
+
+    Args:
+        key (str): Redis key of the hash
+        refresh_interval (float): Time (seconds) levels are cached for
+    """
+
+    def __init__(self, key: str, refresh_interval: float):
+        self.key = key
+        self.refresh_interval = refresh_interval
+        self._levels: Dict[str, Union[str, float]] = {}
+        self._refreshed_at: Optional[float] = None
+
+    def refresh(self, connection: "Redis"):
+        """Read the levels, unless they were read recently"""
+        now = time.monotonic()
+        if (
+            self._refreshed_at is not None
+            and now - self._refreshed_at < self.refresh_interval
+        ):
+            return
+        # Also when Redis fails, not to retry for every job
+        self._refreshed_at = now
+
+        # Imported here, not to import redis before the application does
+        from redis.exceptions import RedisError
+
+        try:
+            fields = connection.hgetall(self.key)
+        except RedisError:
+            return
+        levels = {}
+        for name, value in fields.items():
+            level = _parse_level(_decode(value))
+            if level is not None:
+                levels[_decode(name)] = level
+        self._levels = levels
+
+    def get_level(self, job: "Job", queue_name: str) -> str:
+        """Level of a job, either `off`, `minimal` or `full`"""
+        self.refresh(job.connection)
+        level = self._levels.get(queue_name)
+        if level is None:
+            level = self._levels.get(DEFAULT_QUEUE_FIELD, InstrumentationLevel.FULL)
+        if isinstance(level, float):
+            if is_job_sampled(job.id, level):
+                return InstrumentationLevel.FULL
+            return InstrumentationLevel.OFF
+        return level
+
+    def fork_work_horse(
+        self, func: Callable, instance: "Worker", args: Tuple, kwargs: Dict
+    ) -> Any:
+        """Wrapper of `Worker.fork_work_horse`, refreshing levels for the horse"""
+        self.refresh(instance.connection)
+        return func(*args, **kwargs)
+
+
+_control: Optional[InstrumentationControl] = None
+
+
+def get_control() -> Optional[InstrumentationControl]:
+    return _control
+
+
+def set_control(control: Optional[InstrumentationControl]):
+    global _control
+    _control = control
+
+
+def set_level(
+    connection: "Redis",
+    level: Union[str, float],
+    queue_name: str = DEFAULT_QUEUE_FIELD,
+    key: str = DEFAULT_CONTROL_KEY,
+):
+    """Set the level of a queue, or of all queues without their own level
+
+    Running instrumentations apply it within their `refresh_interval`.
+    """
+    if _parse_level(str(level)) is None:
+        raise ValueError(f"Invalid instrumentation level: {level!r}")
+    connection.hset(key, queue_name, str(level))
+
+
+def reset_level(
+    connection: "Redis",
+    queue_name: str = DEFAULT_QUEUE_FIELD,
+    key: str = DEFAULT_CONTROL_KEY,
+):
+    """Remove the level of a queue"""
+    connection.hdel(key, queue_name)
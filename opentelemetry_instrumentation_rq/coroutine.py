@@ -0,0 +1,111 @@
+"""Asyncio-aware instrumentation for coroutine job functions"""
+
+import asyncio
+import inspect
+import time
+from typing import Any, Callable, Coroutine, Dict, Optional, Tuple
+
+from opentelemetry import trace
+
+from opentelemetry_instrumentation_rq import rq_attributes
+
+
+class LoopMonitor:
+    """Measure how late the event loop wakes up a sleeping task
+
+    A task sleeping for `interval` seconds should be resumed right after
+    it; any extra delay is time the loop spent running other callbacks,
+    usually blocking sync code inside the coroutine job.
+    """
+
+    def __init__(self, interval: float, stall_threshold: float):
+        self.interval = interval
+        self.stall_threshold = stall_threshold
+        self.max_lag = 0.0
+        self.stalls = 0
+        self._sleep_started: Optional[float] = None
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self._sleep_started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.record(loop.time() - self._sleep_started - self.interval)
+
+    def stop(self, task: asyncio.Task):
+        """Cancel the monitor task, accounting for the lag of its pending sleep"""
+        task.cancel()
+        if self._sleep_started is not None:
+            loop = asyncio.get_running_loop()
+            self.record(loop.time() - self._sleep_started - self.interval)
+
+    def record(self, lag: float):
+        self.max_lag = max(self.max_lag, lag)
+        if lag >= self.stall_threshold:
+            self.stalls += 1
+
+    @property
+    def attributes(self) -> Dict[str, Any]:
+        return {
+            rq_attributes.JOB_ASYNCIO_LOOP_MAX_LAG: self.max_lag,
+            rq_attributes.JOB_ASYNCIO_LOOP_STALLS: self.stalls,
+        }
+
+
+class CoroutineJobWrapper:
+    """Wrapper of `Job._execute` for `async def` job functions
+
+    rq runs coroutine job functions with a new event loop inside
+    `Job.perform`. For them, the loop is driven here instead, so that the
+    loop setup and the coroutine itself are timed separately on the
+    current (`perform`) span. The coroutine runs in a task created from
+    the current context, hence the trace context stays active inside the
+    coroutine and the tasks it creates.
+
+    Sync job functions, and jobs without a recording span, are left to rq.
+
+    Args:
+        loop_monitor_interval (float): Wake-up interval (seconds) of the loop
+            monitor task, disabled when not positive
+        stall_threshold (float): Loop lag (seconds) counted as a stall
+    """
+
+    def __init__(self, loop_monitor_interval: float = 0, stall_threshold: float = 0.1):
+        self.loop_monitor_interval = loop_monitor_interval
+        self.stall_threshold = stall_threshold
+
+    def __call__(self, func: Callable, instance: Any, args: Tuple, kwargs: Dict) -> Any:
+        span = trace.get_current_span()
+        job_func = instance.func
+        if not span.is_recording() or not inspect.iscoroutinefunction(job_func):
+            return func(*args, **kwargs)
+
+        setup_started = time.perf_counter()
+        coroutine = job_func(*instance.args, **instance.kwargs)
+        loop = asyncio.new_event_loop()
+        return loop.run_until_complete(self.run(coroutine, span, setup_started))
+
+    async def run(
+        self, coroutine: Coroutine, span: trace.Span, setup_started: float
+    ) -> Any:
+        started = time.perf_counter()
+        span.set_attribute(
+            rq_attributes.JOB_ASYNCIO_LOOP_SETUP_DURATION, started - setup_started
+        )
+
+        monitor, monitor_task = None, None
+        if self.loop_monitor_interval > 0:
+            monitor = LoopMonitor(self.loop_monitor_interval, self.stall_threshold)
+            monitor_task = asyncio.ensure_future(monitor.run())
+
+        try:
+            return await coroutine
+        finally:
+            span.set_attribute(
+                rq_attributes.JOB_ASYNCIO_COROUTINE_DURATION,
+                time.perf_counter() - started,
+            )
+            if monitor is not None:
+                monitor.stop(monitor_task)
+                await asyncio.gather(monitor_task, return_exceptions=True)
+                span.set_attributes(monitor.attributes)
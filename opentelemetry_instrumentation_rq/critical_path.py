@@ -0,0 +1,322 @@
+"""Critical path analysis of job dependency DAGs from exported spans
+
+The `setup dependencies` span of a job enqueued with `depends_on` links to
+a span of each of its dependencies, which gives the edges of the DAG. Every
+job is timed from its spans: it becomes ready when it is first enqueued
+or when its last dependency ends, whichever is later, waits until its
+first `consume` span starts, and runs until its last `consume` span ends
+(retries included).
+
+For every pipeline (weakly connected component of the DAG), the critical
+path is the chain of last-ending dependencies which leads to the job
+ending last, and the slack of a job is how much later it could have ended
+without delaying the end of its pipeline. Jobs are stored in flat lists
+and sorted topologically with Kahn's algorithm, so that DAGs of hundreds
+of thousands of jobs are analysed in linear time.
+
+Usage: python -m opentelemetry_instrumentation_rq.critical_path [options] FILE...
+"""
+
+import argparse
+import csv
+import json
+import sys
+from collections import deque
+from typing import IO, Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from opentelemetry import trace
+from opentelemetry.semconv._incubating.attributes import messaging_attributes
+
+from opentelemetry_instrumentation_rq import rq_attributes
+from opentelemetry_instrumentation_rq.analyzer import SpanRecord, read_spans
+
+_UNSET = -1
+# Spans whose context jobs carry, which `setup dependencies` spans link to
+_LINKED_OPERATIONS = ("publish", "schedule", "setup dependencies")
+
+
+class JobGraph:
+    """Jobs and dependency edges collected from spans"""
+
+    def __init__(self):
+        self.job_ids: List[str] = []
+        self.functions: List[str] = []
+        self.queues: List[str] = []
+        self.enqueued: List[int] = []
+        self.started: List[int] = []
+        self.ended: List[int] = []
+        self._index: Dict[str, int] = {}
+        # Job of every producer span, the only spans links point to
+        self._span_jobs: Dict[Tuple[str, str], int] = {}
+        # (dependent, linked span) of `setup dependencies` spans
+        self._links: List[Tuple[int, Tuple[str, str]]] = []
+
+    def job_index(self, job_id: str) -> int:
+        index = self._index.get(job_id)
+        if index is None:
+            index = self._index[job_id] = len(self.job_ids)
+            self.job_ids.append(job_id)
+            self.functions.append("")
+            self.queues.append("")
+            self.enqueued.append(_UNSET)
+            self.started.append(_UNSET)
+            self.ended.append(_UNSET)
+        return index
+
+    def add(self, span: SpanRecord):
+        attributes = span.attributes
+        job_id = attributes.get(rq_attributes.JOB_ID)
+        if job_id is None:
+            return
+
+        index = self.job_index(job_id)
+        operation_name = attributes.get(messaging_attributes.MESSAGING_OPERATION_NAME)
+        if operation_name in _LINKED_OPERATIONS:
+            self._span_jobs[(span.trace_id, span.span_id)] = index
+        self.functions[index] = attributes.get(
+            rq_attributes.JOB_FUNCTION, self.functions[index]
+        )
+        self.queues[index] = attributes.get(
+            messaging_attributes.MESSAGING_DESTINATION_NAME, self.queues[index]
+        )
+
+        if span.kind == trace.SpanKind.PRODUCER:
+            if self.enqueued[index] == _UNSET or span.start_time < self.enqueued[index]:
+                self.enqueued[index] = span.start_time
+            if operation_name == "setup dependencies":
+                self._links.extend((index, link) for link in span.links)
+        elif span.kind == trace.SpanKind.CONSUMER:
+            if self.started[index] == _UNSET or span.start_time < self.started[index]:
+                self.started[index] = span.start_time
+            self.ended[index] = max(self.ended[index], span.end_time)
+
+    def has_run(self, index: int) -> bool:
+        return self.enqueued[index] != _UNSET and self.started[index] != _UNSET
+
+    def dependencies(self) -> List[List[int]]:
+        """Dependencies of every job, limited to jobs which ran"""
+        dependencies: List[Set[int]] = [set() for _ in self.job_ids]
+        for dependent, link in self._links:
+            dependency = self._span_jobs.get(link)
+            if (
+                dependency is not None
+                and dependency != dependent
+                and self.has_run(dependency)
+            ):
+                dependencies[dependent].add(dependency)
+        return [list(job_dependencies) for job_dependencies in dependencies]
+
+
+def _find(parents: List[int], index: int) -> int:
+    root = index
+    while parents[root] != root:
+        root = parents[root]
+    while parents[index] != root:
+        parents[index], index = root, parents[index]
+    return root
+
+
+def _sort_jobs(
+    graph: JobGraph, dependencies: List[List[int]]
+) -> Tuple[List[int], Dict[int, List[int]], List[int], int]:
+    """Jobs which ran in topological order, with Kahn's algorithm
+
+    Returns:
+        Tuple[List[int], Dict[int, List[int]], List[int], int]: Order,
+            dependents of every job, union-find parents of pipelines and
+            the number of jobs which ran
+    """
+    ran = [index for index in range(len(graph.job_ids)) if graph.has_run(index)]
+    dependents: Dict[int, List[int]] = {index: [] for index in ran}
+    in_degrees: Dict[int, int] = {}
+    parents = list(range(len(graph.job_ids)))
+    for index in ran:
+        in_degrees[index] = len(dependencies[index])
+        for dependency in dependencies[index]:
+            dependents[dependency].append(index)
+            parents[_find(parents, dependency)] = _find(parents, index)
+
+    order: List[int] = []
+    ready = deque(index for index in ran if not in_degrees[index])
+    while ready:
+        index = ready.popleft()
+        order.append(index)
+        for dependent in dependents[index]:
+            in_degrees[dependent] -= 1
+            if not in_degrees[dependent]:
+                ready.append(dependent)
+    return order, dependents, parents, len(ran)
+
+
+def _pipeline_bounds(
+    graph: JobGraph, order: List[int], released: Dict[int, int], parents: List[int]
+) -> Tuple[Dict[int, int], Dict[int, int], Dict[int, int]]:
+    """Start, end and job ending last of every pipeline"""
+    pipeline_starts: Dict[int, int] = {}
+    pipeline_ends: Dict[int, int] = {}
+    pipeline_sinks: Dict[int, int] = {}
+    for index in order:
+        pipeline = _find(parents, index)
+        if graph.ended[index] > pipeline_ends.get(pipeline, _UNSET):
+            pipeline_ends[pipeline] = graph.ended[index]
+            pipeline_sinks[pipeline] = index
+        pipeline_starts[pipeline] = min(
+            pipeline_starts.get(pipeline, released[index]), released[index]
+        )
+    return pipeline_starts, pipeline_ends, pipeline_sinks
+
+
+def _critical_path(
+    graph: JobGraph, dependencies: List[List[int]], sink: int
+) -> List[int]:
+    """Chain of last-ending dependencies leading to a job"""
+    path = [sink]
+    while dependencies[path[-1]]:
+        path.append(max(dependencies[path[-1]], key=lambda index: graph.ended[index]))
+    path.reverse()
+    return path
+
+
+def analyze(graph: JobGraph) -> Dict[str, Any]:
+    """Critical path of every pipeline and slack of every job
+
+    Returns:
+        Dict[str, Any]: `pipelines` sorted by decreasing makespan, `jobs`
+            with their pipeline, wait, run time and slack (seconds), and
+            the number of jobs left out of a `cycle`
+    """
+    dependencies = graph.dependencies()
+    order, dependents, parents, ran_count = _sort_jobs(graph, dependencies)
+
+    # Observed times: a job is ready once enqueued and its last dependency ended
+    released: Dict[int, int] = {}
+    for index in order:
+        released[index] = max(
+            [
+                graph.enqueued[index],
+                *(graph.ended[dependency] for dependency in dependencies[index]),
+            ]
+        )
+    pipeline_starts, pipeline_ends, pipeline_sinks = _pipeline_bounds(
+        graph, order, released, parents
+    )
+
+    # Backward pass: latest end of every job not delaying its pipeline
+    latest_ends: Dict[int, int] = {}
+    for index in reversed(order):
+        latest_ends[index] = min(
+            (
+                latest_ends[dependent] - (graph.ended[dependent] - released[dependent])
+                for dependent in dependents[index]
+                if dependent in latest_ends
+            ),
+            default=pipeline_ends[_find(parents, index)],
+        )
+
+    def job_row(index: int) -> Dict[str, Any]:
+        return {
+            "job_id": graph.job_ids[index],
+            "function": graph.functions[index],
+            "queue": graph.queues[index],
+            "wait": (graph.started[index] - released[index]) / 1e9,
+            "run": (graph.ended[index] - graph.started[index]) / 1e9,
+            "slack": (latest_ends[index] - graph.ended[index]) / 1e9,
+        }
+
+    # Pipelines are named after the job ending last
+    labels = {
+        pipeline: graph.job_ids[sink] for pipeline, sink in pipeline_sinks.items()
+    }
+    pipelines = []
+    for pipeline, sink in pipeline_sinks.items():
+        rows = [job_row(index) for index in _critical_path(graph, dependencies, sink)]
+        pipelines.append(
+            {
+                "pipeline": labels[pipeline],
+                "makespan": (pipeline_ends[pipeline] - pipeline_starts[pipeline]) / 1e9,
+                "critical_path_wait": sum(row["wait"] for row in rows),
+                "critical_path_run": sum(row["run"] for row in rows),
+                "critical_path": rows,
+            }
+        )
+    pipelines.sort(key=lambda pipeline: pipeline["makespan"], reverse=True)
+
+    return {
+        "pipelines": pipelines,
+        "jobs": [
+            {"pipeline": labels[_find(parents, index)], **job_row(index)}
+            for index in order
+        ],
+        "cycle": ran_count - len(order),
+    }
+
+
+def write_text(result: Dict[str, Any], top: int, output: IO[str]):
+    for pipeline in result["pipelines"][:top]:
+        output.write(
+            f"pipeline {pipeline['pipeline']}: makespan {pipeline['makespan']:.3f} s, "
+            f"critical path of {len(pipeline['critical_path'])} jobs waiting "
+            f"{pipeline['critical_path_wait']:.3f} s and running "
+            f"{pipeline['critical_path_run']:.3f} s\n"
+        )
+        for row in pipeline["critical_path"]:
+            output.write(
+                f"  {row['job_id']}  {row['function']}  [{row['queue']}]  "
+                f"wait {row['wait']:.3f} s  run {row['run']:.3f} s\n"
+            )
+    if result["cycle"]:
+        output.write(f"{result['cycle']} jobs left out of a dependency cycle\n")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m opentelemetry_instrumentation_rq.critical_path",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("paths", nargs="+", metavar="FILE")
+    parser.add_argument(
+        "--top", type=int, default=1, help="pipelines reported, longest first"
+    )
+    parser.add_argument("--format", choices=["text", "json"], default="text")
+    parser.add_argument("--output", "-o", help="file to write, stdout by default")
+    parser.add_argument("--slack-csv", help="CSV file of wait, run and slack per job")
+    args = parser.parse_args(argv)
+
+    graph = JobGraph()
+    for span in read_spans(args.paths):
+        graph.add(span)
+    result = analyze(graph)
+
+    if args.slack_csv:
+        with open(args.slack_csv, "w", encoding="utf-8", newline="") as slack_csv:
+            writer = csv.DictWriter(
+                slack_csv,
+                fieldnames=["pipeline", "job_id", "function", "queue", "wait", "run"]
+                + ["slack"],
+            )
+            writer.writeheader()
+            writer.writerows(result["jobs"])
+
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        if args.format == "json":
+            json.dump(
+                {
+                    "pipelines": result["pipelines"][: args.top],
+                    "cycle": result["cycle"],
+                },
+                output,
+                indent=2,
+            )
+            output.write("\n")
+        else:
+            write_text(result, args.top, output)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
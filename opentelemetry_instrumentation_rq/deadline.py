@@ -0,0 +1,175 @@
+"""End-to-end deadlines and SLO classes of jobs, from producers to workers"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any, Dict, Iterator, Optional, Tuple, Union
+
+from opentelemetry import trace
+from opentelemetry.semconv._incubating.attributes import messaging_attributes
+
+from opentelemetry_instrumentation_rq import (
+    horse_metrics,
+    rq_attributes,
+    rq_metrics,
+    utils,
+)
+from opentelemetry_instrumentation_rq.instrumentor import SpanHook
+
+if TYPE_CHECKING:
+    from rq.job import Job
+    from rq.queue import Queue
+    from rq.worker import Worker
+
+# Keys in `job.meta`, next to the trace context
+DEADLINE_META_KEY = "rq.job.deadline"
+SLO_META_KEY = "rq.job.slo"
+
+# Deadline (epoch seconds) and SLO class given to jobs enqueued in this context
+_deadline: ContextVar[Tuple[Optional[float], Optional[str]]] = ContextVar(
+    "rq_job_deadline", default=(None, None)
+)
+
+
+@contextmanager
+def job_deadline(
+    budget: Optional[float] = None, slo: Optional[str] = None
+) -> Iterator[None]:
+    """Give a deadline or SLO class to the jobs enqueued within
+
+    Args:
+        budget (Optional[float]): Seconds from now until the jobs must end
+        slo (Optional[str]): SLO class of the jobs, whose budget from their
+            enqueue is given by the `slo_budgets` option when no `budget`
+            is given
+
+    ```python
+    with job_deadline(budget=30):
+        queue.enqueue(render_report, report_id)
+    ```
+    """
+    deadline = time.time() + budget if budget is not None else None
+    token = _deadline.set((deadline, slo))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def get_deadline(job: "Job") -> Tuple[Optional[float], Optional[str]]:
+    """Deadline (epoch seconds) and SLO class of a job"""
+    return job.meta.get(DEADLINE_META_KEY), job.meta.get(SLO_META_KEY)
+
+
+class DeadlineAttachHook(SpanHook):
+    """Save the deadline and SLO class of the context in `job.meta`
+
+    Used on `publish`, `schedule` and `setup dependencies` spans, before
+    rq saves the job. A job which already has a deadline, e.g. a retried
+    or released one, keeps it.
+
+    Args:
+        slo_budgets (Dict[str, float]): Budget (seconds) from the enqueue
+            per SLO class
+    """
+
+    changes_state = True
+
+    def __init__(self, slo_budgets: Dict[str, float]):
+        self.slo_budgets = slo_budgets
+
+    def on_start(
+        self,
+        span: trace.Span,
+        rq_input: Dict[utils.RQElementName, Union["Job", "Queue", "Worker"]],
+    ) -> Any:
+        job: "Job" = rq_input.get(utils.RQElementName.JOB)
+        deadline, slo = _deadline.get()
+        if DEADLINE_META_KEY in job.meta or SLO_META_KEY in job.meta:
+            deadline, slo = get_deadline(job)
+        elif deadline is None and slo in self.slo_budgets:
+            deadline = time.time() + self.slo_budgets[slo]
+
+        if slo is not None:
+            job.meta[SLO_META_KEY] = slo
+            span.set_attribute(rq_attributes.JOB_SLO, slo)
+        if deadline is not None:
+            job.meta[DEADLINE_META_KEY] = deadline
+            span.set_attribute(
+                rq_attributes.JOB_DEADLINE_REMAINING, deadline - time.time()
+            )
+
+
+class DeadlineHook(SpanHook):
+    """Remaining budget of the job on the `consume` span
+
+    The budget left when the worker starts the job and when it ends are
+    set as `rq.job.deadline.remaining` and `rq.job.deadline.remaining_at_end`.
+    A job ending after its deadline is marked with `rq.job.slo_violated`
+    and counted by `rq.job.slo.violations` per queue, function and SLO
+    class. Jobs enqueued by the job inherit its deadline and SLO class.
+    """
+
+    changes_state = True
+
+    def __init__(self):
+        self.violations = horse_metrics.get_meter(__name__).create_counter(
+            name=rq_metrics.JOB_SLO_VIOLATIONS,
+            unit="{job}",
+            description="Jobs which ended after their deadline",
+        )
+
+    def on_start(
+        self,
+        span: trace.Span,
+        rq_input: Dict[utils.RQElementName, Union["Job", "Queue", "Worker"]],
+    ) -> Any:
+        job: "Job" = rq_input.get(utils.RQElementName.JOB)
+        deadline, slo = get_deadline(job)
+        if deadline is None and slo is None:
+            return None
+
+        if slo is not None:
+            span.set_attribute(rq_attributes.JOB_SLO, slo)
+        if deadline is not None:
+            span.set_attribute(
+                rq_attributes.JOB_DEADLINE_REMAINING, deadline - time.time()
+            )
+        return _deadline.set((deadline, slo))
+
+    def on_end(
+        self,
+        span: trace.Span,
+        rq_input: Dict[utils.RQElementName, Union["Job", "Queue", "Worker"]],
+        state: Any,
+        exception: Optional[BaseException],
+    ) -> None:
+        if state is None:
+            return
+
+        deadline, slo = _deadline.get()
+        _deadline.reset(state)
+        if deadline is None:
+            return
+
+        remaining = deadline - time.time()
+        span.set_attributes(
+            {
+                rq_attributes.JOB_DEADLINE_REMAINING_AT_END: remaining,
+                rq_attributes.JOB_SLO_VIOLATED: remaining < 0,
+            }
+        )
+        if remaining >= 0:
+            return
+
+        job: "Job" = rq_input.get(utils.RQElementName.JOB)
+        queue: Optional["Queue"] = rq_input.get(utils.RQElementName.QUEUE)
+        attributes = {
+            messaging_attributes.MESSAGING_DESTINATION_NAME: (
+                queue.name if queue else job.origin
+            ),
+            rq_attributes.JOB_FUNCTION: job.func_name,
+        }
+        if slo is not None:
+            attributes[rq_attributes.JOB_SLO] = slo
+        self.violations.add(1, attributes)
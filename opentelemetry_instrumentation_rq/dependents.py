@@ -0,0 +1,183 @@
+"""Instrumentation of the release of dependent jobs"""
+
+import time
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple, Union
+
+from opentelemetry import trace
+from opentelemetry.semconv._incubating.attributes import messaging_attributes
+from opentelemetry.semconv._incubating.attributes.messaging_attributes import (
+    MessagingOperationTypeValues,
+)
+
+from opentelemetry_instrumentation_rq import (
+    horse_metrics,
+    instrumentor,
+    rq_attributes,
+    rq_metrics,
+    utils,
+)
+from opentelemetry_instrumentation_rq.instrumentor import SpanHook
+
+if TYPE_CHECKING:
+    from rq.job import Job
+    from rq.queue import Queue
+    from rq.worker import Worker
+
+
+class _Release:
+    """Dependents released by the current `Queue.enqueue_dependents` call"""
+
+    __slots__ = (
+        "job",
+        "queue",
+        "start_time",
+        "span",
+        "checking",
+        "checked",
+        "enqueued",
+    )
+
+    def __init__(self, job: "Job", queue: "Queue"):
+        self.job = job
+        self.queue = queue
+        self.start_time = time.time_ns()
+        self.span: Optional[trace.Span] = None
+        # Whether dependents are being checked, before being enqueued
+        self.checking = False
+        self.checked = 0
+        self.enqueued = 0
+
+
+_release: ContextVar[Optional[_Release]] = ContextVar(
+    "rq_dependents_release", default=None
+)
+
+
+class DependentsReleaseInstrumentation:
+    """Trace `Queue.enqueue_dependents` when a job has dependents
+
+    rq calls `Queue.enqueue_dependents` for every finished job, most of
+    them without dependents. The `enqueue dependents` span is started
+    only once a dependent is checked (`Job.dependencies_are_met`), back
+    dated to the start of the call, so that other jobs cost neither a
+    span nor a Redis command. Released jobs are counted by wrapping
+    `Queue._enqueue_job`, and linked to the span by `ReleaseLinkHook` on
+    their `publish` span.
+    """
+
+    def __init__(self):
+        self.tracer = trace.get_tracer(instrumentor.__name__)
+        self.release_duration = horse_metrics.get_meter(__name__).create_histogram(
+            name=rq_metrics.JOB_DEPENDENTS_RELEASE_DURATION,
+            unit="s",
+            description="Time spent releasing the dependents of a finished job",
+        )
+
+    def enqueue_dependents(
+        self, func: Callable, instance: "Queue", args: Tuple, kwargs: Dict
+    ) -> Any:
+        """Wrapper of `Queue.enqueue_dependents`"""
+        job: "Job" = kwargs.get("job", args[0] if args else None)
+        release = _Release(job, instance)
+        token = _release.set(release)
+        exception: Optional[BaseException] = None
+        try:
+            return func(*args, **kwargs)
+        except Exception as exc:
+            exception = exc
+            raise
+        finally:
+            _release.reset(token)
+            if release.span is not None:
+                self._end(release, exception)
+
+    def dependencies_are_met(
+        self, func: Callable, instance: "Job", args: Tuple, kwargs: Dict
+    ) -> Any:
+        """Wrapper of `Job.dependencies_are_met`, counting checked dependents"""
+        release = _release.get()
+        if release is not None:
+            if release.span is None:
+                self._start(release)
+            if not release.checking:
+                # Every attempt, retried by rq after a `WatchError`, checks
+                # the dependents again before enqueuing them
+                release.checking = True
+                release.checked = release.enqueued = 0
+            release.checked += 1
+        return func(*args, **kwargs)
+
+    def enqueue_job(
+        self, func: Callable, instance: "Queue", args: Tuple, kwargs: Dict
+    ) -> Any:
+        """Wrapper of `Queue._enqueue_job`, counting released dependents"""
+        release = _release.get()
+        if release is not None and release.span is not None:
+            release.checking = False
+            release.enqueued += 1
+        return func(*args, **kwargs)
+
+    def _start(self, release: _Release):
+        job = release.job
+        release.span = self.tracer.start_span(
+            name=f"enqueue dependents {release.queue.name}",
+            kind=trace.SpanKind.PRODUCER,
+            attributes={
+                **instrumentor.get_attribute_base(),
+                messaging_attributes.MESSAGING_OPERATION_TYPE: (
+                    MessagingOperationTypeValues.SEND.value
+                ),
+                messaging_attributes.MESSAGING_OPERATION_NAME: "enqueue dependents",
+                messaging_attributes.MESSAGING_DESTINATION_NAME: release.queue.name,
+                rq_attributes.JOB_ID: job.id,
+                rq_attributes.JOB_FUNCTION: job.func_name,
+            },
+            start_time=release.start_time,
+        )
+
+    def _end(self, release: _Release, exception: Optional[BaseException]):
+        span = release.span
+        end_time = time.time_ns()
+        span.set_attributes(
+            {
+                rq_attributes.JOB_DEPENDENTS_CHECKED: release.checked,
+                rq_attributes.JOB_DEPENDENTS_ENQUEUED: release.enqueued,
+                rq_attributes.JOB_DEPENDENTS_DEFERRED: (
+                    release.checked - release.enqueued
+                ),
+            }
+        )
+        if exception is not None:
+            span.set_status(trace.Status(trace.StatusCode.ERROR))
+            span.record_exception(exception)
+        else:
+            span.set_status(trace.Status(trace.StatusCode.OK))
+        span.end(end_time=end_time)
+
+        self.release_duration.record(
+            (end_time - release.start_time) / 1e9,
+            {
+                messaging_attributes.MESSAGING_DESTINATION_NAME: release.queue.name,
+                rq_attributes.JOB_FUNCTION: release.job.func_name,
+            },
+            # Exemplars point to the ended span rather than the current one
+            context=trace.set_span_in_context(span),
+        )
+
+
+class ReleaseLinkHook(SpanHook):
+    """Link the `publish` span of a released dependent to its release
+
+    The `publish` span belongs to the trace of the dependent, so it links
+    to the `enqueue dependents` span in the trace of the finished job.
+    """
+
+    def on_start(
+        self,
+        span: trace.Span,
+        rq_input: Dict[utils.RQElementName, Union["Job", "Queue", "Worker"]],
+    ) -> Any:
+        release = _release.get()
+        if release is not None and release.span is not None:
+            span.add_link(release.span.get_span_context())
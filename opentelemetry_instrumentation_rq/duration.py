@@ -0,0 +1,58 @@
+"""Processing duration of jobs in workers"""
+
+import time
+from typing import TYPE_CHECKING, Any, Dict, Optional, Union
+
+from opentelemetry import trace
+from opentelemetry.semconv._incubating.attributes import messaging_attributes
+from opentelemetry.semconv._incubating.metrics import messaging_metrics
+
+from opentelemetry_instrumentation_rq import horse_metrics, rq_attributes, utils
+from opentelemetry_instrumentation_rq.instrumentor import SpanHook
+
+if TYPE_CHECKING:
+    from rq.job import Job
+    from rq.queue import Queue
+    from rq.worker import Worker
+
+
+class ProcessDurationHook(SpanHook):
+    """Record `messaging.process.duration` of the `consume` span
+
+    The duration is recorded per queue and function within the context of
+    the `consume` span, so that metric exemplars point to its trace.
+    """
+
+    def __init__(self):
+        self.duration = horse_metrics.get_meter(__name__).create_histogram(
+            name=messaging_metrics.MESSAGING_PROCESS_DURATION,
+            unit="s",
+            description="Duration of processing a job by a worker",
+        )
+
+    def on_start(
+        self,
+        span: trace.Span,
+        rq_input: Dict[utils.RQElementName, Union["Job", "Queue", "Worker"]],
+    ) -> Any:
+        return time.perf_counter()
+
+    def on_end(
+        self,
+        span: trace.Span,
+        rq_input: Dict[utils.RQElementName, Union["Job", "Queue", "Worker"]],
+        state: Any,
+        exception: Optional[BaseException],
+    ) -> None:
+        job: "Job" = rq_input.get(utils.RQElementName.JOB)
+        queue: Optional["Queue"] = rq_input.get(utils.RQElementName.QUEUE)
+        self.duration.record(
+            time.perf_counter() - state,
+            {
+                messaging_attributes.MESSAGING_DESTINATION_NAME: (
+                    queue.name if queue else job.origin
+                ),
+                rq_attributes.JOB_FUNCTION: job.func_name,
+            },
+            context=trace.set_span_in_context(span),
+        )
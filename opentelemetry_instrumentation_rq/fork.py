@@ -0,0 +1,153 @@
+"""Cost of forking work-horses, in the parent worker and in the horse"""
+
+import os
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple, Union
+
+from opentelemetry import metrics, trace
+from opentelemetry.semconv._incubating.attributes import messaging_attributes
+
+from opentelemetry_instrumentation_rq import (
+    horse_metrics,
+    rq_attributes,
+    rq_metrics,
+    utils,
+)
+from opentelemetry_instrumentation_rq.instrumentor import SpanHook
+
+if TYPE_CHECKING:
+    from rq.job import Job
+    from rq.queue import Queue
+    from rq.worker import Worker
+
+
+class _Fork:
+    """Timestamps (`perf_counter_ns`) of the fork of a work-horse"""
+
+    __slots__ = ("job_id", "start_time", "parent_time", "child_time")
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.start_time: Optional[int] = None
+        self.parent_time: Optional[int] = None
+        self.child_time: Optional[int] = None
+
+
+# Fork in progress in the parent worker, or the one which started this horse
+_fork: Optional[_Fork] = None
+
+
+def _before_fork():
+    if _fork is not None and _fork.start_time is None:
+        _fork.start_time = time.perf_counter_ns()
+
+
+def _after_fork_in_parent():
+    if _fork is not None and _fork.parent_time is None:
+        _fork.parent_time = time.perf_counter_ns()
+
+
+def _after_fork_in_child():
+    if _fork is not None and _fork.child_time is None:
+        _fork.child_time = time.perf_counter_ns()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(
+        before=_before_fork,
+        after_in_parent=_after_fork_in_parent,
+        after_in_child=_after_fork_in_child,
+    )
+
+
+class ForkMonitor:
+    """Wrapper of `Worker.fork_work_horse`, timing `os.fork` in the parent
+
+    The fork is timed by `os.register_at_fork` hooks, which only record
+    the fork of a work-horse, and is recorded as `rq.horse.fork.duration`
+    per queue and function. The horse inherits the timestamps, for
+    `ForkTimingHook` to measure its bootstrap until `perform_job`.
+    """
+
+    def __init__(self):
+        self.fork_duration = metrics.get_meter(__name__).create_histogram(
+            name=rq_metrics.HORSE_FORK_DURATION,
+            unit="s",
+            description="Time spent by the worker forking a work-horse",
+        )
+
+    def __call__(
+        self, func: Callable, instance: "Worker", args: Tuple, kwargs: Dict
+    ) -> Any:
+        global _fork
+        job, queue = self._get_arguments(*args, **kwargs)
+        fork = _fork = _Fork(job.id)
+        try:
+            # Only returns in the parent, the horse exits within
+            return func(*args, **kwargs)
+        finally:
+            _fork = None
+            if fork.start_time is not None and fork.parent_time is not None:
+                self.fork_duration.record(
+                    (fork.parent_time - fork.start_time) / 1e9,
+                    {
+                        messaging_attributes.MESSAGING_DESTINATION_NAME: queue.name,
+                        rq_attributes.JOB_FUNCTION: job.func_name,
+                    },
+                )
+
+    @staticmethod
+    def _get_arguments(job: "Job", queue: "Queue") -> Tuple["Job", "Queue"]:
+        return job, queue
+
+
+class ForkTimingHook(SpanHook):
+    """Fork duration and time-to-perform of the horse on the `consume` span
+
+    In a work-horse, the `consume` span gets the duration of the fork
+    (`rq.horse.fork.duration`) and the time from the fork until the horse
+    started performing the job (`rq.horse.time_to_perform`), which is also
+    recorded in the histogram of the same name. Jobs performed without
+    forking (e.g. `SimpleWorker`) get neither.
+    """
+
+    def __init__(self):
+        self.time_to_perform = horse_metrics.get_meter(__name__).create_histogram(
+            name=rq_metrics.HORSE_TIME_TO_PERFORM,
+            unit="s",
+            description="Time from forking a work-horse until it performs the job",
+        )
+
+    def on_start(
+        self,
+        span: trace.Span,
+        rq_input: Dict[utils.RQElementName, Union["Job", "Queue", "Worker"]],
+    ) -> Any:
+        global _fork
+        now = time.perf_counter_ns()
+        job: "Job" = rq_input.get(utils.RQElementName.JOB)
+        fork = _fork
+        if fork is None or fork.child_time is None or fork.job_id != job.id:
+            return
+        # Forks from within the job are not those of a work-horse
+        _fork = None
+
+        time_to_perform = (now - fork.child_time) / 1e9
+        span.set_attributes(
+            {
+                rq_attributes.HORSE_FORK_DURATION: (
+                    (fork.child_time - fork.start_time) / 1e9
+                ),
+                rq_attributes.HORSE_TIME_TO_PERFORM: time_to_perform,
+            }
+        )
+        queue: Optional["Queue"] = rq_input.get(utils.RQElementName.QUEUE)
+        self.time_to_perform.record(
+            time_to_perform,
+            {
+                messaging_attributes.MESSAGING_DESTINATION_NAME: (
+                    queue.name if queue else job.origin
+                ),
+                rq_attributes.JOB_FUNCTION: job.func_name,
+            },
+        )
@@ -0,0 +1,178 @@
+"""Instrumentation of rq groups (rq >= 2.0)"""
+
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple, Union
+
+from opentelemetry import trace
+from opentelemetry.instrumentation.utils import suppress_instrumentation
+from opentelemetry.semconv._incubating.attributes import messaging_attributes
+from opentelemetry.semconv._incubating.attributes.messaging_attributes import (
+    MessagingOperationTypeValues,
+)
+from opentelemetry.trace.propagation.tracecontext import TraceContextTextMapPropagator
+
+from opentelemetry_instrumentation_rq import (
+    horse_metrics,
+    instrumentor,
+    rq_attributes,
+    rq_metrics,
+    utils,
+)
+from opentelemetry_instrumentation_rq.instrumentor import SpanHook
+
+if TYPE_CHECKING:
+    from redis.client import Pipeline
+    from rq.group import Group
+    from rq.job import Job
+    from rq.queue import EnqueueData, Queue
+    from rq.worker import Worker
+
+# Pending jobs and first enqueue time of a group, next to the group key
+GROUP_STATE_KEY_SUFFIX = ":telemetry"
+# Expiry of the group state, in case some jobs never end (e.g. deleted)
+GROUP_STATE_TTL = 7 * 24 * 3600
+
+_ENDED_STATUSES = ("finished", "failed", "stopped")
+
+
+def get_group_state_key(group_name: str) -> str:
+    from rq.group import Group
+
+    return Group.get_key(group_name) + GROUP_STATE_KEY_SUFFIX
+
+
+class GroupInstrumentation:
+    """Wrapper of `Group.enqueue_many`
+
+    The batch is traced by one `enqueue group` span with the number of
+    jobs. With `publish_spans`, every job also gets its `publish` span,
+    linked from the group span. Without, jobs are enqueued with the
+    instrumentation suppressed and carry the context of the group span,
+    so their `consume` spans become its children.
+
+    Pending jobs and the time of the first enqueue are counted in a Redis
+    hash next to the group, so that `GroupCompletionHook` can tell when
+    the last job of the group ends.
+
+    Args:
+        publish_spans (bool): Trace the `publish` span of every job
+    """
+
+    def __init__(self, publish_spans: bool = True):
+        self.publish_spans = publish_spans
+        self.tracer = trace.get_tracer(instrumentor.__name__)
+        self.propagator = TraceContextTextMapPropagator()
+
+    def __call__(
+        self, func: Callable, instance: "Group", args: Tuple, kwargs: Dict
+    ) -> Any:
+        queue, job_datas, pipeline = self._get_arguments(*args, **kwargs)
+        with self.tracer.start_as_current_span(
+            name=f"enqueue group {queue.name}",
+            kind=trace.SpanKind.PRODUCER,
+            attributes={
+                **instrumentor.get_attribute_base(),
+                messaging_attributes.MESSAGING_OPERATION_TYPE: (
+                    MessagingOperationTypeValues.SEND.value
+                ),
+                messaging_attributes.MESSAGING_OPERATION_NAME: "enqueue group",
+                messaging_attributes.MESSAGING_DESTINATION_NAME: queue.name,
+                messaging_attributes.MESSAGING_BATCH_MESSAGE_COUNT: len(job_datas),
+                rq_attributes.GROUP_ID: instance.name,
+            },
+        ) as span:
+            pipe = pipeline if pipeline is not None else instance.connection.pipeline()
+            if job_datas:
+                # Counted ahead of the jobs in the same pipeline, so that no
+                # worker ends one of them before it is counted
+                key = get_group_state_key(instance.name)
+                pipe.hincrby(key, "pending", len(job_datas))
+                pipe.hsetnx(key, "enqueued_at", time.time_ns())
+                pipe.expire(key, GROUP_STATE_TTL)
+
+            if self.publish_spans:
+                jobs: List["Job"] = func(queue, job_datas, pipeline=pipe)
+                for job in jobs:
+                    publish_context = self.propagator.extract(carrier=job.meta)
+                    span.add_link(
+                        trace.get_current_span(publish_context).get_span_context(),
+                        {rq_attributes.JOB_ID: job.id},
+                    )
+            else:
+                carrier: Dict[str, str] = {}
+                self.propagator.inject(carrier)
+                job_datas = [
+                    job_data._replace(meta={**(job_data.meta or {}), **carrier})
+                    for job_data in job_datas
+                ]
+                with suppress_instrumentation():
+                    jobs = func(queue, job_datas, pipeline=pipe)
+
+            # Otherwise the caller executes its pipeline, along with the jobs
+            if pipeline is None:
+                pipe.execute()
+        return jobs
+
+    @staticmethod
+    def _get_arguments(
+        queue: "Queue",
+        job_datas: List["EnqueueData"],
+        pipeline: Optional["Pipeline"] = None,
+    ) -> Tuple["Queue", List["EnqueueData"], Optional["Pipeline"]]:
+        return queue, job_datas, pipeline
+
+
+class GroupCompletionHook(SpanHook):
+    """Group of the job and group makespan, when the job ends
+
+    Used on `handle_job_success` and `handle_job_failure` spans, as every
+    job ends in one of them, including those of work-horses killed or
+    stopped, which the parent worker handles. When a job of a group ends
+    (finished, failed without retry left, or stopped), the pending jobs
+    of the group are decremented. The worker ending the last one records
+    the `rq.group.makespan` histogram, from the first enqueue of the
+    group.
+    """
+
+    changes_state = True
+
+    def __init__(self):
+        self.makespan = horse_metrics.get_meter(__name__).create_histogram(
+            name=rq_metrics.GROUP_MAKESPAN,
+            unit="s",
+            description="Time from enqueueing a group until its last job ended",
+        )
+
+    def on_end(
+        self,
+        span: trace.Span,
+        rq_input: Dict[utils.RQElementName, Union["Job", "Queue", "Worker"]],
+        state: Any,
+        exception: Optional[BaseException],
+    ) -> None:
+        job: "Job" = rq_input.get(utils.RQElementName.JOB)
+        group_id: Optional[str] = getattr(job, "group_id", None)
+        if not group_id:
+            return
+
+        span.set_attribute(rq_attributes.GROUP_ID, group_id)
+        if job.get_status(refresh=False) not in _ENDED_STATUSES:
+            return
+
+        key = get_group_state_key(group_id)
+        pipeline = job.connection.pipeline()
+        pipeline.hincrby(key, "pending", -1)
+        pipeline.hget(key, "enqueued_at")
+        pending, enqueued_at = pipeline.execute()
+        if pending > 0 and enqueued_at is not None:
+            return
+
+        # Either the last job of the group, or a group state already expired
+        job.connection.delete(key)
+        if enqueued_at is None:
+            return
+        makespan = (time.time_ns() - int(enqueued_at)) / 1e9
+        span.set_attribute(rq_attributes.GROUP_MAKESPAN, makespan)
+        self.makespan.record(
+            makespan, {messaging_attributes.MESSAGING_DESTINATION_NAME: job.origin}
+        )
@@ -0,0 +1,190 @@
+"""Lag of worker heartbeats, an early sign of CPU starvation"""
+
+import mmap
+import os
+import struct
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple, Union
+
+from opentelemetry import metrics, trace
+
+from opentelemetry_instrumentation_rq import rq_attributes, rq_metrics, utils
+from opentelemetry_instrumentation_rq.instrumentor import SpanHook
+from opentelemetry_instrumentation_rq.queue_wait import _time_ns
+
+if TYPE_CHECKING:
+    from rq.job import Job
+    from rq.queue import Queue
+    from rq.worker import Worker
+
+# Late heartbeats and their total delay (seconds)
+_COUNTERS = struct.Struct("dd")
+
+
+class LateHeartbeats:
+    """Late heartbeat counters shared by a worker with its work-horses
+
+    Heartbeats are sent by the parent worker while the work-horse runs the
+    job, so the counters live in an anonymous shared mapping, created
+    before forking and read by the horse.
+    """
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self._memory = mmap.mmap(-1, _COUNTERS.size)
+
+    def add(self, delay: float):
+        count, total_delay = self.read()
+        _COUNTERS.pack_into(self._memory, 0, count + 1, total_delay + delay)
+
+    def read(self) -> Tuple[float, float]:
+        return _COUNTERS.unpack_from(self._memory, 0)
+
+
+_late_heartbeats: Optional[LateHeartbeats] = None
+
+
+def get_late_heartbeats() -> LateHeartbeats:
+    """Counters of this process, not those inherited from e.g. a pool manager"""
+    global _late_heartbeats
+    if _late_heartbeats is None or _late_heartbeats.pid != os.getpid():
+        _late_heartbeats = LateHeartbeats()
+    return _late_heartbeats
+
+
+class HeartbeatMonitor:
+    """Interval, jitter and TTL usage of worker heartbeats
+
+    Every heartbeat extends the worker key by a TTL: the interval since
+    the previous heartbeat over that TTL is recorded as
+    `rq.worker.heartbeat.ttl_usage`, which reaches 1 when the worker is
+    considered dead. While monitoring a work-horse, rq sends a heartbeat
+    every `job_monitoring_interval`; the lateness of these heartbeats is
+    recorded as `rq.worker.heartbeat.jitter`, and those later than
+    `late_threshold` are counted for `LateHeartbeatHook`.
+
+    Previous heartbeats are those of this process: a work-horse starts
+    without the ones of its worker, not to record intervals it did not see.
+
+    Args:
+        late_threshold (Optional[float]): Jitter (seconds) from which a
+            heartbeat is late, disabled by default
+    """
+
+    def __init__(self, late_threshold: Optional[float] = None):
+        self.late_threshold = late_threshold
+        self._pid = os.getpid()
+        # Time (ns) and TTL of the previous heartbeat per worker
+        self._heartbeats: Dict[str, Tuple[int, int]] = {}
+        # Job and time (ns) of the previous heartbeat while monitoring a horse
+        self._monitoring: Dict[str, Tuple[str, int]] = {}
+
+        meter = metrics.get_meter(__name__)
+        self.interval = meter.create_histogram(
+            name=rq_metrics.WORKER_HEARTBEAT_INTERVAL,
+            unit="s",
+            description="Time between two heartbeats of a worker",
+        )
+        self.ttl_usage = meter.create_histogram(
+            name=rq_metrics.WORKER_HEARTBEAT_TTL_USAGE,
+            unit="1",
+            description="Time between two heartbeats over the TTL they granted",
+        )
+        self.jitter = meter.create_histogram(
+            name=rq_metrics.WORKER_HEARTBEAT_JITTER,
+            unit="s",
+            description="Lateness of heartbeats sent while monitoring a work-horse",
+        )
+
+    def _reset_after_fork(self):
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._heartbeats = {}
+            self._monitoring = {}
+
+    def heartbeat(
+        self, func: Callable, instance: "Worker", args: Tuple, kwargs: Dict
+    ) -> Any:
+        """Wrapper of `Worker.heartbeat`"""
+        timeout = kwargs.get("timeout", args[0] if args else None)
+        # Default of rq
+        timeout = timeout or instance.worker_ttl + 60
+        self._reset_after_fork()
+        now = time.time_ns()
+        previous = self._heartbeats.get(instance.name)
+        self._heartbeats[instance.name] = (now, timeout)
+        if previous is not None:
+            previous_time, previous_timeout = previous
+            interval = (now - previous_time) / 1e9
+            attributes = {rq_attributes.WORKER_NAME: instance.name}
+            self.interval.record(interval, attributes)
+            self.ttl_usage.record(interval / previous_timeout, attributes)
+        return func(*args, **kwargs)
+
+    def maintain_heartbeats(
+        self, func: Callable, instance: "Worker", args: Tuple, kwargs: Dict
+    ) -> Any:
+        """Wrapper of `Worker.maintain_heartbeats`, called by the parent worker"""
+        job: "Job" = kwargs.get("job", args[0] if args else None)
+        self._reset_after_fork()
+        now = time.time_ns()
+        previous = self._monitoring.get(instance.name)
+        if previous is not None and previous[0] == job.id:
+            previous_time = previous[1]
+        elif job.started_at:
+            previous_time = _time_ns(job.started_at)
+        else:
+            previous_time = None
+        self._monitoring[instance.name] = (job.id, now)
+
+        if previous_time is not None:
+            jitter = (now - previous_time) / 1e9 - instance.job_monitoring_interval
+            self.jitter.record(jitter, {rq_attributes.WORKER_NAME: instance.name})
+            if self.late_threshold is not None and jitter > self.late_threshold:
+                get_late_heartbeats().add(jitter)
+        return func(*args, **kwargs)
+
+    def fork_work_horse(
+        self, func: Callable, instance: "Worker", args: Tuple, kwargs: Dict
+    ) -> Any:
+        """Wrapper of `Worker.fork_work_horse`, sharing counters with the horse"""
+        if self.late_threshold is not None:
+            get_late_heartbeats()
+        return func(*args, **kwargs)
+
+
+class LateHeartbeatHook(SpanHook):
+    """Add a `rq.worker.heartbeat.late` event to the `consume` span
+
+    The event is added when the worker sent late heartbeats while the job
+    was performed, with their number and total delay.
+    """
+
+    def on_start(
+        self,
+        span: trace.Span,
+        rq_input: Dict[utils.RQElementName, Union["Job", "Queue", "Worker"]],
+    ) -> Any:
+        if _late_heartbeats is None:
+            return 0.0, 0.0
+        return _late_heartbeats.read()
+
+    def on_end(
+        self,
+        span: trace.Span,
+        rq_input: Dict[utils.RQElementName, Union["Job", "Queue", "Worker"]],
+        state: Any,
+        exception: Optional[BaseException],
+    ) -> None:
+        if _late_heartbeats is None:
+            return
+
+        count, total_delay = _late_heartbeats.read()
+        if count > state[0]:
+            span.add_event(
+                "rq.worker.heartbeat.late",
+                {
+                    rq_attributes.WORKER_HEARTBEAT_LATE_COUNT: int(count - state[0]),
+                    rq_attributes.WORKER_HEARTBEAT_LATE_DELAY: total_delay - state[1],
+                },
+            )
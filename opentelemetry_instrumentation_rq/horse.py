@@ -0,0 +1,115 @@
+"""Synthetic spans for work-horses which died without ending their spans"""
+
+import os
+import sys
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, Tuple
+
+from opentelemetry import metrics, trace
+from opentelemetry.semconv._incubating.attributes import (
+    messaging_attributes,
+    process_attributes,
+)
+from opentelemetry.trace.propagation.tracecontext import TraceContextTextMapPropagator
+
+from opentelemetry_instrumentation_rq import instrumentor, rq_attributes, rq_metrics
+
+if TYPE_CHECKING:
+    from rq.job import Job
+    from rq.worker import Worker
+
+# `ru_maxrss` is reported in kilobytes on Linux, but in bytes on macOS
+_MAX_RSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+
+class HorseMonitor:
+    """Emit an error span when a work-horse exits abnormally
+
+    The parent `Worker` records when each work-horse is forked. If rq
+    detects an abnormal exit (`Worker.handle_work_horse_killed`), the
+    `consume` and `perform` spans of the horse are lost, so a closed
+    `horse_killed` error span is emitted from the parent instead, in the
+    trace of the job. It starts when the horse was forked, so its duration
+    is the elapsed time until death, and carries the exit signal and RSS
+    at death.
+    """
+
+    def __init__(self):
+        self.tracer = trace.get_tracer(instrumentor.__name__)
+        self.propagator = TraceContextTextMapPropagator()
+        self._fork_times: Dict[str, int] = {}
+
+        meter = metrics.get_meter(__name__)
+        self.horse_killed = meter.create_counter(
+            name=rq_metrics.HORSE_KILLED,
+            unit="{horse}",
+            description="Work-horses which exited abnormally",
+        )
+
+    def fork_work_horse(
+        self, func: Callable, instance: "Worker", args: Tuple, kwargs: Dict
+    ) -> Any:
+        """Wrapper of `Worker.fork_work_horse`, only returning in the parent"""
+        job: "Job" = kwargs.get("job", args[0] if args else None)
+        self._fork_times[job.id] = time.time_ns()
+        return func(*args, **kwargs)
+
+    def monitor_work_horse(
+        self, func: Callable, instance: "Worker", args: Tuple, kwargs: Dict
+    ) -> Any:
+        """Wrapper of `Worker.monitor_work_horse`, forgetting the horse at exit"""
+        job: "Job" = kwargs.get("job", args[0] if args else None)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self._fork_times.pop(job.id, None)
+
+    def handle_work_horse_killed(
+        self, func: Callable, instance: "Worker", args: Tuple, kwargs: Dict
+    ) -> Any:
+        """Wrapper of `Worker.handle_work_horse_killed`"""
+        job, retpid, ret_val, rusage = self._get_arguments(*args, **kwargs)
+        forked_at = self._fork_times.pop(job.id, None)
+
+        attributes = {
+            **instrumentor.get_attribute_base(),
+            messaging_attributes.MESSAGING_OPERATION_NAME: "horse_killed",
+            messaging_attributes.MESSAGING_DESTINATION_NAME: job.origin,
+            messaging_attributes.MESSAGING_CONSUMER_GROUP_NAME: instance.name,
+            rq_attributes.JOB_ID: job.id,
+            rq_attributes.JOB_FUNCTION: job.func_name,
+        }
+        metric_attributes = {
+            messaging_attributes.MESSAGING_DESTINATION_NAME: job.origin,
+            rq_attributes.JOB_FUNCTION: job.func_name,
+        }
+        if retpid:
+            attributes[process_attributes.PROCESS_PID] = retpid
+        if ret_val is not None and os.WIFSIGNALED(ret_val):
+            attributes[rq_attributes.HORSE_SIGNAL] = os.WTERMSIG(ret_val)
+            metric_attributes[rq_attributes.HORSE_SIGNAL] = os.WTERMSIG(ret_val)
+        elif ret_val is not None and os.WIFEXITED(ret_val):
+            attributes[process_attributes.PROCESS_EXIT_CODE] = os.WEXITSTATUS(ret_val)
+        if rusage is not None:
+            attributes[rq_attributes.HORSE_MAX_RSS] = rusage.ru_maxrss * _MAX_RSS_UNIT
+
+        span = self.tracer.start_span(
+            name=f"horse_killed {job.origin}",
+            kind=trace.SpanKind.CONSUMER,
+            context=self.propagator.extract(carrier=job.meta),
+            attributes=attributes,
+            start_time=forked_at,
+        )
+        span.set_status(
+            trace.Status(trace.StatusCode.ERROR, "Work-horse terminated unexpectedly")
+        )
+        span.end()
+        self.horse_killed.add(
+            1, metric_attributes, context=trace.set_span_in_context(span)
+        )
+
+        return func(*args, **kwargs)
+
+    @staticmethod
+    def _get_arguments(job, retpid, ret_val, rusage):
+        return job, retpid, ret_val, rusage
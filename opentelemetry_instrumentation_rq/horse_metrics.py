@@ -0,0 +1,178 @@
+"""Measurements of work-horses, recorded by their parent worker
+
+A work-horse is a fork of its worker which exits once the job is done.
+Metrics exported by the horse itself would be series of their own, starting
+from zero with a new start time for every job, which cumulative backends can
+neither sum up nor keep monotonic. Instruments recording on the job path are
+therefore created with `get_meter`: in a work-horse, their measurements are
+written to a file the worker created before forking, and the worker records
+them once the horse exited, in its own long-lived series. The span context
+of every measurement is kept, so that exemplars still point to the spans
+of the horse.
+"""
+
+import json
+import os
+import tempfile
+from typing import IO, TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple
+
+from opentelemetry import context as context_api
+from opentelemetry import metrics, trace
+from opentelemetry.util.types import Attributes
+
+if TYPE_CHECKING:
+    from rq.worker import Worker
+
+
+class _Relay:
+    """File of the measurements of a work-horse, created by its worker"""
+
+    __slots__ = ("pid", "file")
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self.file: IO[str] = tempfile.TemporaryFile("w+", encoding="utf-8")
+
+
+# Relay of the horse forked last by this worker, inherited by the horse
+_relay: Optional[_Relay] = None
+# Instruments by name, for the worker to record what its horses measured
+_instruments: Dict[str, "RelayedInstrument"] = {}
+
+
+class RelayedInstrument:
+    """Histogram or counter whose measurements in a horse go to its worker"""
+
+    __slots__ = ("name", "_measure")
+
+    def __init__(self, name: str, measure: Callable[..., None]):
+        self.name = name
+        self._measure = measure
+        _instruments[name] = self
+
+    def record(
+        self,
+        amount: float,
+        attributes: Attributes = None,
+        context: Optional[context_api.Context] = None,
+    ):
+        relay = _relay
+        if relay is None or relay.pid == os.getpid():
+            self._measure(amount, attributes=attributes, context=context)
+            return
+
+        span_context = trace.get_current_span(context).get_span_context()
+        sampled = span_context.is_valid and span_context.trace_flags.sampled
+        relay.file.write(
+            json.dumps(
+                [
+                    self.name,
+                    amount,
+                    dict(attributes) if attributes else None,
+                    span_context.trace_id if sampled else None,
+                    span_context.span_id if sampled else None,
+                ]
+            )
+            + "\n"
+        )
+
+    add = record
+
+
+class _Meter:
+    """Meter creating instruments which relay the measurements of horses"""
+
+    def __init__(self, meter: metrics.Meter):
+        self._meter = meter
+
+    def create_histogram(
+        self, name: str, unit: str = "", description: str = ""
+    ) -> RelayedInstrument:
+        histogram = self._meter.create_histogram(
+            name=name, unit=unit, description=description
+        )
+        return RelayedInstrument(name, histogram.record)
+
+    def create_counter(
+        self, name: str, unit: str = "", description: str = ""
+    ) -> RelayedInstrument:
+        counter = self._meter.create_counter(
+            name=name, unit=unit, description=description
+        )
+        return RelayedInstrument(name, counter.add)
+
+
+def get_meter(name: str) -> _Meter:
+    """Like `metrics.get_meter`, for histograms and counters of the job path"""
+    return _Meter(metrics.get_meter(name))
+
+
+def flush():
+    """Write the measurements of this work-horse, before it exits"""
+    relay = _relay
+    if relay is not None and relay.pid != os.getpid():
+        relay.file.flush()
+
+
+def _record(relay: _Relay):
+    relay.file.seek(0)
+    for line in relay.file:
+        try:
+            name, amount, attributes, trace_id, span_id = json.loads(line)
+        except ValueError:
+            # Cut short by the death of the horse
+            break
+        instrument = _instruments.get(name)
+        if instrument is None:
+            continue
+
+        # Not the context of the worker, which has no exemplar to give
+        context = context_api.Context()
+        if trace_id is not None:
+            context = trace.set_span_in_context(
+                trace.NonRecordingSpan(
+                    trace.SpanContext(
+                        trace_id,
+                        span_id,
+                        is_remote=True,
+                        trace_flags=trace.TraceFlags(trace.TraceFlags.SAMPLED),
+                    )
+                ),
+                context,
+            )
+        instrument._measure(amount, attributes=attributes, context=context)
+
+
+def _close():
+    global _relay
+    relay, _relay = _relay, None
+    if relay is not None:
+        relay.file.close()
+
+
+def fork_work_horse(
+    func: Callable, instance: "Worker", args: Tuple, kwargs: Dict
+) -> Any:
+    """Wrapper of `Worker.fork_work_horse`, creating the file of the horse"""
+    global _relay
+    _close()
+    _relay = _Relay()
+    return func(*args, **kwargs)
+
+
+def monitor_work_horse(
+    func: Callable, instance: "Worker", args: Tuple, kwargs: Dict
+) -> Any:
+    """Wrapper of `Worker.monitor_work_horse`, recording what the horse measured
+
+    Returns once the horse exited.
+    """
+    try:
+        return func(*args, **kwargs)
+    finally:
+        relay = _relay
+        if relay is not None and relay.pid == os.getpid():
+            try:
+                _record(relay)
+            finally:
+                _close()
@@ -1,21 +1,76 @@
 """Trace instrumentor for creating span & setting span attributes"""
 
 import socket
-from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from functools import lru_cache
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 from opentelemetry import trace
+from opentelemetry.instrumentation.utils import is_instrumentation_enabled
 from opentelemetry.semconv._incubating.attributes import messaging_attributes
 from opentelemetry.trace.propagation.tracecontext import TraceContextTextMapPropagator
-from rq.job import Job
-from rq.queue import Queue
-from rq.worker import Worker
 
-from opentelemetry_instrumentation_rq import rq_attributes, utils
+from opentelemetry_instrumentation_rq import (
+    control,
+    horse_metrics,
+    rq_attributes,
+    utils,
+)
 
-ATTRIBUTE_BASE: Dict[str, Union[int, str]] = {
-    messaging_attributes.MESSAGING_SYSTEM: "Python RQ",
-    messaging_attributes.MESSAGING_CLIENT_ID: socket.gethostname(),
-}
+if TYPE_CHECKING:
+    from rq.job import Job
+    from rq.queue import Queue
+    from rq.worker import Worker
+
+
+@lru_cache(maxsize=None)
+def get_attribute_base() -> Dict[str, Union[int, str]]:
+    """Per-process attributes shared by all spans, resolved on first use"""
+    return {
+        messaging_attributes.MESSAGING_SYSTEM: "Python RQ",
+        messaging_attributes.MESSAGING_CLIENT_ID: socket.gethostname(),
+    }
+
+
+class SpanHook:
+    """Extension point for `TraceInstrumentWrapper`
+
+    Hooks run inside the span, right before and after the wrapped call,
+    ending in reverse order. Whatever `on_start` returns is handed back to
+    `on_end` as `state`.
+
+    Hooks changing the job or other state, not only the span, set
+    `changes_state`: they also run for jobs not traced at the level set
+    by `control.InstrumentationControl`, with a non-recording span.
+    """
+
+    changes_state: bool = False
+
+    def on_start(
+        self,
+        span: trace.Span,
+        rq_input: Dict[utils.RQElementName, Union["Job", "Queue", "Worker"]],
+    ) -> Any:
+        """Called after the span started, before the wrapped call"""
+        return None
+
+    def on_end(
+        self,
+        span: trace.Span,
+        rq_input: Dict[utils.RQElementName, Union["Job", "Queue", "Worker"]],
+        state: Any,
+        exception: Optional[BaseException],
+    ) -> None:
+        """Called after the wrapped call, before the span ended"""
 
 
 class TraceInstrumentWrapper:
@@ -29,6 +84,7 @@ class TraceInstrumentWrapper:
         should_flush: bool,
         instance_info: utils.InstanceInfo,
         argument_info_list: List[utils.ArgumentInfo],
+        hooks: Sequence[SpanHook] = (),
     ):
         self.tracer = trace.get_tracer(__name__)
         self.propagator = TraceContextTextMapPropagator()
@@ -41,6 +97,7 @@ class TraceInstrumentWrapper:
         self.should_flush = should_flush
         self.instance_info = instance_info
         self.argument_info_list = argument_info_list
+        self.hooks = hooks
 
     def get_span_name(self, target: str) -> str:
         """Generate span name by `operation_name` and user specific target.
@@ -57,23 +114,23 @@ class TraceInstrumentWrapper:
         return f"{self.operation_name} {target}"
 
     def get_attributes(
-        self, rq_input: Dict[utils.RQElementName, Union[Job, Queue, Worker]]
+        self, rq_input: Dict[utils.RQElementName, Union["Job", "Queue", "Worker"]]
     ) -> Dict[str, str]:
         """Generate attributes from rq elements
 
         Args:
-            rq_input (Dict[utils.RQElementName, Union[Job, Queue, Worker]]):
+            rq_input (Dict[utils.RQElementName, Union["Job", "Queue", "Worker"]]):
                 RQ input being extracted.
 
         Returns:
             Dict[str, str]: Span attributes
         """
-        attributes = ATTRIBUTE_BASE.copy()
+        attributes = get_attribute_base().copy()
 
         attributes[messaging_attributes.MESSAGING_OPERATION_TYPE] = self.operation_type
         attributes[messaging_attributes.MESSAGING_OPERATION_NAME] = self.operation_name
 
-        job: Optional[Job] = rq_input.get(utils.RQElementName.JOB, None)
+        job: Optional["Job"] = rq_input.get(utils.RQElementName.JOB, None)
         if job:
             attributes[rq_attributes.JOB_ID] = job.id
             attributes[rq_attributes.JOB_FUNCTION] = job.func_name
@@ -83,11 +140,11 @@ class TraceInstrumentWrapper:
                     job.worker_name
                 )
 
-        queue: Optional[Queue] = rq_input.get(utils.RQElementName.QUEUE, None)
+        queue: Optional["Queue"] = rq_input.get(utils.RQElementName.QUEUE, None)
         if queue:
             attributes[messaging_attributes.MESSAGING_DESTINATION_NAME] = queue.name
 
-        worker: Optional[Worker] = rq_input.get(utils.RQElementName.WORKER, None)
+        worker: Optional["Worker"] = rq_input.get(utils.RQElementName.WORKER, None)
         if worker and self.span_kind == trace.SpanKind.CONSUMER:
             attributes[messaging_attributes.MESSAGING_CONSUMER_GROUP_NAME] = worker.name
 
@@ -95,25 +152,25 @@ class TraceInstrumentWrapper:
 
     def extract_rq_input(
         self,
-        instance: Union[Job, Queue, Worker],
+        instance: Union["Job", "Queue", "Worker"],
         args: Tuple,
         kwargs: Dict,
         instance_info: utils.InstanceInfo,
         argument_infos: List[utils.ArgumentInfo],
-    ) -> Dict[utils.RQElementName, Union[Job, Queue, Worker]]:
+    ) -> Dict[utils.RQElementName, Union["Job", "Queue", "Worker"]]:
         """Extract RQ elements from RQ input within wrapped function
 
         Args:
-            instance (Union[Job, Queue, Worker]): Wrapped instance, one of Job, Queue or Worker
+            instance (Union["Job", "Queue", "Worker"]): Wrapped instance, one of Job, Queue or Worker
             args (Tuple): Non-keyword arguments input from RQ method
             kwargs (Dict): Keyword arguments input from RQ method
             instance_info (utils.InstanceInfo): Wrapped instance info
             argument_infos (List[utils.ArgumentInfo]): Interested arguments info to be extract
 
         Returns:
-            Dict[utils.RQElementName, Union[Job, Queue, Worker]]: Extracted Job, Queue and Worker
+            Dict[utils.RQElementName, Union["Job", "Queue", "Worker"]]: Extracted Job, Queue and Worker
         """
-        rq_input: Dict[utils.RQElementName, Union[Job, Queue, Worker]] = {}
+        rq_input: Dict[utils.RQElementName, Union["Job", "Queue", "Worker"]] = {}
 
         # Handle arguments from args / kwargs
         for arg_info in argument_infos:
@@ -133,7 +190,7 @@ class TraceInstrumentWrapper:
 
         return rq_input
 
-    def link_job_dependencies(self, job: Job, span: trace.Span):
+    def link_job_dependencies(self, job: "Job", span: trace.Span):
         """For `rq.queue.Queue.setup_dependencies` only
 
         Creating span links for job dependencies
@@ -144,38 +201,117 @@ class TraceInstrumentWrapper:
             dep_span_ctx = trace.get_current_span(dep_ctx).get_span_context()
             span.add_link(dep_span_ctx)
 
+    def _resolve_hooks(
+        self, job: "Job", queue_name: str
+    ) -> Tuple[bool, Sequence[SpanHook]]:
+        """Whether to trace the job, and the hooks to run at its level
+
+        The level is set at runtime per queue, see
+        `control.InstrumentationControl`. Hooks changing state run at
+        every level.
+        """
+        instrumentation_control = control.get_control()
+        if instrumentation_control is None:
+            return True, self.hooks
+
+        level = instrumentation_control.get_level(job, queue_name)
+        if level == control.InstrumentationLevel.FULL:
+            return True, self.hooks
+        state_hooks = [hook for hook in self.hooks if hook.changes_state]
+        if level == control.InstrumentationLevel.MINIMAL and self.should_propagate:
+            return True, state_hooks
+        return False, state_hooks
+
+    def _call_hooks(
+        self,
+        func: Callable,
+        args: Tuple,
+        kwargs: Dict,
+        span: trace.Span,
+        rq_input: Dict[utils.RQElementName, Union["Job", "Queue", "Worker"]],
+        hooks: Sequence[SpanHook],
+    ) -> Any:
+        """Call the wrapped function between the hooks, within the span
+
+        Hooks end in reverse order, so that context variables they set are
+        reset in turn, and hooks which started end even when another one
+        raises.
+        """
+        started_hooks: List[Tuple[SpanHook, Any]] = []
+        exception: Optional[BaseException] = None
+        try:
+            for hook in hooks:
+                started_hooks.append((hook, hook.on_start(span, rq_input)))
+            response = func(*args, **kwargs)
+            span.set_status(trace.Status(trace.StatusCode.OK))
+            return response
+        except Exception as exc:
+            exception = exc
+            if span.is_recording():
+                span.set_status(trace.Status(trace.StatusCode.ERROR))
+                span.record_exception(exception=exc)
+            raise
+        finally:
+            for hook, hook_state in reversed(started_hooks):
+                hook.on_end(span, rq_input, hook_state, exception)
+
+    def _flush(self):
+        """Force flush before fork process exited"""
+        if not self.should_flush:
+            return
+
+        trace.get_tracer_provider().force_flush()
+        # Metrics are recorded by the parent worker, see `horse_metrics`
+        horse_metrics.flush()
+
     def __call__(self, func: Callable, instance: Any, args: Tuple, kwargs: Dict):
         """Trace instrumentaion"""
         # Extract RQ elements
         rq_input = self.extract_rq_input(
             instance, args, kwargs, self.instance_info, self.argument_info_list
         )
-        job: Job = rq_input.get(utils.RQElementName.JOB, None)
-        queue: Queue = rq_input.get(utils.RQElementName.QUEUE, None)
+        job: "Job" = rq_input.get(utils.RQElementName.JOB, None)
+        queue: "Queue" = rq_input.get(utils.RQElementName.QUEUE, None)
 
         # Early return if we can't
         # (1) Get Job Element
         # (2) When handling the outer layer of callback hook, but no such hook user given
         # (3) When Queue setting up job depenencies and there is no any job depends on
+        # (4) When instrumentation is suppressed, e.g. for jobs of a group
         callback_instrument_skip = "callback" in self.operation_name and not getattr(
             instance, self.operation_name
         )
         setup_dependencies_skip = (
             self.operation_name == "setup dependencies" and not len(job._dependency_ids)
         )
-        if not job or callback_instrument_skip or setup_dependencies_skip:
+        if (
+            not job
+            or callback_instrument_skip
+            or setup_dependencies_skip
+            or not is_instrumentation_enabled()
+        ):
             return func(*args, **kwargs)
 
-        # Prepare metadata and parent context
         queue_name: str = queue.name if queue else ""
+        is_traced, hooks = self._resolve_hooks(job, queue_name or job.origin)
+        if not is_traced:
+            response = self._call_hooks(
+                func, args, kwargs, trace.INVALID_SPAN, rq_input, hooks
+            )
+            self._flush()
+            return response
+
+        # Prepare metadata and parent context
         span_name: str = self.get_span_name(queue_name)
         span_attributes: Dict[str, str] = self.get_attributes(rq_input)
 
         parent_context: trace.Context = self.propagator.extract(carrier=job.meta)
+        # Attributes are given at span creation, so samplers can make use of them
         span_context_manager = self.tracer.start_as_current_span(
             name=span_name,
             kind=self.span_kind,
             context=parent_context if parent_context else None,
+            attributes=span_attributes,
         )
 
         # Span record
@@ -184,21 +320,10 @@ class TraceInstrumentWrapper:
             self.link_job_dependencies(job, span)
         if self.should_propagate:
             self.propagator.inject(job.meta)
-        if span.is_recording():
-            span.set_attributes(span_attributes)
         try:
-            response = func(*args, **kwargs)
-            span.set_status(trace.Status(trace.StatusCode.OK))
-        except Exception as exc:
-            if span.is_recording():
-                span.set_status(trace.Status(trace.StatusCode.ERROR))
-                span.record_exception(exception=exc)
-            raise
+            response = self._call_hooks(func, args, kwargs, span, rq_input, hooks)
         finally:
             span_context_manager.__exit__(None, None, None)
 
-        # Force flush before fork process exited
-        if self.should_flush:
-            trace.get_tracer_provider().force_flush()
-
+        self._flush()
         return response
@@ -0,0 +1,578 @@
+"""Load generator for capacity testing of instrumentation settings
+
+Enqueue a configurable mix of jobs into a local Redis (or fakeredis), run
+instrumented workers, and report throughput and end-to-end latency
+percentiles computed from the captured spans.
+
+Workers are `SimpleWorker` threads of this process by default: they share
+the GIL with the producer and with each other, and never fork a
+work-horse, so the cost of instrumenting forks and horses is left out.
+With `--fork`, workers are `Worker` processes forking a work-horse per
+job, as in production, which need a Redis server shared by the processes
+(`--redis-url`).
+
+Usage: python -m opentelemetry_instrumentation_rq.loadgen [options]
+
+For example, to compare `serializer_timing` against the default settings:
+    python -m opentelemetry_instrumentation_rq.loadgen --jobs 2000 --workers 4
+    python -m opentelemetry_instrumentation_rq.loadgen --jobs 2000 --workers 4 \\
+        --option serializer_timing=true
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+from opentelemetry import trace
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import (
+    SimpleSpanProcessor,
+    SpanExporter,
+    SpanExportResult,
+)
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from redis import Redis
+from rq import Callback, Queue, SimpleWorker, Worker
+from rq.job import Dependency, Job
+from rq.scheduler import RQScheduler
+from rq.timeouts import TimerDeathPenalty
+
+from opentelemetry_instrumentation_rq import RQInstrumentor, rq_attributes
+from opentelemetry_instrumentation_rq.analyzer import (
+    PERCENTILES,
+    SpanRecord,
+    percentile,
+)
+
+# Kinds of jobs in the mix, reported separately
+PLAIN = "plain"
+SCHEDULED = "scheduled"
+FAN_OUT = "fan-out"
+FAN_IN = "fan-in"
+
+
+class LoadgenError(Exception):
+    """Failure raised on purpose by failing jobs"""
+
+
+def task(payload: str, fail: bool) -> int:
+    """Job function of the load generator"""
+    if fail:
+        raise LoadgenError("failure requested by the load generator")
+    return len(payload)
+
+
+def on_success(job, connection, result, *args, **kwargs):
+    """Success callback of the load generator"""
+
+
+def on_failure(job, connection, type, value, traceback):
+    """Failure callback of the load generator"""
+
+
+@dataclass
+class LoadConfig:
+    """Job mix and workers of a load generator run"""
+
+    jobs: int = 1000
+    workers: int = 4
+    fork: bool = False
+    rate: float = 0.0
+    payload_sizes: Sequence[int] = (64,)
+    failure_ratio: float = 0.0
+    scheduled_ratio: float = 0.0
+    schedule_delay: float = 0.5
+    dependency_ratio: float = 0.0
+    fan_out: int = 0
+    fan_in: int = 0
+    callbacks: bool = False
+    queue_name: str = "loadgen"
+    redis_url: Optional[str] = None
+    instrument: bool = True
+    instrument_options: Dict[str, Any] = field(default_factory=dict)
+    timeout: float = 60.0
+    seed: Optional[int] = None
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    """Count, percentiles and maximum of latencies in milliseconds"""
+    values = sorted(latency * 1000 for latency in latencies)
+    if not values:
+        return {"count": 0}
+    summary: Dict[str, float] = {"count": len(values)}
+    for p in PERCENTILES:
+        summary[f"p{p}"] = percentile(values, p)
+    summary["max"] = values[-1]
+    return summary
+
+
+def job_latencies(spans: Sequence[Union[ReadableSpan, SpanRecord]]) -> Dict[str, float]:
+    """End-to-end latency (seconds) of every job found in the spans
+
+    A job starts with its first producer span (`publish`, `schedule` or
+    `setup dependencies`) and ends with its last `consume` span.
+    """
+    starts: Dict[str, int] = {}
+    ends: Dict[str, int] = {}
+    for span in spans:
+        job_id = (span.attributes or {}).get(rq_attributes.JOB_ID)
+        if job_id is None:
+            continue
+        if span.kind == trace.SpanKind.PRODUCER:
+            starts[job_id] = min(starts.get(job_id, span.start_time), span.start_time)
+        elif span.kind == trace.SpanKind.CONSUMER:
+            ends[job_id] = max(ends.get(job_id, span.end_time), span.end_time)
+
+    return {
+        job_id: (ends[job_id] - start) / 1e9
+        for job_id, start in starts.items()
+        if job_id in ends
+    }
+
+
+class SpanFileExporter(SpanExporter):
+    """Write the job, kind and times of spans to a JSON lines file per process
+
+    Forked workers and their work-horses cannot export spans to the memory
+    of the load generator, which reads the files with `read_span_files`.
+
+    Args:
+        directory (str): Directory of the files
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        lines = "".join(
+            json.dumps(
+                [
+                    (span.attributes or {}).get(rq_attributes.JOB_ID),
+                    span.kind.value,
+                    span.start_time,
+                    span.end_time,
+                ]
+            )
+            + "\n"
+            for span in spans
+        )
+        path = os.path.join(self.directory, f"spans-{os.getpid()}.jsonl")
+        with open(path, "a", encoding="utf-8") as spans_file:
+            spans_file.write(lines)
+        return SpanExportResult.SUCCESS
+
+
+def read_span_files(directory: str) -> List[SpanRecord]:
+    """Spans written by `SpanFileExporter` in every process"""
+    spans = []
+    for name in sorted(os.listdir(directory)):
+        with open(os.path.join(directory, name), encoding="utf-8") as spans_file:
+            for line in spans_file:
+                job_id, kind, start_time, end_time = json.loads(line)
+                spans.append(
+                    SpanRecord(
+                        trace_id="",
+                        span_id="",
+                        parent_span_id="",
+                        name="",
+                        kind=trace.SpanKind(kind),
+                        start_time=start_time,
+                        end_time=end_time,
+                        attributes=(
+                            {rq_attributes.JOB_ID: job_id} if job_id is not None else {}
+                        ),
+                        links=[],
+                        is_error=False,
+                    )
+                )
+    return spans
+
+
+class ThreadWorker(SimpleWorker):
+    """Worker running in a thread, where signals and alarms are unavailable"""
+
+    death_penalty_class = TimerDeathPenalty
+
+    def _install_signal_handlers(self):
+        pass
+
+
+class LoadGenerator:
+    """Enqueue the job mix of `config` and run workers until all jobs end
+
+    Args:
+        config (LoadConfig): Job mix and workers
+        connection_factory (Callable[[], Redis]): Creates a connection per
+            thread
+    """
+
+    def __init__(self, config: LoadConfig, connection_factory: Callable[[], Redis]):
+        self.config = config
+        self.connection_factory = connection_factory
+        self.random = random.Random(config.seed)
+        self.job_kinds: Dict[str, str] = {}
+        self._stop: Any = (
+            multiprocessing.get_context("fork").Event()
+            if config.fork
+            else threading.Event()
+        )
+
+    def enqueue_kwargs(self) -> Dict[str, Any]:
+        payload = "x" * self.random.choice(self.config.payload_sizes)
+        kwargs: Dict[str, Any] = {
+            "args": (payload, self.random.random() < self.config.failure_ratio),
+            "failure_ttl": 600,
+            "result_ttl": 600,
+        }
+        if self.config.callbacks:
+            kwargs["on_success"] = Callback(on_success)
+            kwargs["on_failure"] = Callback(on_failure)
+        return kwargs
+
+    def enqueue_unit(self, queue: Queue, left: int):
+        """Enqueue a plain or scheduled job, or a dependency group of at most
+        `left` jobs"""
+        config = self.config
+        shapes = [
+            shape
+            for shape, size in ((FAN_OUT, config.fan_out), (FAN_IN, config.fan_in))
+            if size > 0
+        ]
+        draw = self.random.random()
+        shape = PLAIN
+        if shapes and draw < config.dependency_ratio and left > 1:
+            shape = self.random.choice(shapes)
+        elif draw < config.dependency_ratio + config.scheduled_ratio:
+            shape = SCHEDULED
+
+        if shape == FAN_OUT:
+            parent = queue.enqueue(task, **self.enqueue_kwargs())
+            self.job_kinds[parent.id] = PLAIN
+            for _ in range(min(config.fan_out, left - 1)):
+                job = queue.enqueue(
+                    task,
+                    depends_on=Dependency(jobs=[parent], allow_failure=True),
+                    **self.enqueue_kwargs(),
+                )
+                self.job_kinds[job.id] = FAN_OUT
+        elif shape == FAN_IN:
+            parents = [
+                queue.enqueue(task, **self.enqueue_kwargs())
+                for _ in range(min(config.fan_in, left - 1))
+            ]
+            for parent in parents:
+                self.job_kinds[parent.id] = PLAIN
+            job = queue.enqueue(
+                task,
+                depends_on=Dependency(jobs=parents, allow_failure=True),
+                **self.enqueue_kwargs(),
+            )
+            self.job_kinds[job.id] = FAN_IN
+        elif shape == SCHEDULED:
+            job = queue.enqueue_in(
+                timedelta(seconds=config.schedule_delay),
+                task,
+                **self.enqueue_kwargs(),
+            )
+            self.job_kinds[job.id] = SCHEDULED
+        else:
+            job = queue.enqueue(task, **self.enqueue_kwargs())
+            self.job_kinds[job.id] = PLAIN
+
+    def produce(self):
+        """Enqueue the job mix, at `config.rate` jobs per second if given"""
+        queue = Queue(self.config.queue_name, connection=self.connection_factory())
+        start = time.perf_counter()
+        while len(self.job_kinds) < self.config.jobs:
+            self.enqueue_unit(queue, self.config.jobs - len(self.job_kinds))
+            if self.config.rate > 0:
+                due = start + len(self.job_kinds) / self.config.rate
+                time.sleep(max(due - time.perf_counter(), 0))
+
+    def work(self):
+        """Run a worker until stopped, replacing it whenever it quits idle"""
+        connection = self.connection_factory()
+        queue = Queue(self.config.queue_name, connection=connection)
+        worker_class = Worker if self.config.fork else ThreadWorker
+        while not self._stop.is_set():
+            worker = worker_class([queue], connection=connection)
+            worker.work(max_idle_time=1, logging_level="CRITICAL")
+
+    def schedule(self, scheduler: RQScheduler):
+        """Enqueue scheduled jobs when due, like the scheduler of a worker"""
+        while not self._stop.wait(0.01):
+            if not scheduler.acquired_locks:
+                scheduler.acquire_locks()
+            scheduler.enqueue_scheduled_jobs()
+
+    def ended_jobs(self, connection: Redis) -> int:
+        pipeline = connection.pipeline()
+        for job_id in self.job_kinds:
+            pipeline.hget(Job.key_for(job_id), "status")
+        ended = (b"finished", b"failed", "finished", "failed")
+        return len([status for status in pipeline.execute() if status in ended])
+
+    def run(self) -> float:
+        """Run the load, returning the wall time in seconds"""
+        queue = Queue(self.config.queue_name, connection=self.connection_factory())
+        scheduler = RQScheduler([queue], connection=self.connection_factory())
+        # Processes are forked before the scheduler thread starts
+        worker_class = (
+            multiprocessing.get_context("fork").Process
+            if self.config.fork
+            else threading.Thread
+        )
+        threads = [
+            worker_class(target=self.work, name=f"loadgen-worker-{index}")
+            for index in range(self.config.workers)
+        ]
+        threads.append(
+            threading.Thread(
+                target=self.schedule, args=(scheduler,), name="loadgen-scheduler"
+            )
+        )
+
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        try:
+            self.produce()
+            connection = self.connection_factory()
+            deadline = time.perf_counter() + self.config.timeout
+            while self.ended_jobs(connection) < len(self.job_kinds):
+                if time.perf_counter() > deadline:
+                    break
+                time.sleep(0.05)
+            return time.perf_counter() - start
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+            scheduler.release_locks()
+
+
+def report(
+    config: LoadConfig,
+    generator: LoadGenerator,
+    wall_time: float,
+    spans: Sequence[Union[ReadableSpan, SpanRecord]],
+) -> Dict[str, Any]:
+    """Throughput and latency percentiles of a finished run"""
+    latencies = job_latencies(spans)
+    by_kind: Dict[str, List[float]] = defaultdict(list)
+    for job_id, latency in latencies.items():
+        by_kind[generator.job_kinds.get(job_id, PLAIN)].append(latency)
+
+    ended = generator.ended_jobs(generator.connection_factory())
+    return {
+        "jobs": len(generator.job_kinds),
+        "ended_jobs": ended,
+        "workers": config.workers,
+        "fork": config.fork,
+        "instrument_options": config.instrument_options if config.instrument else None,
+        "wall_time": wall_time,
+        "throughput": ended / wall_time if wall_time else 0.0,
+        "spans": len(spans),
+        "latency_ms": summarize(list(latencies.values())),
+        "latency_ms_by_kind": {
+            kind: summarize(values) for kind, values in sorted(by_kind.items())
+        },
+    }
+
+
+def format_report(result: Dict[str, Any]) -> str:
+    lines = [
+        f"jobs          {result['ended_jobs']}/{result['jobs']} ended",
+        f"workers       {result['workers']} "
+        + ("processes" if result["fork"] else "threads, without fork"),
+        f"instrumented  {result['instrument_options']}",
+        f"wall time     {result['wall_time']:.2f} s",
+        f"throughput    {result['throughput']:.1f} jobs/s",
+        f"spans         {result['spans']}",
+    ]
+    rows = {"all": result["latency_ms"], **result["latency_ms_by_kind"]}
+    columns = [f"p{p}" for p in PERCENTILES] + ["max"]
+    lines.append("")
+    lines.append(
+        "latency (ms)  "
+        + f"{'count':>8}"
+        + "".join(f"{column:>10}" for column in columns)
+    )
+    for name, summary in rows.items():
+        lines.append(
+            f"{name:<14}{summary['count']:>8}"
+            + "".join(f"{summary.get(column, 0):>10.2f}" for column in columns)
+        )
+    return "\n".join(lines)
+
+
+def parse_option(value: str) -> Dict[str, Any]:
+    """Parse `key=value` of an instrumentation option, value in JSON if valid"""
+    key, separator, raw = value.partition("=")
+    if not separator:
+        raise argparse.ArgumentTypeError(f"expected key=value, got {value!r}")
+    try:
+        return {key: json.loads(raw)}
+    except ValueError:
+        return {key: raw}
+
+
+def parse_sizes(value: str) -> List[int]:
+    return [int(size) for size in value.split(",")]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m opentelemetry_instrumentation_rq.loadgen",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    defaults = LoadConfig()
+    parser.add_argument("--jobs", type=int, default=defaults.jobs)
+    parser.add_argument("--workers", type=int, default=defaults.workers)
+    parser.add_argument(
+        "--fork",
+        action="store_true",
+        help="run `Worker` processes forking a work-horse per job, rather than "
+        "`SimpleWorker` threads, needs --redis-url",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=defaults.rate,
+        help="jobs enqueued per second, 0 to enqueue as fast as possible",
+    )
+    parser.add_argument(
+        "--payload-sizes",
+        type=parse_sizes,
+        default=list(defaults.payload_sizes),
+        help="comma separated payload sizes in bytes, picked at random",
+    )
+    parser.add_argument("--failure-ratio", type=float, default=defaults.failure_ratio)
+    parser.add_argument(
+        "--scheduled-ratio",
+        type=float,
+        default=defaults.scheduled_ratio,
+        help="share of jobs enqueued with `enqueue_in`",
+    )
+    parser.add_argument("--schedule-delay", type=float, default=defaults.schedule_delay)
+    parser.add_argument(
+        "--dependency-ratio",
+        type=float,
+        default=defaults.dependency_ratio,
+        help="share of fan-out / fan-in groups among enqueued units",
+    )
+    parser.add_argument(
+        "--fan-out",
+        type=int,
+        default=defaults.fan_out,
+        help="dependents of one job in a fan-out group",
+    )
+    parser.add_argument(
+        "--fan-in",
+        type=int,
+        default=defaults.fan_in,
+        help="dependencies of one job in a fan-in group",
+    )
+    parser.add_argument(
+        "--callbacks",
+        action="store_true",
+        help="attach success and failure callbacks to every job",
+    )
+    parser.add_argument("--queue", dest="queue_name", default=defaults.queue_name)
+    parser.add_argument(
+        "--redis-url", help="Redis to use, an in-process fakeredis by default"
+    )
+    parser.add_argument(
+        "--option",
+        dest="instrument_options",
+        type=parse_option,
+        action="append",
+        default=[],
+        help="keyword argument of `RQInstrumentor().instrument`, as key=value",
+    )
+    parser.add_argument(
+        "--no-instrument",
+        dest="instrument",
+        action="store_false",
+        help="run without instrumentation, reporting throughput only",
+    )
+    parser.add_argument("--timeout", type=float, default=defaults.timeout)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--json", action="store_true", help="print a JSON report")
+    return parser
+
+
+def get_connection_factory(
+    config: LoadConfig, parser: argparse.ArgumentParser
+) -> Callable[[], Redis]:
+    """Connections to `--redis-url`, or to an in-process fakeredis otherwise"""
+    if config.redis_url:
+        return lambda: Redis.from_url(config.redis_url)
+    if config.fork:
+        # fakeredis lives in the memory of this process, forks get a copy
+        parser.error("--fork needs --redis-url")
+
+    try:
+        import fakeredis
+    except ImportError:
+        parser.error("fakeredis is not installed, install it or give --redis-url")
+    server = fakeredis.FakeServer()
+    return lambda: fakeredis.FakeRedis(server=server)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = build_parser()
+    args = vars(parser.parse_args(argv))
+    output_json = args.pop("json")
+    options: Dict[str, Any] = {}
+    for option in args.pop("instrument_options"):
+        options.update(option)
+    config = LoadConfig(instrument_options=options, **args)
+
+    connection_factory = get_connection_factory(config, parser)
+    provider = TracerProvider()
+    trace.set_tracer_provider(provider)
+    if config.fork:
+        span_directory = tempfile.mkdtemp(prefix="loadgen-")
+        provider.add_span_processor(
+            SimpleSpanProcessor(SpanFileExporter(span_directory))
+        )
+    else:
+        exporter = InMemorySpanExporter()
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+    if config.instrument:
+        RQInstrumentor().instrument(**config.instrument_options)
+
+    generator = LoadGenerator(config, connection_factory)
+    wall_time = generator.run()
+    if config.fork:
+        spans: Sequence[Union[ReadableSpan, SpanRecord]] = read_span_files(
+            span_directory
+        )
+        shutil.rmtree(span_directory)
+    else:
+        spans = exporter.get_finished_spans()
+    result = report(config, generator, wall_time, spans)
+
+    print(json.dumps(result) if output_json else format_report(result))
+    return 0 if result["ended_jobs"] == result["jobs"] else 1
+
+
+if __name__ == "__main__":
+    # Run the importable module, so that jobs refer to its functions by name
+    # rather than through `__main__`
+    from opentelemetry_instrumentation_rq import loadgen
+
+    sys.exit(loadgen.main())
@@ -0,0 +1,91 @@
+"""Size of job payloads at enqueue time"""
+
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple, Union
+
+from opentelemetry import trace
+from opentelemetry.semconv._incubating.attributes import messaging_attributes
+
+from opentelemetry_instrumentation_rq import (
+    horse_metrics,
+    rq_attributes,
+    rq_metrics,
+    utils,
+)
+from opentelemetry_instrumentation_rq.instrumentor import SpanHook
+
+if TYPE_CHECKING:
+    from rq.job import Job
+    from rq.queue import Queue
+    from rq.worker import Worker
+
+_payload_sizes: ContextVar[Optional[Dict[str, int]]] = ContextVar(
+    "rq_payload_sizes", default=None
+)
+
+
+def capture_payload_sizes(
+    func: Callable, instance: "Job", args: Tuple, kwargs: Dict
+) -> Dict[str, Any]:
+    """Wrapper of `Job.to_dict`, measuring what rq serialized for the job hash
+
+    `job.data` is cached by rq once serialized, so reading it here does
+    not serialize the job a second time.
+    """
+    obj = func(*args, **kwargs)
+    sizes = _payload_sizes.get()
+    if sizes is not None:
+        sizes[messaging_attributes.MESSAGING_MESSAGE_BODY_SIZE] = len(instance.data)
+        if "meta" in obj:
+            sizes[rq_attributes.JOB_META_SIZE] = len(obj["meta"])
+    return obj
+
+
+class PayloadSizeHook(SpanHook):
+    """Set payload sizes on `publish` and `schedule` spans
+
+    Sizes measured by `capture_payload_sizes` while the job is saved are
+    set as `messaging.message.body.size` and `rq.job.meta.size`, and the
+    body size is recorded in a per-queue and per-function histogram.
+    """
+
+    def __init__(self):
+        meter = horse_metrics.get_meter(__name__)
+        self.body_size = meter.create_histogram(
+            name=rq_metrics.JOB_BODY_SIZE,
+            unit="By",
+            description="Size of the serialized job data at enqueue time",
+        )
+
+    def on_start(
+        self,
+        span: trace.Span,
+        rq_input: Dict[utils.RQElementName, Union["Job", "Queue", "Worker"]],
+    ) -> Any:
+        return _payload_sizes.set({})
+
+    def on_end(
+        self,
+        span: trace.Span,
+        rq_input: Dict[utils.RQElementName, Union["Job", "Queue", "Worker"]],
+        state: Any,
+        exception: Optional[BaseException],
+    ) -> None:
+        sizes = _payload_sizes.get()
+        _payload_sizes.reset(state)
+        if messaging_attributes.MESSAGING_MESSAGE_BODY_SIZE not in sizes:
+            return
+
+        span.set_attributes(sizes)
+
+        job: "Job" = rq_input.get(utils.RQElementName.JOB)
+        queue: Optional["Queue"] = rq_input.get(utils.RQElementName.QUEUE)
+        self.body_size.record(
+            sizes[messaging_attributes.MESSAGING_MESSAGE_BODY_SIZE],
+            {
+                messaging_attributes.MESSAGING_DESTINATION_NAME: (
+                    queue.name if queue else ""
+                ),
+                rq_attributes.JOB_FUNCTION: job.func_name,
+            },
+        )
@@ -0,0 +1,237 @@
+"""Resource usage of worker and work-horse processes, read from `/proc`"""
+
+import os
+import time
+import weakref
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Optional,
+    Tuple,
+)
+
+from opentelemetry import metrics
+from opentelemetry.semconv._incubating.attributes import process_attributes
+from opentelemetry.semconv._incubating.metrics import process_metrics
+
+from opentelemetry_instrumentation_rq import rq_attributes
+
+if TYPE_CHECKING:
+    from rq.worker import Worker
+
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+# Metrics are collected by several callbacks, each reading the same snapshot
+_SNAPSHOT_TTL = 1.0
+
+
+class ProcessSnapshot:
+    """Usage of a process, read from `/proc/<pid>`"""
+
+    __slots__ = (
+        "time",
+        "cpu_time",
+        "rss",
+        "threads",
+        "file_descriptors",
+        "voluntary_switches",
+        "involuntary_switches",
+    )
+
+    def __init__(self, pid: int):
+        self.time = time.monotonic()
+        with open(f"/proc/{pid}/stat", "rb") as stat:
+            # The command name may contain spaces, fields start after it
+            fields = stat.read().rsplit(b")", 1)[1].split()
+        self.cpu_time = (int(fields[11]) + int(fields[12])) / _CLOCK_TICKS
+        self.threads = int(fields[17])
+        self.rss = int(fields[21]) * _PAGE_SIZE
+        self.file_descriptors = len(os.listdir(f"/proc/{pid}/fd"))
+
+        self.voluntary_switches = self.involuntary_switches = 0
+        with open(f"/proc/{pid}/status", "rb") as status:
+            for line in status:
+                if line.startswith(b"voluntary_ctxt_switches:"):
+                    self.voluntary_switches = int(line.split()[1])
+                elif line.startswith(b"nonvoluntary_ctxt_switches:"):
+                    self.involuntary_switches = int(line.split()[1])
+
+
+class ProcessMetrics:
+    """Observable gauges of worker processes and their current work-horse
+
+    Workers are registered by `Worker.register_birth`. At collection time,
+    CPU utilisation, RSS, open file descriptors, threads and context
+    switches of each worker process and of its work-horse are read from
+    `/proc`, labelled by worker name, queues and process role. Context
+    switches of a work-horse add up to those of the previous horses of
+    the worker, as last observed, so that the counter never decreases.
+    Nothing is read on the job path, and nothing is reported on systems
+    without `/proc`.
+    """
+
+    def __init__(self):
+        # Workers started in this process, with the pid they run in
+        self._workers: "weakref.WeakKeyDictionary[Worker, int]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._snapshots: Dict[int, ProcessSnapshot] = {}
+        # Previous CPU time per pid, for the utilisation between collections
+        self._cpu_times: Dict[int, Tuple[float, float]] = {}
+        # Per context switches series, the pid it last observed, the switches
+        # of its previous processes and those last observed
+        self._context_switches: Dict[FrozenSet, Tuple[int, int, int]] = {}
+
+        meter = metrics.get_meter(__name__)
+        meter.create_observable_gauge(
+            name=process_metrics.PROCESS_CPU_UTILIZATION,
+            callbacks=[self.observe_cpu_utilization],
+            unit="1",
+            description="CPU time over elapsed time and number of CPUs",
+        )
+        meter.create_observable_up_down_counter(
+            name=process_metrics.PROCESS_MEMORY_USAGE,
+            callbacks=[self.observe_memory_usage],
+            unit="By",
+            description="Resident set size of the process",
+        )
+        meter.create_observable_up_down_counter(
+            name=process_metrics.PROCESS_OPEN_FILE_DESCRIPTOR_COUNT,
+            callbacks=[self.observe_file_descriptors],
+            unit="{file_descriptor}",
+            description="File descriptors open by the process",
+        )
+        meter.create_observable_up_down_counter(
+            name=process_metrics.PROCESS_THREAD_COUNT,
+            callbacks=[self.observe_threads],
+            unit="{thread}",
+            description="Threads of the process",
+        )
+        meter.create_observable_counter(
+            name=process_metrics.PROCESS_CONTEXT_SWITCHES,
+            callbacks=[self.observe_context_switches],
+            unit="{context_switch}",
+            description="Context switches of the process",
+        )
+
+    def register_birth(
+        self, func: Callable, instance: "Worker", args: Tuple, kwargs: Dict
+    ) -> Any:
+        """Wrapper of `Worker.register_birth`"""
+        response = func(*args, **kwargs)
+        self._workers[instance] = os.getpid()
+        return response
+
+    def register_death(
+        self, func: Callable, instance: "Worker", args: Tuple, kwargs: Dict
+    ) -> Any:
+        """Wrapper of `Worker.register_death`"""
+        self._workers.pop(instance, None)
+        return func(*args, **kwargs)
+
+    def snapshots(self) -> Iterable[Tuple[int, ProcessSnapshot, Dict[str, Any]]]:
+        """Snapshots of worker and work-horse processes with their attributes"""
+        pid = os.getpid()
+        process_ids = set()
+        for worker, worker_pid in list(self._workers.items()):
+            # Work-horses inherit the workers of their parent
+            if worker_pid != pid:
+                continue
+
+            attributes = {
+                rq_attributes.WORKER_NAME: worker.name,
+                rq_attributes.WORKER_QUEUES: ",".join(worker.queue_names()),
+            }
+            for role, process_id in (
+                ("worker", worker_pid),
+                ("horse", worker.horse_pid),
+            ):
+                if not process_id:
+                    continue
+                process_ids.add(process_id)
+                snapshot = self._get_snapshot(process_id)
+                if snapshot is not None:
+                    yield process_id, snapshot, {
+                        **attributes,
+                        rq_attributes.PROCESS_ROLE: role,
+                    }
+
+        # Forget work-horses of previous jobs
+        for process_id in set(self._snapshots) - process_ids:
+            del self._snapshots[process_id]
+        for process_id in set(self._cpu_times) - process_ids:
+            del self._cpu_times[process_id]
+
+    def _get_snapshot(self, pid: int) -> Optional[ProcessSnapshot]:
+        snapshot = self._snapshots.get(pid)
+        if snapshot is not None and time.monotonic() - snapshot.time < _SNAPSHOT_TTL:
+            return snapshot
+
+        try:
+            snapshot = ProcessSnapshot(pid)
+        except (OSError, IndexError, ValueError):
+            # Process exited, or no `/proc`
+            return None
+        self._snapshots[pid] = snapshot
+        return snapshot
+
+    def observe_cpu_utilization(
+        self, options: metrics.CallbackOptions
+    ) -> Iterable[metrics.Observation]:
+        cpu_count = os.cpu_count() or 1
+        for pid, snapshot, attributes in self.snapshots():
+            previous = self._cpu_times.get(pid)
+            self._cpu_times[pid] = (snapshot.time, snapshot.cpu_time)
+            if previous is None or snapshot.time <= previous[0]:
+                continue
+            yield metrics.Observation(
+                (snapshot.cpu_time - previous[1])
+                / (snapshot.time - previous[0])
+                / cpu_count,
+                attributes,
+            )
+
+    def observe_memory_usage(
+        self, options: metrics.CallbackOptions
+    ) -> Iterable[metrics.Observation]:
+        for _, snapshot, attributes in self.snapshots():
+            yield metrics.Observation(snapshot.rss, attributes)
+
+    def observe_file_descriptors(
+        self, options: metrics.CallbackOptions
+    ) -> Iterable[metrics.Observation]:
+        for _, snapshot, attributes in self.snapshots():
+            yield metrics.Observation(snapshot.file_descriptors, attributes)
+
+    def observe_threads(
+        self, options: metrics.CallbackOptions
+    ) -> Iterable[metrics.Observation]:
+        for _, snapshot, attributes in self.snapshots():
+            yield metrics.Observation(snapshot.threads, attributes)
+
+    def observe_context_switches(
+        self, options: metrics.CallbackOptions
+    ) -> Iterable[metrics.Observation]:
+        for pid, snapshot, attributes in self.snapshots():
+            for switch_type, value in (
+                ("voluntary", snapshot.voluntary_switches),
+                ("involuntary", snapshot.involuntary_switches),
+            ):
+                series_attributes = {
+                    **attributes,
+                    process_attributes.PROCESS_CONTEXT_SWITCH_TYPE: switch_type,
+                }
+                # Every work-horse starts from zero, the counter adds its
+                # switches to those of the previous horses of the worker
+                key = frozenset(series_attributes.items())
+                last_pid, base, last_value = self._context_switches.get(
+                    key, (pid, 0, 0)
+                )
+                if pid != last_pid:
+                    base += last_value
+                self._context_switches[key] = (pid, base, value)
+                yield metrics.Observation(base + value, series_attributes)
@@ -0,0 +1,316 @@
+"""Per-queue load of producers and workers, as signals for autoscalers"""
+
+import collections
+import os
+import threading
+import time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from opentelemetry import metrics, trace
+from opentelemetry.semconv._incubating.attributes import messaging_attributes
+from redis.exceptions import RedisError
+
+from opentelemetry_instrumentation_rq import rq_metrics, utils
+from opentelemetry_instrumentation_rq.instrumentor import SpanHook
+
+if TYPE_CHECKING:
+    from rq.job import Job
+    from rq.queue import Queue
+    from rq.worker import Worker
+
+# Signals are observed by several callbacks, each reading the same sample
+_SIGNALS_TTL = 1.0
+
+
+class _Sample(NamedTuple):
+    time: float
+    arrivals: int
+    completions: int
+    busy_time: float
+    backlog: Optional[int]
+
+
+class _QueueLoad:
+    """Cumulative counters of a queue in this process"""
+
+    __slots__ = (
+        "queue_name",
+        "queue",
+        "arrivals",
+        "completions",
+        "in_flight",
+        "start_times",
+        "busy_time",
+        "samples",
+    )
+
+    def __init__(self, queue_name: str):
+        self.queue_name = queue_name
+        # Set once a worker of this process started on the queue
+        self.queue: Optional["Queue"] = None
+        self.arrivals = 0
+        self.completions = 0
+        self.in_flight = 0
+        # Sum of the start times of jobs in flight
+        self.start_times = 0.0
+        self.busy_time = 0.0
+        self.samples: Deque[_Sample] = collections.deque()
+
+    def get_busy_time(self, now: float) -> float:
+        return self.busy_time + self.in_flight * now - self.start_times
+
+
+class QueueLoads:
+    """Load of every queue seen by this process
+
+    Counters are only incremented on the job path, under a lock held for
+    a few attribute updates. Rates are derived from them at collection
+    time.
+    """
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self.lock = threading.Lock()
+        self.queues: Dict[str, _QueueLoad] = {}
+
+    def get(self, queue_name: str) -> _QueueLoad:
+        """Load of a queue, the lock must be held"""
+        load = self.queues.get(queue_name)
+        if load is None:
+            load = self.queues[queue_name] = _QueueLoad(queue_name)
+        return load
+
+
+_queue_loads: Optional[QueueLoads] = None
+
+
+def get_queue_loads() -> QueueLoads:
+    """Loads of this process, not those inherited by a work-horse"""
+    global _queue_loads
+    if _queue_loads is None or _queue_loads.pid != os.getpid():
+        _queue_loads = QueueLoads()
+    return _queue_loads
+
+
+class ArrivalHook(SpanHook):
+    """Count jobs enqueued on `publish` spans"""
+
+    changes_state = True
+
+    def on_start(
+        self,
+        span: trace.Span,
+        rq_input: Dict[utils.RQElementName, Union["Job", "Queue", "Worker"]],
+    ) -> Any:
+        queue: Optional["Queue"] = rq_input.get(utils.RQElementName.QUEUE)
+        if queue is None:
+            return
+
+        loads = get_queue_loads()
+        with loads.lock:
+            loads.get(queue.name).arrivals += 1
+
+
+def register_queues(
+    func: Callable, instance: "Worker", args: Tuple, kwargs: Dict
+) -> Any:
+    """Wrapper of `Worker.register_birth`, so that idle workers report backlogs"""
+    response = func(*args, **kwargs)
+    loads = get_queue_loads()
+    with loads.lock:
+        for queue in instance.queues:
+            loads.get(queue.name).queue = queue
+    return response
+
+
+def track_execution(
+    func: Callable, instance: "Worker", args: Tuple, kwargs: Dict
+) -> Any:
+    """Wrapper of `Worker.execute_job`, in the worker rather than the horse"""
+    queue: "Queue" = kwargs.get("queue", args[1] if len(args) > 1 else None)
+    loads = get_queue_loads()
+    start_time = time.monotonic()
+    with loads.lock:
+        load = loads.get(queue.name)
+        load.queue = queue
+        load.in_flight += 1
+        load.start_times += start_time
+    try:
+        return func(*args, **kwargs)
+    finally:
+        end_time = time.monotonic()
+        with loads.lock:
+            load.in_flight -= 1
+            load.start_times -= start_time
+            load.busy_time += end_time - start_time
+            load.completions += 1
+
+
+class _Signals(NamedTuple):
+    arrival_rate: Optional[float]
+    service_rate: Optional[float]
+    utilization: Optional[float]
+    in_flight: Optional[int]
+    backlog: Optional[int]
+    time_to_drain: Optional[float]
+
+
+class QueueLoadMetrics:
+    """Observable gauges of the load of each queue, for autoscalers
+
+    Over a sliding `window`, producers report the rate of jobs they enqueue
+    per queue (`rq.queue.arrival_rate`), and workers the rate of jobs they
+    execute (`rq.queue.service_rate`), the fraction of time spent executing
+    them (`rq.queue.utilization`) and the jobs in flight
+    (`rq.queue.in_flight`). Workers also read the backlog of their queues
+    from Redis at collection time (`rq.queue.backlog`), and estimate the
+    time until it is drained (`rq.queue.time_to_drain`) from its trend over
+    the window, which accounts for every producer and worker. The time to
+    drain is 0 for an empty queue, and not reported while the backlog does
+    not decrease. Jobs enqueued by jobs running in a work-horse are left
+    out of the arrival rate, as horses do not export metrics.
+
+    Args:
+        window (float): Width (seconds) of the window rates are computed on
+    """
+
+    def __init__(self, window: float):
+        self.window = window
+        self._signals: Dict[str, _Signals] = {}
+        self._signals_time: Optional[float] = None
+
+        meter = metrics.get_meter(__name__)
+        meter.create_observable_gauge(
+            name=rq_metrics.QUEUE_ARRIVAL_RATE,
+            callbacks=[self._observer("arrival_rate")],
+            unit="{job}/s",
+            description="Jobs enqueued per second by this process",
+        )
+        meter.create_observable_gauge(
+            name=rq_metrics.QUEUE_SERVICE_RATE,
+            callbacks=[self._observer("service_rate")],
+            unit="{job}/s",
+            description="Jobs executed per second by this worker",
+        )
+        meter.create_observable_gauge(
+            name=rq_metrics.QUEUE_UTILIZATION,
+            callbacks=[self._observer("utilization")],
+            unit="1",
+            description="Fraction of time this worker spent executing jobs",
+        )
+        meter.create_observable_up_down_counter(
+            name=rq_metrics.QUEUE_IN_FLIGHT,
+            callbacks=[self._observer("in_flight")],
+            unit="{job}",
+            description="Jobs being executed by this worker",
+        )
+        meter.create_observable_up_down_counter(
+            name=rq_metrics.QUEUE_BACKLOG,
+            callbacks=[self._observer("backlog")],
+            unit="{job}",
+            description="Jobs waiting in the queue",
+        )
+        meter.create_observable_gauge(
+            name=rq_metrics.QUEUE_TIME_TO_DRAIN,
+            callbacks=[self._observer("time_to_drain")],
+            unit="s",
+            description="Estimated time until the queue is empty",
+        )
+
+    def _observer(
+        self, signal: str
+    ) -> Callable[[metrics.CallbackOptions], Iterable[metrics.Observation]]:
+        def observe(options: metrics.CallbackOptions) -> Iterable[metrics.Observation]:
+            for queue_name, signals in self.get_signals().items():
+                value = getattr(signals, signal)
+                if value is not None:
+                    yield metrics.Observation(
+                        value,
+                        {messaging_attributes.MESSAGING_DESTINATION_NAME: queue_name},
+                    )
+
+        return observe
+
+    def get_signals(self) -> Dict[str, _Signals]:
+        """Signals of every queue, sampled at most once per collection"""
+        now = time.monotonic()
+        if self._signals_time is not None and now - self._signals_time < _SIGNALS_TTL:
+            return self._signals
+
+        loads = get_queue_loads()
+        with loads.lock:
+            samples = [
+                (
+                    load,
+                    _Sample(
+                        now,
+                        load.arrivals,
+                        load.completions,
+                        load.get_busy_time(now),
+                        None,
+                    ),
+                    load.in_flight,
+                )
+                for load in loads.queues.values()
+            ]
+
+        self._signals = {}
+        for load, sample, in_flight in samples:
+            if load.queue is not None:
+                try:
+                    sample = sample._replace(backlog=load.queue.count)
+                except RedisError:
+                    pass
+            self._signals[load.queue_name] = self._get_queue_signals(
+                load, sample, in_flight
+            )
+        self._signals_time = now
+        return self._signals
+
+    def _get_queue_signals(
+        self, load: _QueueLoad, sample: _Sample, in_flight: int
+    ) -> _Signals:
+        samples = load.samples
+        samples.append(sample)
+        # The oldest sample kept is the last one before the window
+        while len(samples) > 2 and samples[1].time <= sample.time - self.window:
+            samples.popleft()
+
+        base = samples[0]
+        elapsed = sample.time - base.time
+        is_worker = load.queue is not None
+        arrival_rate = service_rate = utilization = drain_rate = None
+        if elapsed > 0:
+            if sample.arrivals:
+                arrival_rate = (sample.arrivals - base.arrivals) / elapsed
+            if is_worker:
+                service_rate = (sample.completions - base.completions) / elapsed
+                utilization = (sample.busy_time - base.busy_time) / elapsed
+            if sample.backlog is not None and base.backlog is not None:
+                drain_rate = (base.backlog - sample.backlog) / elapsed
+
+        time_to_drain = None
+        if sample.backlog == 0:
+            time_to_drain = 0.0
+        elif sample.backlog is not None and drain_rate is not None and drain_rate > 0:
+            time_to_drain = sample.backlog / drain_rate
+
+        return _Signals(
+            arrival_rate=arrival_rate,
+            service_rate=service_rate,
+            utilization=utilization,
+            in_flight=in_flight if is_worker else None,
+            backlog=sample.backlog,
+            time_to_drain=time_to_drain,
+        )
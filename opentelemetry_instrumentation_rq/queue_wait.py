@@ -0,0 +1,142 @@
+"""Time spent by jobs in Redis before being performed"""
+
+import time
+import weakref
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple, Union
+
+from opentelemetry import trace
+from opentelemetry.semconv._incubating.attributes import messaging_attributes
+
+from opentelemetry_instrumentation_rq import (
+    horse_metrics,
+    instrumentor,
+    rq_attributes,
+    rq_metrics,
+    utils,
+)
+from opentelemetry_instrumentation_rq.instrumentor import SpanHook
+
+if TYPE_CHECKING:
+    from rq.job import Job
+    from rq.queue import Queue
+    from rq.worker import Worker
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Time (ns) at which the worker dequeued the job, inherited by work-horses
+_dequeue_times: "weakref.WeakKeyDictionary[Job, int]" = weakref.WeakKeyDictionary()
+
+
+def _time_ns(value: datetime) -> int:
+    """Nanoseconds since epoch of a rq timestamp, naive in UTC for rq < 2"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    delta = value - _EPOCH
+    return (
+        delta.days * 86_400_000_000 + delta.seconds * 1_000_000 + delta.microseconds
+    ) * 1000
+
+
+def record_dequeue_time(
+    func: Callable, instance: "Worker", args: Tuple, kwargs: Dict
+) -> Any:
+    """Wrapper of `Worker.dequeue_job_and_maintain_ttl`"""
+    result = func(*args, **kwargs)
+    if result is not None:
+        job, _ = result
+        _dequeue_times[job] = time.time_ns()
+    return result
+
+
+class QueueWaitHook(SpanHook):
+    """Queue-wait of the job on the `consume` span
+
+    The wait goes from `job.enqueued_at` to `job.started_at`, both stored
+    by rq, and is split at the time the worker dequeued the job: waiting
+    in the queue, then dispatch to the work-horse. Timestamps come from
+    the clocks of the producer and the worker, which must be in sync.
+    The wait is recorded in the `rq.job.queue_wait.duration` histogram per
+    queue and function, and optionally as a `queue_wait` span beside the
+    `consume` span.
+
+    Args:
+        emit_span (bool): Emit a `queue_wait` span covering the wait
+    """
+
+    def __init__(self, emit_span: bool = False):
+        self.emit_span = emit_span
+        self.duration = horse_metrics.get_meter(__name__).create_histogram(
+            name=rq_metrics.JOB_QUEUE_WAIT_DURATION,
+            unit="s",
+            description="Time from enqueueing a job until a worker starts it",
+        )
+
+    def on_end(
+        self,
+        span: trace.Span,
+        rq_input: Dict[utils.RQElementName, Union["Job", "Queue", "Worker"]],
+        state: Any,
+        exception: Optional[BaseException],
+    ) -> None:
+        job: "Job" = rq_input.get(utils.RQElementName.JOB)
+        queue: Optional["Queue"] = rq_input.get(utils.RQElementName.QUEUE)
+        dequeued = _dequeue_times.pop(job, None)
+        if not job.enqueued_at or not job.started_at:
+            return
+
+        enqueued = _time_ns(job.enqueued_at)
+        started = _time_ns(job.started_at)
+        attributes = {
+            rq_attributes.JOB_QUEUE_WAIT_DURATION: (started - enqueued) / 1e9,
+        }
+        if dequeued is not None and enqueued <= dequeued <= started:
+            attributes[rq_attributes.JOB_QUEUE_WAIT_IN_QUEUE] = (
+                dequeued - enqueued
+            ) / 1e9
+            attributes[rq_attributes.JOB_QUEUE_WAIT_DISPATCH] = (
+                started - dequeued
+            ) / 1e9
+        span.set_attributes(attributes)
+
+        metric_attributes = {
+            messaging_attributes.MESSAGING_DESTINATION_NAME: (
+                queue.name if queue else job.origin
+            ),
+            rq_attributes.JOB_FUNCTION: job.func_name,
+        }
+        self.duration.record(
+            attributes[rq_attributes.JOB_QUEUE_WAIT_DURATION], metric_attributes
+        )
+
+        if self.emit_span and span.is_recording():
+            self.record_span(span, job, enqueued, started, attributes)
+
+    def record_span(
+        self,
+        consume_span: trace.Span,
+        job: "Job",
+        enqueued: int,
+        started: int,
+        attributes: Dict[str, Any],
+    ):
+        """Emit the `queue_wait` span, sibling of the `consume` span"""
+        tracer = trace.get_tracer(instrumentor.__name__)
+        parent = (
+            trace.set_span_in_context(trace.NonRecordingSpan(consume_span.parent))
+            if consume_span.parent
+            else None
+        )
+        wait_span = tracer.start_span(
+            f"queue_wait {job.origin}",
+            context=parent,
+            kind=trace.SpanKind.INTERNAL,
+            attributes={
+                messaging_attributes.MESSAGING_DESTINATION_NAME: job.origin,
+                rq_attributes.JOB_ID: job.id,
+                rq_attributes.JOB_FUNCTION: job.func_name,
+                **attributes,
+            },
+            start_time=enqueued,
+        )
+        wait_span.end(end_time=started)
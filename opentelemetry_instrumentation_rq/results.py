@@ -0,0 +1,120 @@
+"""Instrumentation of job result persistence on success"""
+
+import time
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+from opentelemetry import trace
+
+from opentelemetry_instrumentation_rq import horse_metrics, rq_attributes, rq_metrics
+
+if TYPE_CHECKING:
+    from rq.job import Job
+    from rq.results import Result
+    from rq.worker import Worker
+
+
+class _ResultSave:
+    """Result saved by the current `Worker.handle_job_success` call"""
+
+    __slots__ = ("start_time", "sizes")
+
+    def __init__(self):
+        self.start_time: Optional[float] = None
+        self.sizes: List[int] = []
+
+
+_result_save: ContextVar[Optional[_ResultSave]] = ContextVar(
+    "rq_result_save", default=None
+)
+_result_sizes: ContextVar[Optional[List[int]]] = ContextVar(
+    "rq_result_sizes", default=None
+)
+
+
+class ResultPersistenceInstrumentation:
+    """Size and save latency of job results
+
+    `Job._handle_success` only queues the result on the pipeline of
+    `Worker.handle_job_success`, which executes it. The save is timed from
+    the last `Job._handle_success` call, rq retrying after a `WatchError`,
+    until `Worker.handle_job_success` returns. The serialized return
+    value is measured where rq produces it: in `Result.serialize` for
+    Redis with streams, or in `Job.to_dict` for the legacy `result` field
+    of the job hash. Both are set on the current (`handle_job_success`)
+    span and recorded in per-function histograms.
+    """
+
+    def __init__(self):
+        meter = horse_metrics.get_meter(__name__)
+        self.result_size = meter.create_histogram(
+            name=rq_metrics.JOB_RESULT_SIZE,
+            unit="By",
+            description="Size of the serialized return value saved for a job",
+        )
+        self.save_duration = meter.create_histogram(
+            name=rq_metrics.JOB_RESULT_SAVE_DURATION,
+            unit="s",
+            description="Time spent saving the result of a successful job",
+        )
+
+    def handle_job_success(
+        self, func: Callable, instance: "Worker", args: Tuple, kwargs: Dict
+    ) -> Any:
+        """Wrapper of `Worker.handle_job_success`"""
+        job: "Job" = kwargs.get("job", args[0] if args else None)
+        save = _ResultSave()
+        token = _result_save.set(save)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            end_time = time.perf_counter()
+            _result_save.reset(token)
+            # Results are not saved with a `result_ttl` of 0
+            if save.start_time is not None:
+                self._record(job, end_time - save.start_time, save.sizes)
+
+    def handle_success(
+        self, func: Callable, instance: "Job", args: Tuple, kwargs: Dict
+    ) -> Any:
+        """Wrapper of `Job._handle_success`"""
+        save = _result_save.get()
+        if save is None:
+            return func(*args, **kwargs)
+
+        save.start_time = time.perf_counter()
+        save.sizes = []
+        token = _result_sizes.set(save.sizes)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _result_sizes.reset(token)
+
+    def _record(self, job: "Job", duration: float, sizes: List[int]):
+        span = trace.get_current_span()
+        attributes = {rq_attributes.JOB_FUNCTION: job.func_name}
+        span.set_attribute(rq_attributes.JOB_RESULT_SAVE_DURATION, duration)
+        self.save_duration.record(duration, attributes)
+        if sizes:
+            span.set_attribute(rq_attributes.JOB_RESULT_SIZE, sizes[-1])
+            self.result_size.record(sizes[-1], attributes)
+
+    def serialize(
+        self, func: Callable, instance: "Result", args: Tuple, kwargs: Dict
+    ) -> Dict[str, Any]:
+        """Wrapper of `Result.serialize`"""
+        data = func(*args, **kwargs)
+        sizes = _result_sizes.get()
+        if sizes is not None:
+            sizes.append(len(data.get("return_value", "")))
+        return data
+
+    def to_dict(
+        self, func: Callable, instance: "Job", args: Tuple, kwargs: Dict
+    ) -> Dict[str, Any]:
+        """Wrapper of `Job.to_dict`, for the legacy result in the job hash"""
+        obj = func(*args, **kwargs)
+        sizes = _result_sizes.get()
+        if sizes is not None and "result" in obj:
+            sizes.append(len(obj["result"]))
+        return obj
@@ -0,0 +1,95 @@
+"""Retry-aware tracing of job attempts"""
+
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple, Union
+
+from opentelemetry import trace
+from opentelemetry.semconv._incubating.attributes import messaging_attributes
+from opentelemetry.trace.propagation.tracecontext import TraceContextTextMapPropagator
+
+from opentelemetry_instrumentation_rq import (
+    horse_metrics,
+    rq_attributes,
+    rq_metrics,
+    utils,
+)
+from opentelemetry_instrumentation_rq.instrumentor import SpanHook
+
+if TYPE_CHECKING:
+    from rq.job import Job
+    from rq.queue import Queue
+    from rq.worker import Worker
+
+# Keys in `job.meta`, saved along with the job when rq retries it
+ATTEMPT_META_KEY = "rq.job.attempt"
+PREVIOUS_ATTEMPT_META_KEY = "rq.job.previous_attempt"
+
+
+class RetryHook(SpanHook):
+    """Attempt index, retries left and link to the previous attempt
+
+    The attempt index and the context of the `consume` span are kept in
+    `job.meta`, which rq saves when it requeues or reschedules the job
+    for retry. The next attempt links its `consume` span to the previous
+    one.
+    """
+
+    changes_state = True
+
+    def __init__(self):
+        self.propagator = TraceContextTextMapPropagator()
+
+    def on_start(
+        self,
+        span: trace.Span,
+        rq_input: Dict[utils.RQElementName, Union["Job", "Queue", "Worker"]],
+    ) -> Any:
+        job: "Job" = rq_input.get(utils.RQElementName.JOB)
+        attempt = job.meta.get(ATTEMPT_META_KEY, 0) + 1
+
+        previous_attempt = job.meta.get(PREVIOUS_ATTEMPT_META_KEY)
+        if previous_attempt:
+            previous_context = trace.get_current_span(
+                self.propagator.extract(carrier=previous_attempt)
+            ).get_span_context()
+            # Not linked when the carrier was lost or altered in `job.meta`
+            if previous_context.is_valid:
+                span.add_link(
+                    previous_context, {rq_attributes.JOB_ATTEMPT: attempt - 1}
+                )
+
+        span.set_attribute(rq_attributes.JOB_ATTEMPT, attempt)
+        if job.retries_left is not None:
+            span.set_attribute(rq_attributes.JOB_RETRIES_LEFT, job.retries_left)
+
+        carrier: Dict[str, str] = {}
+        self.propagator.inject(carrier, context=trace.set_span_in_context(span))
+        job.meta[ATTEMPT_META_KEY] = attempt
+        job.meta[PREVIOUS_ATTEMPT_META_KEY] = carrier
+
+
+class RetryCounter:
+    """Wrapper of `Job.retry`, counting retries per function and queue"""
+
+    def __init__(self):
+        meter = horse_metrics.get_meter(__name__)
+        self.retries = meter.create_counter(
+            name=rq_metrics.JOB_RETRIES,
+            unit="{retry}",
+            description="Failed jobs requeued or rescheduled for retry",
+        )
+
+    def __call__(
+        self, func: Callable, instance: "Job", args: Tuple, kwargs: Dict
+    ) -> Any:
+        queue: Optional["Queue"] = kwargs.get("queue", args[0] if args else None)
+        response = func(*args, **kwargs)
+        self.retries.add(
+            1,
+            {
+                messaging_attributes.MESSAGING_DESTINATION_NAME: (
+                    queue.name if queue else instance.origin
+                ),
+                rq_attributes.JOB_FUNCTION: instance.func_name,
+            },
+        )
+        return response
@@ -12,3 +12,251 @@ JOB_ID: Final = "rq.job.id"
 The function name that associated with the job
 """
 JOB_FUNCTION: Final = "rq.job.function"
+
+
+"""
+Net bytes allocated while performing the job, only set for sampled jobs
+"""
+JOB_ALLOCATION_NET_BYTES: Final = "rq.job.allocation.net_bytes"
+
+
+"""
+Top allocation sites while performing the job, only set for sampled jobs
+"""
+JOB_ALLOCATION_TOP_SITES: Final = "rq.job.allocation.top_sites"
+
+
+"""
+Why the job was kept by `TailSamplingSpanProcessor`, set on the `consume` span
+"""
+SAMPLING_DECISION: Final = "rq.sampling.decision"
+
+
+"""
+Spans of the job dropped by `TailSamplingSpanProcessor` beyond its `max_spans_per_job`
+"""
+SAMPLING_DROPPED_SPANS: Final = "rq.sampling.dropped_spans"
+
+
+"""
+Seconds spent creating the event loop of a coroutine job, before the coroutine starts
+"""
+JOB_ASYNCIO_LOOP_SETUP_DURATION: Final = "rq.job.asyncio.loop_setup_duration"
+
+
+"""
+Seconds spent awaiting the coroutine of a coroutine job
+"""
+JOB_ASYNCIO_COROUTINE_DURATION: Final = "rq.job.asyncio.coroutine_duration"
+
+
+"""
+Largest event loop lag (seconds) observed while the coroutine job runs, only set
+when the loop monitor is enabled
+"""
+JOB_ASYNCIO_LOOP_MAX_LAG: Final = "rq.job.asyncio.loop_max_lag"
+
+
+"""
+Number of event loop stalls longer than the stall threshold, only set when the
+loop monitor is enabled
+"""
+JOB_ASYNCIO_LOOP_STALLS: Final = "rq.job.asyncio.loop_stalls"
+
+
+"""
+Name of the `WorkerPool` managing the worker
+"""
+WORKER_POOL_NAME: Final = "rq.worker_pool.name"
+
+
+"""
+Name of a worker started or reaped by a `WorkerPool`
+"""
+WORKER_NAME: Final = "rq.worker.name"
+
+
+"""
+Whether the worker is started to replace a dead one
+"""
+WORKER_POOL_RESTART: Final = "rq.worker_pool.restart"
+
+
+"""
+Size in bytes of the serialized return value saved for the job
+"""
+JOB_RESULT_SIZE: Final = "rq.job.result.size"
+
+
+"""
+Seconds spent saving the job result, set on the `handle_job_success` span
+"""
+JOB_RESULT_SAVE_DURATION: Final = "rq.job.result.save_duration"
+
+
+"""
+Size in bytes of the serialized job meta, set on `publish` and `schedule` spans
+"""
+JOB_META_SIZE: Final = "rq.job.meta.size"
+
+
+"""
+Seconds spent serializing the job (data and meta) while publishing it
+"""
+SERIALIZER_DUMPS_DURATION: Final = "rq.serializer.dumps.duration"
+
+
+"""
+Bytes produced by the serializer while publishing the job
+"""
+SERIALIZER_DUMPS_SIZE: Final = "rq.serializer.dumps.size"
+
+
+"""
+Seconds spent deserializing the job data in the worker
+"""
+SERIALIZER_LOADS_DURATION: Final = "rq.serializer.loads.duration"
+
+
+"""
+Bytes of job data deserialized in the worker
+"""
+SERIALIZER_LOADS_SIZE: Final = "rq.serializer.loads.size"
+
+
+"""
+Serializer operation of serializer metrics, either `dumps` or `loads`
+"""
+SERIALIZER_OPERATION: Final = "rq.serializer.operation"
+
+
+"""
+Attempt index of the job execution, starting from 1, set on the `consume` span
+"""
+JOB_ATTEMPT: Final = "rq.job.attempt"
+
+
+"""
+Retries left for the job when the attempt starts, set on the `consume` span
+"""
+JOB_RETRIES_LEFT: Final = "rq.job.retries_left"
+
+
+"""
+Signal which terminated the work-horse, set on `horse_killed` spans
+"""
+HORSE_SIGNAL: Final = "rq.horse.signal"
+
+
+"""
+Maximum resident set size (bytes) of the work-horse at its death
+"""
+HORSE_MAX_RSS: Final = "rq.horse.max_rss"
+
+
+"""
+Seconds from `job.enqueued_at` to `job.started_at`, set on the `consume` span
+"""
+JOB_QUEUE_WAIT_DURATION: Final = "rq.job.queue_wait.duration"
+
+
+"""
+Seconds from `job.enqueued_at` until a worker dequeued the job
+"""
+JOB_QUEUE_WAIT_IN_QUEUE: Final = "rq.job.queue_wait.in_queue"
+
+
+"""
+Seconds from dequeueing the job until `job.started_at`, e.g. forking the work-horse
+"""
+JOB_QUEUE_WAIT_DISPATCH: Final = "rq.job.queue_wait.dispatch"
+
+
+"""
+Dependents of the finished job checked by `Queue.enqueue_dependents`
+"""
+JOB_DEPENDENTS_CHECKED: Final = "rq.job.dependents.checked"
+
+
+"""
+Dependents enqueued because all of their dependencies are met
+"""
+JOB_DEPENDENTS_ENQUEUED: Final = "rq.job.dependents.enqueued"
+
+
+"""
+Dependents left deferred, waiting for other dependencies (or canceled)
+"""
+JOB_DEPENDENTS_DEFERRED: Final = "rq.job.dependents.deferred"
+
+
+"""
+Name of the rq group of the job, set on `enqueue group` and `consume` spans
+"""
+GROUP_ID: Final = "rq.group.id"
+
+
+"""
+Seconds from the first enqueue of the group until its last job ended
+"""
+GROUP_MAKESPAN: Final = "rq.group.makespan"
+
+
+"""
+Late heartbeats sent by the worker while the job was performed
+"""
+WORKER_HEARTBEAT_LATE_COUNT: Final = "rq.worker.heartbeat.late.count"
+
+
+"""
+Total lateness (seconds) of the late heartbeats sent while the job was performed
+"""
+WORKER_HEARTBEAT_LATE_DELAY: Final = "rq.worker.heartbeat.late.delay"
+
+
+"""
+Comma-separated names of the queues a worker listens on
+"""
+WORKER_QUEUES: Final = "rq.worker.queues"
+
+
+"""
+Role of a process of a worker, either `worker` or `horse`
+"""
+PROCESS_ROLE: Final = "rq.process.role"
+
+
+"""
+Time (seconds) spent in `os.fork` for the work-horse performing the job
+"""
+HORSE_FORK_DURATION: Final = "rq.horse.fork.duration"
+
+
+"""
+Time (seconds) from the fork of the work-horse until it started performing the job
+"""
+HORSE_TIME_TO_PERFORM: Final = "rq.horse.time_to_perform"
+
+
+"""
+SLO class of the job, given by its producer
+"""
+JOB_SLO: Final = "rq.job.slo"
+
+
+"""
+Time (seconds) left until the deadline of the job when enqueued or started, negative once past
+"""
+JOB_DEADLINE_REMAINING: Final = "rq.job.deadline.remaining"
+
+
+"""
+Time (seconds) left until the deadline of the job when it ended, negative once past
+"""
+JOB_DEADLINE_REMAINING_AT_END: Final = "rq.job.deadline.remaining_at_end"
+
+
+"""
+Whether the job ended after its deadline, set on the `consume` span
+"""
+JOB_SLO_VIOLATED: Final = "rq.job.slo_violated"
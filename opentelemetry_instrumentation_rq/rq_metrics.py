@@ -0,0 +1,170 @@
+"""RQ instrumentor metric names"""
+
+from typing import Final
+
+"""
+Net bytes allocated while performing a sampled job
+"""
+JOB_ALLOCATED_BYTES: Final = "rq.job.allocated_bytes"
+
+
+"""
+Workers started by a worker pool, including restarts
+"""
+WORKER_POOL_WORKER_STARTS: Final = "rq.worker_pool.worker.starts"
+
+
+"""
+Dead workers reaped by a worker pool
+"""
+WORKER_POOL_WORKER_DEATHS: Final = "rq.worker_pool.worker.deaths"
+
+
+"""
+Alive workers of a worker pool
+"""
+WORKER_POOL_WORKERS: Final = "rq.worker_pool.workers"
+
+
+"""
+Workers of a worker pool busy with a job
+"""
+WORKER_POOL_BUSY_WORKERS: Final = "rq.worker_pool.busy_workers"
+
+
+"""
+Busy workers over the expected number of workers of a worker pool
+"""
+WORKER_POOL_UTILIZATION: Final = "rq.worker_pool.utilization"
+
+
+"""
+Size of the serialized return value saved for a job
+"""
+JOB_RESULT_SIZE: Final = "rq.job.result.size"
+
+
+"""
+Time spent saving the result of a successful job
+"""
+JOB_RESULT_SAVE_DURATION: Final = "rq.job.result.save.duration"
+
+
+"""
+Size of the serialized job data (function and arguments) at enqueue time
+"""
+JOB_BODY_SIZE: Final = "rq.job.body.size"
+
+
+"""
+Time spent in the job serializer, by operation (`dumps` or `loads`)
+"""
+SERIALIZER_DURATION: Final = "rq.serializer.duration"
+
+
+"""
+Bytes produced or consumed by the job serializer, by operation
+"""
+SERIALIZER_SIZE: Final = "rq.serializer.size"
+
+
+"""
+Failed jobs requeued or rescheduled for retry
+"""
+JOB_RETRIES: Final = "rq.job.retries"
+
+
+"""
+Work-horses which exited abnormally, e.g. killed by timeout, OOM or SIGKILL
+"""
+HORSE_KILLED: Final = "rq.horse.killed"
+
+
+"""
+Time from enqueueing a job (`job.enqueued_at`) until a worker starts it
+"""
+JOB_QUEUE_WAIT_DURATION: Final = "rq.job.queue_wait.duration"
+
+
+"""
+Time spent releasing the dependents of a finished job (`Queue.enqueue_dependents`)
+"""
+JOB_DEPENDENTS_RELEASE_DURATION: Final = "rq.job.dependents.release.duration"
+
+
+"""
+Time from the first enqueue of a group until its last job ended
+"""
+GROUP_MAKESPAN: Final = "rq.group.makespan"
+
+
+"""
+Time between two heartbeats of a worker
+"""
+WORKER_HEARTBEAT_INTERVAL: Final = "rq.worker.heartbeat.interval"
+
+
+"""
+Time between two heartbeats of a worker over the TTL granted by the first one
+"""
+WORKER_HEARTBEAT_TTL_USAGE: Final = "rq.worker.heartbeat.ttl_usage"
+
+
+"""
+Lateness of heartbeats sent every `job_monitoring_interval` while a work-horse runs
+"""
+WORKER_HEARTBEAT_JITTER: Final = "rq.worker.heartbeat.jitter"
+
+
+"""
+Time spent by the worker in `os.fork` for a work-horse
+"""
+HORSE_FORK_DURATION: Final = "rq.horse.fork.duration"
+
+
+"""
+Time from the fork of a work-horse until it starts performing the job
+"""
+HORSE_TIME_TO_PERFORM: Final = "rq.horse.time_to_perform"
+
+
+"""
+Jobs which ended after their deadline
+"""
+JOB_SLO_VIOLATIONS: Final = "rq.job.slo.violations"
+
+
+"""
+Jobs enqueued per second on a queue by this process, over the load window
+"""
+QUEUE_ARRIVAL_RATE: Final = "rq.queue.arrival_rate"
+
+
+"""
+Jobs of a queue executed per second by this worker, over the load window
+"""
+QUEUE_SERVICE_RATE: Final = "rq.queue.service_rate"
+
+
+"""
+Fraction of the load window this worker spent executing jobs of a queue
+"""
+QUEUE_UTILIZATION: Final = "rq.queue.utilization"
+
+
+"""
+Jobs of a queue being executed by this worker
+"""
+QUEUE_IN_FLIGHT: Final = "rq.queue.in_flight"
+
+
+"""
+Jobs waiting in a queue, read by workers at collection time
+"""
+QUEUE_BACKLOG: Final = "rq.queue.backlog"
+
+
+"""
+Estimated time until a queue is empty, from the trend of its backlog over the load window
+"""
+QUEUE_TIME_TO_DRAIN: Final = "rq.queue.time_to_drain"
@@ -0,0 +1,364 @@
+"""Sampling components for rq jobs"""
+
+import logging
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from opentelemetry import context as context_api
+from opentelemetry import trace
+from opentelemetry.sdk.trace import ReadableSpan, Span, SpanProcessor
+from opentelemetry.sdk.trace.sampling import (
+    ALWAYS_ON,
+    Decision,
+    Sampler,
+    SamplingResult,
+)
+from opentelemetry.semconv._incubating.attributes import messaging_attributes
+from opentelemetry.util.types import Attributes
+
+from opentelemetry_instrumentation_rq import instrumentor, rq_attributes
+
+_logger = logging.getLogger(__name__)
+
+
+class TailSamplingDecision:
+    """Values of `rq.sampling.decision`"""
+
+    ERROR = "error"
+    SLOW = "slow"
+    BASELINE = "baseline"
+    EVICTED = "evicted"
+
+
+def _with_attributes(span: ReadableSpan, extra: Dict[str, Any]) -> ReadableSpan:
+    """Copy an ended span with more attributes"""
+    attributes = dict(span.attributes or {})
+    attributes.update(extra)
+    return ReadableSpan(
+        name=span.name,
+        context=span.context,
+        parent=span.parent,
+        resource=span.resource,
+        attributes=attributes,
+        events=span.events,
+        links=span.links,
+        kind=span.kind,
+        status=span.status,
+        start_time=span.start_time,
+        end_time=span.end_time,
+        instrumentation_scope=span.instrumentation_scope,
+    )
+
+
+def _is_consume_span(span: ReadableSpan) -> bool:
+    """Whether the span is the `consume` span created around `Worker.perform_job`
+
+    Other spans of the instrumentation may be consumers too, e.g. the
+    `horse_killed` span of the parent worker.
+    """
+    scope = span.instrumentation_scope
+    return (
+        scope is not None
+        and scope.name == instrumentor.__name__
+        and (span.attributes or {}).get(messaging_attributes.MESSAGING_OPERATION_NAME)
+        == "consume"
+    )
+
+
+class TailSamplingSpanProcessor(SpanProcessor):
+    """Buffer spans of a job in the worker and keep only interesting jobs
+
+    Spans belonging to the trace of an in-flight `consume` span (perform,
+    callbacks, handle_job_*...) are held back until the `consume` span
+    ends. The job is then kept when any of its spans failed, when it ran
+    longer than the threshold of its queue or function, or by a baseline
+    keep-rate; otherwise all of its spans are dropped. Kept jobs carry
+    `rq.sampling.decision` on their `consume` span.
+
+    Memory is bounded by `max_buffered_jobs` and `max_spans_per_job`. When
+    too many jobs are in flight, the oldest one is decided early with the
+    spans seen so far, and its remaining spans follow that decision. Spans
+    of a job beyond `max_spans_per_job` are dropped: the `consume` span of
+    a kept job then carries their number as `rq.sampling.dropped_spans`,
+    and a warning is logged the first time.
+
+    Args:
+        span_processor (SpanProcessor): Downstream processor receiving kept spans
+        keep_rate (float): Probability of keeping an uninteresting job
+        queue_duration_thresholds (Dict[str, float]): Slow thresholds (seconds)
+            by `messaging.destination.name`
+        function_duration_thresholds (Dict[str, float]): Slow thresholds
+            (seconds) by `rq.job.function`, preferred over queue thresholds
+        default_duration_threshold (Optional[float]): Slow threshold (seconds)
+            when neither function nor queue has one
+        max_buffered_jobs (int): Maximum number of jobs buffered at once
+        max_spans_per_job (int): Maximum number of spans buffered per job
+    """
+
+    def __init__(
+        self,
+        span_processor: SpanProcessor,
+        keep_rate: float = 0.0,
+        queue_duration_thresholds: Optional[Dict[str, float]] = None,
+        function_duration_thresholds: Optional[Dict[str, float]] = None,
+        default_duration_threshold: Optional[float] = None,
+        max_buffered_jobs: int = 1024,
+        max_spans_per_job: int = 256,
+    ):
+        self.span_processor = span_processor
+        self.keep_rate = keep_rate
+        self.queue_duration_thresholds = queue_duration_thresholds or {}
+        self.function_duration_thresholds = function_duration_thresholds or {}
+        self.default_duration_threshold = default_duration_threshold
+        self.max_buffered_jobs = max_buffered_jobs
+        self.max_spans_per_job = max_spans_per_job
+
+        self._lock = threading.Lock()
+        self._buffers: "OrderedDict[int, List[ReadableSpan]]" = OrderedDict()
+        # Decision and dropped spans of jobs decided before their end
+        self._evicted: "OrderedDict[int, Tuple[Optional[str], int]]" = OrderedDict()
+        # Spans dropped beyond `max_spans_per_job` by buffered job
+        self._dropped: Dict[int, int] = {}
+        self._warned = False
+
+    def on_start(
+        self, span: Span, parent_context: Optional[context_api.Context] = None
+    ) -> None:
+        if _is_consume_span(span):
+            evicted: Optional[List[ReadableSpan]] = None
+            with self._lock:
+                self._buffers.setdefault(span.context.trace_id, [])
+                if len(self._buffers) > self.max_buffered_jobs:
+                    evicted_trace_id, evicted = self._buffers.popitem(last=False)
+                    dropped = self._dropped.pop(evicted_trace_id, 0)
+            if evicted is not None:
+                decision = self._decide(evicted, None, dropped)
+                with self._lock:
+                    self._evicted[evicted_trace_id] = (decision, dropped)
+                    if len(self._evicted) > self.max_buffered_jobs:
+                        self._evicted.popitem(last=False)
+
+        self.span_processor.on_start(span, parent_context=parent_context)
+
+    def on_end(self, span: ReadableSpan) -> None:
+        trace_id = span.context.trace_id
+        dropped = 0
+        with self._lock:
+            buffer = self._buffers.get(trace_id)
+            if trace_id in self._evicted:
+                decision, dropped = self._evicted[trace_id]
+                if _is_consume_span(span):
+                    del self._evicted[trace_id]
+                if decision is None:
+                    return
+                if _is_consume_span(span):
+                    span = _with_attributes(
+                        span, self._get_attributes(decision, dropped)
+                    )
+            elif buffer is None:
+                pass
+            elif not _is_consume_span(span):
+                if len(buffer) < self.max_spans_per_job:
+                    buffer.append(span)
+                else:
+                    self._dropped[trace_id] = self._dropped.get(trace_id, 0) + 1
+                return
+            else:
+                del self._buffers[trace_id]
+                dropped = self._dropped.pop(trace_id, 0)
+
+        if buffer is None:
+            self.span_processor.on_end(span)
+        else:
+            self._decide(buffer, span, dropped)
+
+    def get_duration_threshold(self, span: ReadableSpan) -> Optional[float]:
+        """Slow threshold in seconds for the job of a `consume` span"""
+        attributes = span.attributes or {}
+        function_name = attributes.get(rq_attributes.JOB_FUNCTION)
+        if function_name in self.function_duration_thresholds:
+            return self.function_duration_thresholds[function_name]
+
+        queue_name = attributes.get(messaging_attributes.MESSAGING_DESTINATION_NAME)
+        if queue_name in self.queue_duration_thresholds:
+            return self.queue_duration_thresholds[queue_name]
+
+        return self.default_duration_threshold
+
+    def get_decision(
+        self, spans: List[ReadableSpan], consume_span: Optional[ReadableSpan]
+    ) -> Optional[str]:
+        """Decide whether a job is kept, `None` means dropped"""
+        if any(s.status.status_code == trace.StatusCode.ERROR for s in spans):
+            return TailSamplingDecision.ERROR
+
+        if consume_span is None:
+            return TailSamplingDecision.EVICTED if self._keep_by_rate() else None
+
+        threshold = self.get_duration_threshold(consume_span)
+        duration = (consume_span.end_time - consume_span.start_time) / 1e9
+        if threshold is not None and duration >= threshold:
+            return TailSamplingDecision.SLOW
+
+        if self._keep_by_rate():
+            return TailSamplingDecision.BASELINE
+        return None
+
+    def _keep_by_rate(self) -> bool:
+        return self.keep_rate > 0 and random.random() < self.keep_rate
+
+    def _decide(
+        self,
+        buffer: List[ReadableSpan],
+        consume_span: Optional[ReadableSpan],
+        dropped: int,
+    ) -> Optional[str]:
+        """Decide a job and hand kept spans to the downstream processor"""
+        spans = buffer + [consume_span] if consume_span else buffer
+        decision = self.get_decision(spans, consume_span)
+        if decision is None:
+            return None
+
+        if dropped and not self._warned:
+            self._warned = True
+            _logger.warning(
+                "Dropped %d spans of a kept job beyond max_spans_per_job=%d, "
+                "see rq.sampling.dropped_spans on consume spans",
+                dropped,
+                self.max_spans_per_job,
+            )
+        for span in buffer:
+            self.span_processor.on_end(span)
+        if consume_span:
+            self.span_processor.on_end(
+                _with_attributes(consume_span, self._get_attributes(decision, dropped))
+            )
+        return decision
+
+    @staticmethod
+    def _get_attributes(decision: str, dropped: int) -> Dict[str, Any]:
+        """Attributes of the `consume` span of a kept job"""
+        attributes: Dict[str, Any] = {rq_attributes.SAMPLING_DECISION: decision}
+        if dropped:
+            attributes[rq_attributes.SAMPLING_DROPPED_SPANS] = dropped
+        return attributes
+
+    def shutdown(self) -> None:
+        self.span_processor.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self.span_processor.force_flush(timeout_millis)
+
+
+class _TokenBucket:
+    """Token bucket refilled at `rate` tokens per second, up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last_refill = time.monotonic()
+
+    def try_acquire(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.last_refill) * self.rate
+        )
+        self.last_refill = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class RateLimitingSampler(Sampler):
+    """Cap sampled spans per queue and job function with token buckets
+
+    Each (`messaging.destination.name`, `rq.job.function`) pair has its own
+    bucket, so a noisy queue is capped at a fixed span rate while rare
+    queues stay fully traced. The attributes are set at span creation by
+    the rq instrumentation; spans without them are delegated to `fallback`.
+
+    Wrap it with `ParentBased` so that only producer spans (the trace
+    roots) are rate limited and the worker side follows their decision.
+
+    At most `max_buckets` buckets are kept: the least recently used one is
+    dropped for a new pair, and starts full again when that pair returns.
+
+    Args:
+        spans_per_second (float): Default rate per queue and function
+        queue_rates (Dict[str, float]): Rates by `messaging.destination.name`
+        function_rates (Dict[str, float]): Rates by `rq.job.function`,
+            preferred over queue rates
+        fallback (Sampler): Sampler for spans which are not rq jobs
+        max_buckets (int): Maximum number of buckets kept at once
+    """
+
+    def __init__(
+        self,
+        spans_per_second: float,
+        queue_rates: Optional[Dict[str, float]] = None,
+        function_rates: Optional[Dict[str, float]] = None,
+        fallback: Sampler = ALWAYS_ON,
+        max_buckets: int = 1024,
+    ):
+        self.spans_per_second = spans_per_second
+        self.queue_rates = queue_rates or {}
+        self.function_rates = function_rates or {}
+        self.fallback = fallback
+        self.max_buckets = max_buckets
+
+        self._lock = threading.Lock()
+        self._buckets: "OrderedDict[Tuple[str, str], _TokenBucket]" = OrderedDict()
+
+    def get_rate(self, queue_name: str, function_name: str) -> float:
+        """Spans per second allowed for a queue and job function"""
+        if function_name in self.function_rates:
+            return self.function_rates[function_name]
+        return self.queue_rates.get(queue_name, self.spans_per_second)
+
+    def should_sample(
+        self,
+        parent_context: Optional[context_api.Context],
+        trace_id: int,
+        name: str,
+        kind: Optional[trace.SpanKind] = None,
+        attributes: Attributes = None,
+        links: Optional[Sequence[trace.Link]] = None,
+        trace_state: Optional[trace.TraceState] = None,
+    ) -> SamplingResult:
+        attributes = attributes or {}
+        queue_name = attributes.get(messaging_attributes.MESSAGING_DESTINATION_NAME)
+        function_name = attributes.get(rq_attributes.JOB_FUNCTION)
+        if queue_name is None and function_name is None:
+            return self.fallback.should_sample(
+                parent_context, trace_id, name, kind, attributes, links, trace_state
+            )
+
+        key = (queue_name or "", function_name or "")
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                rate = self.get_rate(*key)
+                capacity = max(rate, 1.0) if rate > 0 else 0.0
+                bucket = self._buckets[key] = _TokenBucket(rate, capacity)
+                if len(self._buckets) > self.max_buckets:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+            sampled = bucket.try_acquire()
+
+        parent_trace_state = (
+            trace.get_current_span(parent_context).get_span_context().trace_state
+        )
+        if not sampled:
+            return SamplingResult(Decision.DROP, None, parent_trace_state)
+        return SamplingResult(
+            Decision.RECORD_AND_SAMPLE, attributes, parent_trace_state
+        )
+
+    def get_description(self) -> str:
+        return f"RateLimitingSampler{{{self.spans_per_second}}}"
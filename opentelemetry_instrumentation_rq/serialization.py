@@ -0,0 +1,166 @@
+"""Cost of the job serializer on both sides of the queue"""
+
+import time
+import weakref
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple, Union
+
+from opentelemetry import trace
+from opentelemetry.semconv._incubating.attributes import messaging_attributes
+
+from opentelemetry_instrumentation_rq import (
+    horse_metrics,
+    rq_attributes,
+    rq_metrics,
+    utils,
+)
+from opentelemetry_instrumentation_rq.instrumentor import SpanHook
+
+if TYPE_CHECKING:
+    from rq.job import Job
+    from rq.queue import Queue
+    from rq.worker import Worker
+
+# Deserialization cost by job, measured wherever rq deserializes the job
+# data (possibly before the `consume` span starts)
+_loads_costs: "weakref.WeakKeyDictionary[Job, Tuple[float, int]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+class TimedSerializer:
+    """Proxy of a rq serializer accumulating time and bytes of `dumps`"""
+
+    def __init__(self, serializer: Any):
+        self.serializer = serializer
+        self.dumps_duration = 0.0
+        self.dumps_size = 0
+
+    def dumps(self, *args, **kwargs) -> bytes:
+        started = time.perf_counter()
+        serialized = self.serializer.dumps(*args, **kwargs)
+        self.dumps_duration += time.perf_counter() - started
+        self.dumps_size += len(serialized)
+        return serialized
+
+    def loads(self, *args, **kwargs) -> Any:
+        return self.serializer.loads(*args, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.serializer, name)
+
+
+def time_deserialize_data(
+    func: Callable, instance: "Job", args: Tuple, kwargs: Dict
+) -> Any:
+    """Wrapper of `Job._deserialize_data`"""
+    started = time.perf_counter()
+    response = func(*args, **kwargs)
+    _loads_costs[instance] = (time.perf_counter() - started, len(instance.data))
+    return response
+
+
+class _SerializerCostHook(SpanHook):
+    def __init__(self):
+        meter = horse_metrics.get_meter(__name__)
+        self.duration = meter.create_histogram(
+            name=rq_metrics.SERIALIZER_DURATION,
+            unit="s",
+            description="Time spent in the job serializer",
+        )
+        self.size = meter.create_histogram(
+            name=rq_metrics.SERIALIZER_SIZE,
+            unit="By",
+            description="Bytes produced or consumed by the job serializer",
+        )
+
+    def record(
+        self,
+        operation: str,
+        duration: float,
+        size: int,
+        rq_input: Dict[utils.RQElementName, Union["Job", "Queue", "Worker"]],
+    ):
+        job: "Job" = rq_input.get(utils.RQElementName.JOB)
+        queue: Optional["Queue"] = rq_input.get(utils.RQElementName.QUEUE)
+        attributes = {
+            rq_attributes.SERIALIZER_OPERATION: operation,
+            messaging_attributes.MESSAGING_DESTINATION_NAME: (
+                queue.name if queue else ""
+            ),
+            rq_attributes.JOB_FUNCTION: job.func_name,
+        }
+        self.duration.record(duration, attributes)
+        self.size.record(size, attributes)
+
+
+class SerializationHook(_SerializerCostHook):
+    """Measure serialization of the job on `publish` and `schedule` spans
+
+    The job serializer is swapped for a `TimedSerializer` during the span,
+    so serialization of the job data and meta by rq is measured without
+    serializing anything twice.
+    """
+
+    def on_start(
+        self,
+        span: trace.Span,
+        rq_input: Dict[utils.RQElementName, Union["Job", "Queue", "Worker"]],
+    ) -> Any:
+        job: "Job" = rq_input.get(utils.RQElementName.JOB)
+        job.serializer = TimedSerializer(job.serializer)
+        return job.serializer
+
+    def on_end(
+        self,
+        span: trace.Span,
+        rq_input: Dict[utils.RQElementName, Union["Job", "Queue", "Worker"]],
+        state: Any,
+        exception: Optional[BaseException],
+    ) -> None:
+        timed_serializer: TimedSerializer = state
+        job: "Job" = rq_input.get(utils.RQElementName.JOB)
+        job.serializer = timed_serializer.serializer
+        if not timed_serializer.dumps_size:
+            return
+
+        span.set_attributes(
+            {
+                rq_attributes.SERIALIZER_DUMPS_DURATION: timed_serializer.dumps_duration,
+                rq_attributes.SERIALIZER_DUMPS_SIZE: timed_serializer.dumps_size,
+            }
+        )
+        self.record(
+            "dumps",
+            timed_serializer.dumps_duration,
+            timed_serializer.dumps_size,
+            rq_input,
+        )
+
+
+class DeserializationHook(_SerializerCostHook):
+    """Report deserialization of the job data on the `consume` span
+
+    rq deserializes the job data lazily, possibly before the span starts;
+    the cost measured by `time_deserialize_data` is reported at the end.
+    """
+
+    def on_end(
+        self,
+        span: trace.Span,
+        rq_input: Dict[utils.RQElementName, Union["Job", "Queue", "Worker"]],
+        state: Any,
+        exception: Optional[BaseException],
+    ) -> None:
+        job: "Job" = rq_input.get(utils.RQElementName.JOB)
+        cost = _loads_costs.pop(job, None)
+        if cost is None:
+            return
+
+        duration, size = cost
+        span.set_attributes(
+            {
+                rq_attributes.SERIALIZER_LOADS_DURATION: duration,
+                rq_attributes.SERIALIZER_LOADS_SIZE: size,
+            }
+        )
+        self.record("loads", duration, size, rq_input)
@@ -4,10 +4,6 @@ from dataclasses import dataclass
 from enum import Enum
 from typing import Any, Dict, Optional, Tuple
 
-from rq.job import Job
-from rq.queue import Queue
-from rq.worker import Worker
-
 
 def _extract_value_from_input(
     argument_name: str,
@@ -38,11 +34,25 @@ class RQElementName(Enum):
     WORKER = "worker"
 
 
-PREDEFINED_ELEMENT_TYPE_MAP = {
-    RQElementName.JOB: Job,
-    RQElementName.QUEUE: Queue,
-    RQElementName.WORKER: Worker,
-}
+def get_element_type(element_name: RQElementName) -> Any:
+    """Get the rq class of an element
+
+    rq modules are imported here, on first use, rather than at import time
+    """
+    if element_name == RQElementName.JOB:
+        from rq.job import Job
+
+        return Job
+    if element_name == RQElementName.QUEUE:
+        from rq.queue import Queue
+
+        return Queue
+    if element_name == RQElementName.WORKER:
+        from rq.worker import Worker
+
+        return Worker
+
+    return type(None)  # Avoid calling types other than predefined
 
 
 @dataclass(frozen=True)
@@ -58,9 +68,7 @@ def get_argument_info(element_name: RQElementName, position: int = 0):
     return ArgumentInfo(
         name=element_name,
         position=position,
-        type=PREDEFINED_ELEMENT_TYPE_MAP.get(
-            element_name, type(None)
-        ),  # Avoid calling types other than predefined
+        type=get_element_type(element_name),
     )
 
 
@@ -75,5 +83,5 @@ def get_instance_info(element_name: RQElementName) -> InstanceInfo:
 
     return InstanceInfo(
         name=element_name,
-        type=PREDEFINED_ELEMENT_TYPE_MAP.get(element_name, type(None)),
-    )  # Avoid calling types other than predefined
+        type=get_element_type(element_name),
+    )
@@ -0,0 +1,363 @@
+"""Instrumentation of `rq.worker_pool.WorkerPool` and span forwarding to its manager"""
+
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import weakref
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from opentelemetry import metrics, trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import Event, ReadableSpan
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+from opentelemetry.sdk.util.instrumentation import InstrumentationScope
+from opentelemetry.semconv._incubating.attributes import process_attributes
+from redis.exceptions import RedisError
+
+from opentelemetry_instrumentation_rq import rq_attributes, rq_metrics
+
+if TYPE_CHECKING:
+    from rq.worker_pool import WorkerData, WorkerPool
+
+_logger = logging.getLogger(__name__)
+
+# Busy workers are observed by several callbacks, each reading the same sample
+_BUSY_WORKERS_TTL = 1.0
+
+
+class WorkerPoolInstrumentation:
+    """Spans and metrics for the worker lifecycle of `WorkerPool`
+
+    `start_worker` and `handle_dead_worker` are traced and counted; workers
+    started while `check_workers` respawns dead ones are marked as restarts.
+    Observable gauges report alive workers, busy workers (read from the
+    worker state in Redis) and utilisation of every pool started in this
+    process.
+    """
+
+    def __init__(self):
+        self.tracer = trace.get_tracer(__name__)
+        self._pools: "weakref.WeakSet[WorkerPool]" = weakref.WeakSet()
+        self._respawning = False
+        self._busy_workers: "weakref.WeakKeyDictionary[WorkerPool, int]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._busy_workers_time: Optional[float] = None
+
+        meter = metrics.get_meter(__name__)
+        self.worker_starts = meter.create_counter(
+            name=rq_metrics.WORKER_POOL_WORKER_STARTS,
+            unit="{worker}",
+            description="Workers started by a worker pool, including restarts",
+        )
+        self.worker_deaths = meter.create_counter(
+            name=rq_metrics.WORKER_POOL_WORKER_DEATHS,
+            unit="{worker}",
+            description="Dead workers reaped by a worker pool",
+        )
+        meter.create_observable_gauge(
+            name=rq_metrics.WORKER_POOL_WORKERS,
+            callbacks=[self.observe_workers],
+            unit="{worker}",
+            description="Alive workers of a worker pool",
+        )
+        meter.create_observable_gauge(
+            name=rq_metrics.WORKER_POOL_BUSY_WORKERS,
+            callbacks=[self.observe_busy_workers],
+            unit="{worker}",
+            description="Workers of a worker pool busy with a job",
+        )
+        meter.create_observable_gauge(
+            name=rq_metrics.WORKER_POOL_UTILIZATION,
+            callbacks=[self.observe_utilization],
+            unit="1",
+            description="Busy workers over the expected number of workers",
+        )
+
+    def start_worker(
+        self, func: Callable, instance: "WorkerPool", args: Tuple, kwargs: Dict
+    ) -> Any:
+        """Wrapper of `WorkerPool.start_worker`"""
+        self._pools.add(instance)
+        attributes = {
+            rq_attributes.WORKER_POOL_NAME: instance.name,
+            rq_attributes.WORKER_POOL_RESTART: self._respawning,
+        }
+        with self.tracer.start_as_current_span(
+            "start_worker", attributes=attributes
+        ) as span:
+            known_workers = set(instance.worker_dict)
+            response = func(*args, **kwargs)
+            for name in set(instance.worker_dict) - known_workers:
+                span.set_attribute(rq_attributes.WORKER_NAME, name)
+                span.set_attribute(
+                    process_attributes.PROCESS_PID, instance.worker_dict[name].pid
+                )
+
+        self.worker_starts.add(1, attributes)
+        return response
+
+    def handle_dead_worker(
+        self, func: Callable, instance: "WorkerPool", args: Tuple, kwargs: Dict
+    ) -> Any:
+        """Wrapper of `WorkerPool.handle_dead_worker`"""
+        worker_data: "WorkerData" = kwargs.get("worker_data", args[0] if args else None)
+        attributes = {rq_attributes.WORKER_POOL_NAME: instance.name}
+        span_attributes = {
+            **attributes,
+            rq_attributes.WORKER_NAME: worker_data.name,
+            process_attributes.PROCESS_PID: worker_data.pid,
+        }
+        if worker_data.process.exitcode is not None:
+            span_attributes[process_attributes.PROCESS_EXIT_CODE] = (
+                worker_data.process.exitcode
+            )
+
+        with self.tracer.start_as_current_span(
+            "handle_dead_worker", attributes=span_attributes
+        ):
+            response = func(*args, **kwargs)
+
+        self.worker_deaths.add(1, attributes)
+        return response
+
+    def check_workers(
+        self, func: Callable, instance: "WorkerPool", args: Tuple, kwargs: Dict
+    ) -> Any:
+        """Wrapper of `WorkerPool.check_workers`, marking respawned workers"""
+        self._respawning = True
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self._respawning = False
+
+    def count_busy_workers(self, pool: "WorkerPool") -> int:
+        """Count workers of the pool whose state in Redis is busy"""
+        prefix = pool.worker_class.redis_worker_namespace_prefix
+        pipeline = pool.connection.pipeline()
+        for name in list(pool.worker_dict):
+            pipeline.hget(prefix + name, "state")
+        states = pipeline.execute()
+        return len([state for state in states if state in (b"busy", "busy")])
+
+    def get_busy_workers(self) -> "weakref.WeakKeyDictionary[WorkerPool, int]":
+        """Busy workers of every pool, read at most once per collection
+
+        Pools whose workers cannot be read from Redis are left out.
+        """
+        now = time.monotonic()
+        if (
+            self._busy_workers_time is not None
+            and now - self._busy_workers_time < _BUSY_WORKERS_TTL
+        ):
+            return self._busy_workers
+
+        busy_workers: "weakref.WeakKeyDictionary[WorkerPool, int]" = (
+            weakref.WeakKeyDictionary()
+        )
+        for pool in list(self._pools):
+            try:
+                busy_workers[pool] = self.count_busy_workers(pool)
+            except RedisError:
+                continue
+        self._busy_workers = busy_workers
+        self._busy_workers_time = now
+        return busy_workers
+
+    def observe_workers(
+        self, options: metrics.CallbackOptions
+    ) -> Iterable[metrics.Observation]:
+        for pool in list(self._pools):
+            yield metrics.Observation(
+                pool.number_of_active_workers,
+                {rq_attributes.WORKER_POOL_NAME: pool.name},
+            )
+
+    def observe_busy_workers(
+        self, options: metrics.CallbackOptions
+    ) -> Iterable[metrics.Observation]:
+        for pool, busy_workers in list(self.get_busy_workers().items()):
+            yield metrics.Observation(
+                busy_workers, {rq_attributes.WORKER_POOL_NAME: pool.name}
+            )
+
+    def observe_utilization(
+        self, options: metrics.CallbackOptions
+    ) -> Iterable[metrics.Observation]:
+        for pool, busy_workers in list(self.get_busy_workers().items()):
+            if not pool.num_workers:
+                continue
+            yield metrics.Observation(
+                busy_workers / pool.num_workers,
+                {rq_attributes.WORKER_POOL_NAME: pool.name},
+            )
+
+
+def _portable_context(context: trace.SpanContext) -> Dict[str, Any]:
+    return {
+        "trace_id": context.trace_id,
+        "span_id": context.span_id,
+        "is_remote": context.is_remote,
+        "trace_flags": int(context.trace_flags),
+        "trace_state": context.trace_state.to_header(),
+    }
+
+
+def _context_from_portable(context: Dict[str, Any]) -> trace.SpanContext:
+    return trace.SpanContext(
+        trace_id=context["trace_id"],
+        span_id=context["span_id"],
+        is_remote=context["is_remote"],
+        trace_flags=trace.TraceFlags(context["trace_flags"]),
+        trace_state=trace.TraceState.from_header([context["trace_state"]]),
+    )
+
+
+def to_portable_span(span: ReadableSpan) -> Dict[str, Any]:
+    """Copy an ended span into plain (picklable) values"""
+    scope = span.instrumentation_scope
+    return {
+        "name": span.name,
+        "context": _portable_context(span.context),
+        "parent": _portable_context(span.parent) if span.parent else None,
+        "resource": {
+            "attributes": dict(span.resource.attributes),
+            "schema_url": span.resource.schema_url,
+        },
+        "attributes": dict(span.attributes or {}),
+        "events": [
+            {
+                "name": event.name,
+                "attributes": dict(event.attributes or {}),
+                "timestamp": event.timestamp,
+            }
+            for event in span.events
+        ],
+        "links": [
+            {
+                "context": _portable_context(link.context),
+                "attributes": dict(link.attributes or {}),
+            }
+            for link in span.links
+        ],
+        "kind": span.kind.value,
+        "status": {
+            "status_code": span.status.status_code.value,
+            "description": span.status.description,
+        },
+        "start_time": span.start_time,
+        "end_time": span.end_time,
+        "instrumentation_scope": (
+            {
+                "name": scope.name,
+                "version": scope.version,
+                "schema_url": scope.schema_url,
+            }
+            if scope
+            else None
+        ),
+    }
+
+
+def from_portable_span(span: Dict[str, Any]) -> ReadableSpan:
+    """Rebuild an ended span copied by `to_portable_span`"""
+    scope = span["instrumentation_scope"]
+    return ReadableSpan(
+        name=span["name"],
+        context=_context_from_portable(span["context"]),
+        parent=_context_from_portable(span["parent"]) if span["parent"] else None,
+        resource=Resource(**span["resource"]),
+        attributes=span["attributes"],
+        events=[Event(**event) for event in span["events"]],
+        links=[
+            trace.Link(_context_from_portable(link["context"]), link["attributes"])
+            for link in span["links"]
+        ],
+        kind=trace.SpanKind(span["kind"]),
+        status=trace.Status(
+            trace.StatusCode(span["status"]["status_code"]),
+            span["status"]["description"],
+        ),
+        start_time=span["start_time"],
+        end_time=span["end_time"],
+        instrumentation_scope=InstrumentationScope(**scope) if scope else None,
+    )
+
+
+class PoolSpanExporter(SpanExporter):
+    """Export spans of all pool workers through the pool manager
+
+    Create it in the pool manager before `WorkerPool.start`. Worker
+    processes (and their work-horses) inherit it on fork: instead of
+    exporting, they send portable copies of their spans over a
+    multiprocessing queue. A thread of the manager receives them and
+    exports through `span_exporter`, so that a host keeps one exporter
+    connection however many workers the pool has.
+
+    Only the `fork` start method is supported, since other start methods
+    do not inherit the exporter.
+
+    Args:
+        span_exporter (SpanExporter): Exporter used by the pool manager
+    """
+
+    def __init__(self, span_exporter: SpanExporter):
+        self.span_exporter = span_exporter
+        self._owner_pid = os.getpid()
+        self._export_lock = threading.Lock()
+        # `SimpleQueue` writes to the pipe directly, without a feeder thread
+        # which would not survive the fork of work-horses
+        self._queue = multiprocessing.SimpleQueue()
+        self._receiver = threading.Thread(
+            target=self._receive, name="PoolSpanExporter", daemon=True
+        )
+        self._receiver.start()
+
+    @property
+    def is_manager(self) -> bool:
+        return os.getpid() == self._owner_pid
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        if self.is_manager:
+            with self._export_lock:
+                return self.span_exporter.export(spans)
+
+        self._queue.put([to_portable_span(span) for span in spans])
+        return SpanExportResult.SUCCESS
+
+    def _receive(self):
+        while True:
+            portable_spans: List[Dict[str, Any]] = self._queue.get()
+            if portable_spans is None:
+                return
+            # Workers block on a full pipe once nothing reads it anymore
+            try:
+                spans = [from_portable_span(span) for span in portable_spans]
+                with self._export_lock:
+                    self.span_exporter.export(spans)
+            except Exception:
+                _logger.exception("Failed to export spans of pool workers")
+
+    def shutdown(self) -> None:
+        if not self.is_manager:
+            return
+        self._queue.put(None)
+        self._receiver.join()
+        self.span_exporter.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        if not self.is_manager:
+            return True
+        return self.span_exporter.force_flush(timeout_millis)
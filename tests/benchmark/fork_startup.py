@@ -0,0 +1,113 @@
+"""Benchmark per-fork cost of work-horses running an instrumented job
+
+Each scenario runs in a fresh interpreter: a worker executes trivial jobs,
+forking a work-horse per job, and the median time from the fork until
+`Worker.perform_job` returns in the work-horse is reported. Spans are
+encoded to OTLP protobuf (when the OTLP exporter is installed) but not
+sent anywhere.
+
+Usage: python -m tests.benchmark.fork_startup [--jobs N]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, Optional, Sequence
+
+from opentelemetry.sdk.trace import ReadableSpan
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+try:
+    from opentelemetry.exporter.otlp.proto.common.trace_encoder import encode_spans
+except ImportError:
+    encode_spans = None
+
+SCENARIOS: Dict[str, Optional[Dict]] = {
+    "not instrumented": None,
+    "instrumented": {},
+}
+
+
+class EncodingSpanExporter(SpanExporter):
+    """Encode spans like the OTLP exporter would, without sending them"""
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        if encode_spans is not None:
+            encode_spans(spans).SerializeToString()
+        return SpanExportResult.SUCCESS
+
+
+def run_scenario(instrument_kwargs: Optional[Dict], jobs: int) -> float:
+    """Median time (ms) from forking a work-horse until its job is performed"""
+    import fakeredis
+    from opentelemetry import trace
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from rq import Queue, Worker
+
+    from opentelemetry_instrumentation_rq import RQInstrumentor
+
+    # Jobs are enqueued before instrumenting, as a worker does not publish
+    connection = fakeredis.FakeRedis()
+    queue = Queue("benchmark", connection=connection)
+    jobs = [queue.enqueue(len, []) for _ in range(jobs)]
+
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(EncodingSpanExporter()))
+    trace.set_tracer_provider(provider)
+    if instrument_kwargs is not None:
+        RQInstrumentor().instrument(**instrument_kwargs)
+
+    read_fd, write_fd = os.pipe()
+
+    class TimedWorker(Worker):
+        def perform_job(self, *args, **kwargs):
+            response = super().perform_job(*args, **kwargs)
+            os.write(write_fd, f"{time.perf_counter()}\n".encode())
+            return response
+
+    worker = TimedWorker([queue], connection=connection)
+
+    # Silence the horses, which inherit stdout / stderr
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 2)
+
+    durations = []
+    for job in jobs:
+        start = time.perf_counter()
+        worker.execute_job(job, queue)
+        performed = float(os.read(read_fd, 64).decode())
+        durations.append((performed - start) * 1000)
+    return statistics.median(durations)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=50)
+    parser.add_argument("--scenario", choices=SCENARIOS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scenario:
+        print(json.dumps(run_scenario(SCENARIOS[args.scenario], args.jobs)))
+        sys.exit(0)
+
+    for name in SCENARIOS:
+        output = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "tests.benchmark.fork_startup",
+                "--scenario",
+                name,
+                "--jobs",
+                str(args.jobs),
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        print(f"{name:<32} {json.loads(output.splitlines()[-1]):8.2f} ms")
@@ -0,0 +1,45 @@
+"""Benchmark import time of the instrumentation in a fresh interpreter
+
+Usage: python -m tests.benchmark.import_time [--runs N]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict
+
+SCENARIOS: Dict[str, str] = {
+    "python": "pass",
+    "import instrumentation": "import opentelemetry_instrumentation_rq",
+    "import + instrument": (
+        "from opentelemetry_instrumentation_rq import RQInstrumentor;"
+        "RQInstrumentor().instrument()"
+    ),
+    "import rq": "import rq",
+    "instrument + import rq": (
+        "from opentelemetry_instrumentation_rq import RQInstrumentor;"
+        "RQInstrumentor().instrument();"
+        "import rq"
+    ),
+}
+
+
+def measure(statement: str, runs: int) -> float:
+    """Median wall time (ms) of running `statement` in a fresh interpreter"""
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], check=True)
+        durations.append((time.perf_counter() - start) * 1000)
+    return statistics.median(durations)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    for name, statement in SCENARIOS.items():
+        print(f"{name:<24} {measure(statement, args.runs):8.1f} ms")
@@ -0,0 +1,59 @@
+"""Encoding of spans to OTLP JSON, as written by the collector"""
+
+from typing import Any, Dict, Sequence
+
+from opentelemetry.sdk.trace import ReadableSpan
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_otlp_value(item) for item in value]}}
+    return {"stringValue": str(value)}
+
+
+def to_otlp_json(spans: Sequence[ReadableSpan]) -> Dict[str, Any]:
+    """OTLP JSON `TracesData` of spans, as written by the collector"""
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": []},
+                "scopeSpans": [
+                    {
+                        "scope": {"name": "test"},
+                        "spans": [
+                            {
+                                "traceId": f"{span.context.trace_id:032x}",
+                                "spanId": f"{span.context.span_id:016x}",
+                                "parentSpanId": (
+                                    f"{span.parent.span_id:016x}" if span.parent else ""
+                                ),
+                                "name": span.name,
+                                "kind": span.kind.value + 1,
+                                "startTimeUnixNano": str(span.start_time),
+                                "endTimeUnixNano": str(span.end_time),
+                                "attributes": [
+                                    {"key": key, "value": _otlp_value(value)}
+                                    for key, value in span.attributes.items()
+                                ],
+                                "links": [
+                                    {
+                                        "traceId": f"{link.context.trace_id:032x}",
+                                        "spanId": f"{link.context.span_id:016x}",
+                                    }
+                                    for link in span.links
+                                ],
+                                "status": {"code": span.status.status_code.value},
+                            }
+                            for span in spans
+                        ],
+                    }
+                ],
+            }
+        ]
+    }
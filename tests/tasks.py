@@ -1,7 +1,12 @@
 """Functions used as RQ tasks/callback for testing"""
 
+import asyncio
+import os
+import signal
 import time
 
+from opentelemetry import trace
+
 
 class CustomException(Exception):
     pass
@@ -46,3 +51,26 @@ def failure_callback_exception(job, connection, type, value, traceback):
 def stopped_callback(job, connection):
     """Callback function after task stopped"""
     print("Stopped callback")
+
+
+async def task_async():
+    """Coroutine task function, awaiting a task and blocking the loop"""
+
+    async def subtask():
+        with trace.get_tracer(__name__).start_as_current_span("subtask"):
+            await asyncio.sleep(0)
+
+    await asyncio.ensure_future(subtask())
+    time.sleep(0.05)
+    return "async result"
+
+
+async def task_async_exception():
+    """Abnormal coroutine task function"""
+    await asyncio.sleep(0)
+    raise CustomException("Unexpected error")
+
+
+def task_killed():
+    """Task function killing its own work-horse"""
+    os.kill(os.getpid(), signal.SIGKILL)
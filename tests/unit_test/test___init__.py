@@ -1,6 +1,9 @@
 """Unit tests for opentelemetry_instrumentation_rq/__init__.py"""
 
+import subprocess
+import sys
 from datetime import datetime
+from unittest import TestCase
 
 import fakeredis
 from opentelemetry.test.test_base import TestBase
@@ -95,3 +98,37 @@ class TestRQInstrumentor(TestBase):
         self.worker.handle_job_success(
             job=job, queue=self.queue, started_job_registry=StartedJobRegistry
         )
+
+
+class TestRQInstrumentorLazyWrapping(TestCase):
+    """Unit test cases for wrapping rq modules once they are imported"""
+
+    def run_python(self, statement: str) -> str:
+        """Run statement in a fresh interpreter, returning its output"""
+        return subprocess.run(
+            [sys.executable, "-c", statement],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+
+    def test_instrument_without_importing_rq(self):
+        """Instrumenting should not import rq nor redis on its own"""
+        output = self.run_python(
+            "import sys;"
+            "from opentelemetry_instrumentation_rq import RQInstrumentor;"
+            "RQInstrumentor().instrument();"
+            "print(any(m.split('.')[0] in ('rq', 'redis') for m in sys.modules))"
+        )
+        self.assertEqual(output, "False")
+
+    def test_wrap_after_import(self):
+        """rq modules imported after instrumenting should be wrapped"""
+        output = self.run_python(
+            "from opentelemetry_instrumentation_rq import RQInstrumentor;"
+            "RQInstrumentor().instrument();"
+            "import rq;"
+            "print(hasattr(rq.queue.Queue._enqueue_job, '__wrapped__'),"
+            " hasattr(rq.worker.Worker.perform_job, '__wrapped__'))"
+        )
+        self.assertEqual(output, "True True")
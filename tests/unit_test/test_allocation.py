@@ -0,0 +1,123 @@
+"""Unit tests for opentelemetry_instrumentation_rq/allocation.py"""
+
+import tracemalloc
+from dataclasses import dataclass
+from typing import List
+
+import fakeredis
+from opentelemetry import trace
+from opentelemetry.test.test_base import TestBase
+from rq.job import Job
+
+from opentelemetry_instrumentation_rq import (
+    allocation,
+    rq_attributes,
+    rq_metrics,
+    utils,
+)
+
+
+class TestAllocationTracer(TestBase):
+    """Unit test cases for `AllocationTracer`"""
+
+    def setUp(self):
+        """Setup before testing
+        - Setup tracer from opentelemetry.test.test_base.TestBase
+        - Setup fake redis connection to mockup redis for rq
+        """
+        super().setUp()
+        self.tracer = trace.get_tracer(__name__)
+        self.fakeredis = fakeredis.FakeRedis()
+        self.job = Job.create(func=print, connection=self.fakeredis, id="job_id")
+
+    def tearDown(self):
+        """Teardown after testing"""
+        self.fakeredis.close()
+        super().tearDown()
+
+    def test_should_sample(self):
+        """Test sampling decision derived from job id"""
+
+        @dataclass
+        class TestCase:
+            name: str
+            sample_every: int
+            expected_ratio: float
+            description: str
+
+        test_cases: List[TestCase] = [
+            TestCase(
+                name="Disabled",
+                sample_every=0,
+                expected_ratio=0.0,
+                description="Non positive `sample_every` never samples",
+            ),
+            TestCase(
+                name="Every job",
+                sample_every=1,
+                expected_ratio=1.0,
+                description="`sample_every=1` samples all jobs",
+            ),
+            TestCase(
+                name="One in ten",
+                sample_every=10,
+                expected_ratio=0.1,
+                description="`sample_every=10` samples roughly one in ten jobs",
+            ),
+        ]
+
+        job_ids = [f"job_{i}" for i in range(10000)]
+        for test_case in test_cases:
+            sampled = [
+                job_id
+                for job_id in job_ids
+                if allocation.should_sample(job_id, test_case.sample_every)
+            ]
+            actual_ratio = len(sampled) / len(job_ids)
+
+            self.assertAlmostEqual(
+                test_case.expected_ratio,
+                actual_ratio,
+                delta=0.02,
+                msg="Failed test case ({}), expected: {}, actual: {}".format(
+                    test_case.name, test_case.expected_ratio, actual_ratio
+                ),
+            )
+
+    def test_sampled_job(self):
+        """Sampled jobs get allocation attributes and histogram"""
+        tracer = allocation.AllocationTracer(sample_every=1)
+        rq_input = {utils.RQElementName.JOB: self.job}
+
+        with self.tracer.start_as_current_span("perform") as span:
+            state = tracer.on_start(span, rq_input)
+            retained = [bytearray(1024) for _ in range(100)]
+            tracer.on_end(span, rq_input, state, None)
+
+        self.assertFalse(tracemalloc.is_tracing())
+        self.assertEqual(len(retained), 100)
+
+        finished_span = self.get_finished_spans()[0]
+        self.assertGreater(
+            finished_span.attributes[rq_attributes.JOB_ALLOCATION_NET_BYTES], 100 * 1024
+        )
+        top_sites = finished_span.attributes[rq_attributes.JOB_ALLOCATION_TOP_SITES]
+        self.assertIn("test_allocation.py", top_sites[0])
+
+        metric_names = [metric.name for metric in self.get_sorted_metrics()]
+        self.assertIn(rq_metrics.JOB_ALLOCATED_BYTES, metric_names)
+
+    def test_unsampled_job(self):
+        """Unsampled jobs never start `tracemalloc`"""
+        tracer = allocation.AllocationTracer(sample_every=0)
+        rq_input = {utils.RQElementName.JOB: self.job}
+
+        with self.tracer.start_as_current_span("perform") as span:
+            state = tracer.on_start(span, rq_input)
+            self.assertFalse(tracemalloc.is_tracing())
+            tracer.on_end(span, rq_input, state, None)
+
+        finished_span = self.get_finished_spans()[0]
+        self.assertNotIn(
+            rq_attributes.JOB_ALLOCATION_NET_BYTES, finished_span.attributes
+        )
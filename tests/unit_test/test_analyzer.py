@@ -0,0 +1,100 @@
+"""Unit tests for opentelemetry_instrumentation_rq/analyzer.py"""
+
+import io
+import json
+import os
+import tempfile
+
+import fakeredis
+from opentelemetry.test.test_base import TestBase
+from rq import Queue, SimpleWorker
+
+from opentelemetry_instrumentation_rq import RQInstrumentor, analyzer
+from tests import tasks
+from tests.otlp_json import to_otlp_json
+
+
+class TestIterDocuments(TestBase):
+    """Unit test cases for `iter_documents`"""
+
+    def test_iter_documents(self):
+        """JSONL and pretty printed documents are decoded across small reads"""
+        documents = [{"resourceSpans": []}, {"result": {"key": [1, 2.5, "}"]}}]
+        jsonl = "\n".join(json.dumps(document) for document in documents) + "\n"
+        pretty = "".join(json.dumps(document, indent=2) for document in documents)
+
+        for text in (jsonl, pretty):
+            self.assertEqual(
+                list(analyzer.iter_documents(io.StringIO(text), chunk_size=7)),
+                documents,
+            )
+
+        with self.assertRaises(json.JSONDecodeError):
+            list(analyzer.iter_documents(io.StringIO(jsonl[:-5])))
+
+
+class TestSpanJoiner(TestBase):
+    """Unit test cases for `SpanJoiner` on spans of instrumented jobs"""
+
+    def setUp(self):
+        """Setup before testing
+        - Setup tracer from opentelemetry.test.test_base.TestBase
+        - Setup fake redis connection to mockup redis for rq
+        - Instrument rq and run a succeeding and a failing job
+        """
+        super().setUp()
+        RQInstrumentor().instrument()
+        self.fakeredis = fakeredis.FakeRedis()
+        queue = Queue("analyzer", connection=self.fakeredis)
+        queue.enqueue(tasks.task_normal)
+        queue.enqueue(tasks.task_exception)
+        SimpleWorker([queue], connection=self.fakeredis).work(burst=True)
+
+        # Split over two documents, as exporters write batches
+        spans = self.get_finished_spans()
+        self.dump = "".join(
+            json.dumps(to_otlp_json(batch)) + "\n" for batch in (spans[:3], spans[3:])
+        )
+
+    def tearDown(self):
+        """Teardown after testing
+        - Uninstrument rq
+        - Teardown tracer from opentelemetry.test.test_base.TestBase
+        """
+        RQInstrumentor().uninstrument()
+        self.fakeredis.close()
+        super().tearDown()
+
+    def test_summarize_attempts(self):
+        """Queue-wait, service time and failures are reported per function"""
+        joiner = analyzer.SpanJoiner()
+        for document in analyzer.iter_documents(io.StringIO(self.dump)):
+            for span in analyzer.iter_spans(document):
+                joiner.add(span)
+
+        rows = analyzer.summarize_attempts(joiner.attempts(), ["queue", "function"])
+        self.assertEqual(
+            [(row["function"], row["attempts"], row["failures"]) for row in rows],
+            [("tests.tasks.task_exception", 1, 1), ("tests.tasks.task_normal", 1, 0)],
+        )
+        for row in rows:
+            self.assertEqual(row["queue"], "analyzer")
+            self.assertGreater(row["queue_wait_p50"], 0)
+            self.assertGreater(row["service_time_p99"], 0)
+
+    def test_main(self):
+        """Reports are exported as CSV"""
+        with tempfile.TemporaryDirectory() as directory:
+            dump_path = os.path.join(directory, "spans.jsonl")
+            report_path = os.path.join(directory, "report.csv")
+            with open(dump_path, "w") as dump:
+                dump.write(self.dump)
+
+            analyzer.main(
+                [dump_path, "--group-by", "queue", "--format", "csv", "-o", report_path]
+            )
+
+            with open(report_path) as report:
+                lines = report.read().splitlines()
+        self.assertTrue(lines[0].startswith("queue,attempts,failures,failure_rate,"))
+        self.assertTrue(lines[1].startswith("analyzer,2,1,0.5,"))
@@ -0,0 +1,130 @@
+"""Unit tests for opentelemetry_instrumentation_rq/control.py"""
+
+import fakeredis
+from opentelemetry.test.test_base import TestBase
+from rq import SimpleWorker
+from rq.job import Job
+from rq.queue import Queue
+
+from opentelemetry_instrumentation_rq import RQInstrumentor, control, deadline, retry
+from tests import tasks
+
+
+class TestInstrumentationControl(TestBase):
+    """Unit test cases for `InstrumentationControl`"""
+
+    def setUp(self):
+        """Setup before testing
+        - Setup tracer from opentelemetry.test.test_base.TestBase
+        - Setup fake redis connection to mockup redis for rq
+        - Instrument rq, reading the control key for every job
+        """
+        super().setUp()
+        RQInstrumentor().instrument(control_refresh_interval=0)
+
+        self.fakeredis = fakeredis.FakeRedis()
+        self.queue = Queue(name="queue_name", connection=self.fakeredis)
+        self.worker = SimpleWorker(
+            queues=[self.queue], name="worker_name", connection=self.fakeredis
+        )
+
+    def tearDown(self):
+        """Teardown after testing
+        - Uninstrument rq
+        - Teardown tracer from opentelemetry.test.test_base.TestBase
+        """
+        RQInstrumentor().uninstrument()
+        self.fakeredis.close()
+        super().tearDown()
+
+    def run_job(self, job_id: str = "job_id"):
+        self.queue.enqueue(tasks.task_normal, job_id=job_id)
+        job = Job.fetch(job_id, connection=self.fakeredis)
+        self.worker.perform_job(job, self.queue)
+        return [span.name for span in self.get_finished_spans()]
+
+    def test_full(self):
+        """Queues without level are fully traced"""
+        control.set_level(self.fakeredis, "off", queue_name="other_queue_name")
+
+        span_names = self.run_job()
+        self.assertIn("publish queue_name", span_names)
+        self.assertIn("handle_job_success queue_name", span_names)
+
+    def test_off(self):
+        """Queues turned off are not traced"""
+        control.set_level(self.fakeredis, control.InstrumentationLevel.OFF)
+
+        self.assertEqual(self.run_job(), [])
+
+    def test_off_state_hooks(self):
+        """Hooks changing the job still run when it is not traced"""
+        control.set_level(self.fakeredis, control.InstrumentationLevel.OFF)
+
+        with deadline.job_deadline(budget=30, slo="interactive"):
+            self.queue.enqueue(tasks.task_normal, job_id="job_id")
+        job = Job.fetch("job_id", connection=self.fakeredis)
+        self.assertEqual(job.meta[deadline.SLO_META_KEY], "interactive")
+        self.assertIn(deadline.DEADLINE_META_KEY, job.meta)
+
+        self.worker.perform_job(job, self.queue)
+        self.assertEqual(job.meta[retry.ATTEMPT_META_KEY], 1)
+        self.assertEqual(job.meta[retry.PREVIOUS_ATTEMPT_META_KEY], {})
+        self.assertEqual(self.get_finished_spans(), [])
+
+    def test_minimal(self):
+        """Only spans propagating the trace context, with state hooks only"""
+        control.set_level(
+            self.fakeredis, control.InstrumentationLevel.MINIMAL, "queue_name"
+        )
+
+        self.assertEqual(
+            sorted(self.run_job()), ["consume queue_name", "publish queue_name"]
+        )
+        publish_span = self.get_finished_spans().by_name("publish queue_name")
+        self.assertNotIn("messaging.message.body.size", publish_span.attributes)
+        consume_span = self.get_finished_spans().by_name("consume queue_name")
+        self.assertEqual(consume_span.attributes["rq.job.attempt"], 1)
+
+    def test_sample_rate(self):
+        """Jobs are sampled by their ID, the same in producers and workers"""
+        control.set_level(self.fakeredis, 0.5)
+        job_ids = [f"job_{index}" for index in range(20)]
+        sampled_job_ids = [
+            job_id for job_id in job_ids if control.is_job_sampled(job_id, 0.5)
+        ]
+        self.assertTrue(0 < len(sampled_job_ids) < len(job_ids))
+
+        for job_id in job_ids:
+            self.run_job(job_id)
+        consume_spans = [
+            span
+            for span in self.get_finished_spans()
+            if span.name == "consume queue_name"
+        ]
+        self.assertEqual(
+            sorted(span.attributes["rq.job.id"] for span in consume_spans),
+            sorted(sampled_job_ids),
+        )
+        for span in consume_spans:
+            self.assertIsNotNone(span.parent)
+
+    def test_refresh_interval(self):
+        """Levels are cached for the refresh interval"""
+        instrumentation_control = control.get_control()
+        instrumentation_control.refresh_interval = 60
+        span_count = len(self.run_job("first_job_id"))
+
+        control.set_level(self.fakeredis, control.InstrumentationLevel.OFF)
+        self.assertEqual(len(self.run_job("second_job_id")), 2 * span_count)
+
+        instrumentation_control._refreshed_at -= 60
+        self.assertEqual(len(self.run_job("third_job_id")), 2 * span_count)
+
+    def test_invalid_level(self):
+        """Invalid levels are refused, and ignored when read"""
+        with self.assertRaises(ValueError):
+            control.set_level(self.fakeredis, "verbose")
+
+        self.fakeredis.hset(control.DEFAULT_CONTROL_KEY, "*", "verbose")
+        self.assertIn("publish queue_name", self.run_job())
@@ -0,0 +1,163 @@
+"""Unit tests for opentelemetry_instrumentation_rq/coroutine.py"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Callable, List
+from unittest import mock
+
+import fakeredis
+from opentelemetry import trace
+from opentelemetry.test.test_base import TestBase
+from rq.job import Job
+
+from opentelemetry_instrumentation_rq import coroutine, rq_attributes
+from tests import tasks
+
+
+class TestCoroutineJobWrapper(TestBase):
+    """Unit test cases for `CoroutineJobWrapper`"""
+
+    def setUp(self):
+        """Setup before testing
+        - Setup tracer from opentelemetry.test.test_base.TestBase
+        - Setup fake redis connection to mockup redis for rq
+        """
+        super().setUp()
+        self.tracer = trace.get_tracer(__name__)
+        self.fakeredis = fakeredis.FakeRedis()
+
+    def tearDown(self):
+        """Teardown after testing"""
+        self.fakeredis.close()
+        super().tearDown()
+
+    def execute(self, job: Job, wrapper: coroutine.CoroutineJobWrapper):
+        """Execute the job with wrapper inside a `perform` span"""
+        with self.tracer.start_as_current_span("perform"):
+            return wrapper(job._execute, job, (), {})
+
+    def test_call(self):
+        """Test timing attributes and trace context of coroutine jobs"""
+
+        @dataclass
+        class TestCase:
+            name: str
+            func: Callable
+            loop_monitor_interval: float
+            expected_result: str
+            expected_attributes: List[str]
+            description: str
+
+        timing_attributes = [
+            rq_attributes.JOB_ASYNCIO_LOOP_SETUP_DURATION,
+            rq_attributes.JOB_ASYNCIO_COROUTINE_DURATION,
+        ]
+        monitor_attributes = [
+            rq_attributes.JOB_ASYNCIO_LOOP_MAX_LAG,
+            rq_attributes.JOB_ASYNCIO_LOOP_STALLS,
+        ]
+        test_cases: List[TestCase] = [
+            TestCase(
+                name="Sync job",
+                func=tasks.task_normal,
+                loop_monitor_interval=0.01,
+                expected_result=None,
+                expected_attributes=[],
+                description="Left to rq without asyncio attributes",
+            ),
+            TestCase(
+                name="Coroutine job",
+                func=tasks.task_async,
+                loop_monitor_interval=0,
+                expected_result="async result",
+                expected_attributes=timing_attributes,
+                description="Loop setup and coroutine are timed separately",
+            ),
+            TestCase(
+                name="Coroutine job with loop monitor",
+                func=tasks.task_async,
+                loop_monitor_interval=0.01,
+                expected_result="async result",
+                expected_attributes=timing_attributes + monitor_attributes,
+                description="Loop lag caused by blocking sleep is reported",
+            ),
+        ]
+
+        for test_case in test_cases:
+            self.memory_exporter.clear()
+            job = Job.create(func=test_case.func, connection=self.fakeredis)
+            wrapper = coroutine.CoroutineJobWrapper(
+                loop_monitor_interval=test_case.loop_monitor_interval,
+                stall_threshold=0.04,
+            )
+
+            result = self.execute(job, wrapper)
+            self.assertEqual(
+                test_case.expected_result,
+                result,
+                msg="Failed test case ({}), unexpected result".format(test_case.name),
+            )
+
+            perform_span = self.get_finished_spans().by_name("perform")
+            asyncio_attributes = [
+                key
+                for key in perform_span.attributes
+                if key.startswith("rq.job.asyncio.")
+            ]
+            self.assertCountEqual(
+                test_case.expected_attributes,
+                asyncio_attributes,
+                msg="Failed test case ({}), unexpected attributes".format(
+                    test_case.name
+                ),
+            )
+
+        self.assertGreaterEqual(
+            perform_span.attributes[rq_attributes.JOB_ASYNCIO_COROUTINE_DURATION], 0.05
+        )
+        self.assertGreaterEqual(
+            perform_span.attributes[rq_attributes.JOB_ASYNCIO_LOOP_STALLS], 1
+        )
+
+        subtask_span = self.get_finished_spans().by_name("subtask")
+        self.assertEqual(subtask_span.parent.span_id, perform_span.context.span_id)
+
+    def test_stall_threshold(self):
+        """Only loop lags over `stall_threshold` are counted as stalls"""
+        for stall_threshold, expected_stalls in [(0.04, 1), (1.0, 0)]:
+            self.memory_exporter.clear()
+            job = Job.create(func=tasks.task_async, connection=self.fakeredis)
+            wrapper = coroutine.CoroutineJobWrapper(
+                loop_monitor_interval=0.01, stall_threshold=stall_threshold
+            )
+            self.execute(job, wrapper)
+
+            perform_span = self.get_finished_spans().by_name("perform")
+            self.assertGreaterEqual(
+                perform_span.attributes[rq_attributes.JOB_ASYNCIO_LOOP_MAX_LAG], 0.04
+            )
+            self.assertEqual(
+                perform_span.attributes[rq_attributes.JOB_ASYNCIO_LOOP_STALLS],
+                expected_stalls,
+            )
+
+    def test_exception(self):
+        """A coroutine job raising is still timed, and stops the loop monitor"""
+        job = Job.create(func=tasks.task_async_exception, connection=self.fakeredis)
+        wrapper = coroutine.CoroutineJobWrapper(loop_monitor_interval=0.01)
+
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        with mock.patch.object(asyncio, "new_event_loop", return_value=loop):
+            with self.assertRaises(tasks.CustomException):
+                self.execute(job, wrapper)
+
+        # The monitor task ended with the job, nothing is left on the loop
+        self.assertEqual(asyncio.all_tasks(loop), set())
+        perform_span = self.get_finished_spans().by_name("perform")
+        self.assertIn(
+            rq_attributes.JOB_ASYNCIO_COROUTINE_DURATION, perform_span.attributes
+        )
+        self.assertEqual(
+            perform_span.attributes[rq_attributes.JOB_ASYNCIO_LOOP_STALLS], 0
+        )
@@ -0,0 +1,177 @@
+"""Unit tests for opentelemetry_instrumentation_rq/critical_path.py"""
+
+import io
+import json
+import time
+
+import fakeredis
+from opentelemetry import trace
+from opentelemetry.semconv._incubating.attributes import messaging_attributes
+from opentelemetry.test.test_base import TestBase
+from rq import Queue, SimpleWorker
+
+from opentelemetry_instrumentation_rq import (
+    RQInstrumentor,
+    critical_path,
+    rq_attributes,
+)
+from opentelemetry_instrumentation_rq.analyzer import (
+    SpanRecord,
+    iter_documents,
+    iter_spans,
+)
+from tests import tasks
+from tests.otlp_json import to_otlp_json
+
+
+class TestCriticalPath(TestBase):
+    """Unit test cases for `JobGraph` and `analyze`"""
+
+    def setUp(self):
+        """Setup before testing
+        - Setup tracer from opentelemetry.test.test_base.TestBase
+        - Setup fake redis connection to mockup redis for rq
+        - Instrument rq
+        """
+        super().setUp()
+        RQInstrumentor().instrument()
+        self.fakeredis = fakeredis.FakeRedis()
+
+    def tearDown(self):
+        """Teardown after testing
+        - Uninstrument rq
+        - Teardown tracer from opentelemetry.test.test_base.TestBase
+        """
+        RQInstrumentor().uninstrument()
+        self.fakeredis.close()
+        super().tearDown()
+
+    def test_analyze(self):
+        """The critical path follows the last-ending dependencies
+
+        `independent` runs first, then `first` releases `second`, and
+        `last` depends on both `second` and `independent`.
+        """
+        queue = Queue("pipeline", connection=self.fakeredis)
+        independent = queue.enqueue(tasks.task_normal)
+        first = queue.enqueue(tasks.task_normal)
+        second = queue.enqueue(tasks.task_normal, depends_on=first)
+        last = queue.enqueue(tasks.task_normal, depends_on=[second, independent])
+        SimpleWorker([queue], connection=self.fakeredis).work(burst=True)
+
+        graph = critical_path.JobGraph()
+        dump = json.dumps(to_otlp_json(self.get_finished_spans()))
+        for document in iter_documents(io.StringIO(dump)):
+            for span in iter_spans(document):
+                graph.add(span)
+        result = critical_path.analyze(graph)
+
+        self.assertEqual(result["cycle"], 0)
+        self.assertEqual(len(result["pipelines"]), 1)
+        pipeline = result["pipelines"][0]
+        self.assertEqual(pipeline["pipeline"], last.id)
+        self.assertEqual(
+            [row["job_id"] for row in pipeline["critical_path"]],
+            [first.id, second.id, last.id],
+        )
+        self.assertLessEqual(
+            pipeline["critical_path_wait"] + pipeline["critical_path_run"],
+            pipeline["makespan"],
+        )
+
+        slacks = {row["job_id"]: row["slack"] for row in result["jobs"]}
+        for job in (first, second, last):
+            self.assertAlmostEqual(slacks[job.id], 0)
+        self.assertGreater(slacks[independent.id], 0)
+
+    def test_enqueued_after_dependency(self):
+        """A job enqueued after its dependency ended waits from its enqueue"""
+        graph = critical_path.JobGraph()
+        producer = {messaging_attributes.MESSAGING_OPERATION_NAME: "setup dependencies"}
+        # (job, kind, span, start, end, attributes, links), times in seconds
+        for job_id, kind, span_id, start, end, attributes, links in (
+            ("a", trace.SpanKind.PRODUCER, "setup-a", 0, 0.1, producer, []),
+            ("a", trace.SpanKind.CONSUMER, "consume-a", 0.2, 1, {}, []),
+            (
+                "b",
+                trace.SpanKind.PRODUCER,
+                "setup-b",
+                10,
+                10.05,
+                producer,
+                [("trace", "setup-a")],
+            ),
+            ("b", trace.SpanKind.CONSUMER, "consume-b", 10.1, 11, {}, []),
+        ):
+            graph.add(
+                SpanRecord(
+                    trace_id="trace",
+                    span_id=span_id,
+                    parent_span_id="",
+                    name="",
+                    kind=kind,
+                    start_time=int(start * 1e9),
+                    end_time=int(end * 1e9),
+                    attributes={rq_attributes.JOB_ID: job_id, **attributes},
+                    links=links,
+                    is_error=False,
+                )
+            )
+
+        result = critical_path.analyze(graph)
+
+        (pipeline,) = result["pipelines"]
+        self.assertEqual(
+            [row["job_id"] for row in pipeline["critical_path"]], ["a", "b"]
+        )
+        self.assertAlmostEqual(pipeline["makespan"], 11)
+        rows = {row["job_id"]: row for row in result["jobs"]}
+        self.assertAlmostEqual(rows["b"]["wait"], 0.1)
+        self.assertAlmostEqual(rows["a"]["slack"], 9)
+
+    def test_scale(self):
+        """A DAG of 100k jobs is analysed in linear time"""
+        graph = critical_path.JobGraph()
+        producer = {messaging_attributes.MESSAGING_OPERATION_NAME: "setup dependencies"}
+        jobs = 100_000
+        for index in range(jobs):
+            # Layers of 2 jobs, each depending on both jobs of the previous layer
+            layer = index - index % 2
+            links = [
+                ("trace", f"setup-{dependency}")
+                for dependency in range(max(layer - 2, 0), layer)
+            ]
+            for kind, span_id, start, end, attributes, span_links in (
+                (trace.SpanKind.PRODUCER, f"setup-{index}", 0, 1, producer, links),
+                (
+                    trace.SpanKind.CONSUMER,
+                    f"consume-{index}",
+                    index * 10 + 5,
+                    index * 10 + 10,
+                    {},
+                    [],
+                ),
+            ):
+                graph.add(
+                    SpanRecord(
+                        trace_id="trace",
+                        span_id=span_id,
+                        parent_span_id="",
+                        name="",
+                        kind=kind,
+                        start_time=start,
+                        end_time=end,
+                        attributes={rq_attributes.JOB_ID: str(index), **attributes},
+                        links=span_links,
+                        is_error=False,
+                    )
+                )
+
+        start = time.perf_counter()
+        result = critical_path.analyze(graph)
+        self.assertLess(time.perf_counter() - start, 30)
+
+        pipeline = result["pipelines"][0]
+        self.assertEqual(len(result["pipelines"]), 1)
+        self.assertEqual(len(pipeline["critical_path"]), jobs // 2)
+        self.assertEqual(pipeline["critical_path"][-1]["job_id"], str(jobs - 1))
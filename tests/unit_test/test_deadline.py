@@ -0,0 +1,126 @@
+"""Unit tests for opentelemetry_instrumentation_rq/deadline.py"""
+
+import time
+from unittest import mock
+
+import fakeredis
+from opentelemetry.test.test_base import TestBase
+from rq import SimpleWorker
+from rq.job import Job
+from rq.queue import Queue
+
+from opentelemetry_instrumentation_rq import RQInstrumentor, rq_attributes, rq_metrics
+from opentelemetry_instrumentation_rq.deadline import (
+    DEADLINE_META_KEY,
+    SLO_META_KEY,
+    job_deadline,
+)
+from tests import tasks
+
+
+class TestDeadline(TestBase):
+    """Unit test cases for `DeadlineAttachHook` and `DeadlineHook`"""
+
+    def setUp(self):
+        """Setup before testing
+        - Setup tracer from opentelemetry.test.test_base.TestBase
+        - Setup fake redis connection to mockup redis for rq
+        - Instrument rq with an `interactive` SLO class
+        """
+        super().setUp()
+        RQInstrumentor().instrument(slo_budgets={"interactive": 5})
+
+        self.fakeredis = fakeredis.FakeRedis()
+        self.queue = Queue(name="queue_name", connection=self.fakeredis)
+        self.worker = SimpleWorker(
+            queues=[self.queue], name="worker_name", connection=self.fakeredis
+        )
+
+    def tearDown(self):
+        """Teardown after testing
+        - Uninstrument rq
+        - Teardown tracer from opentelemetry.test.test_base.TestBase
+        """
+        RQInstrumentor().uninstrument()
+        self.fakeredis.close()
+        super().tearDown()
+
+    def perform(self, job_id: str):
+        job = Job.fetch(job_id, connection=self.fakeredis)
+        self.worker.perform_job(job, self.queue)
+        return self.get_finished_spans().by_name("consume queue_name")
+
+    def test_budget(self):
+        """A budget sets the deadline of the jobs enqueued within"""
+        with job_deadline(budget=30):
+            self.queue.enqueue(tasks.task_normal, job_id="job_id")
+        self.queue.enqueue(tasks.task_normal, job_id="other_job_id")
+
+        job = Job.fetch("job_id", connection=self.fakeredis)
+        self.assertAlmostEqual(job.meta[DEADLINE_META_KEY], time.time() + 30, delta=1)
+        other_job = Job.fetch("other_job_id", connection=self.fakeredis)
+        self.assertNotIn(DEADLINE_META_KEY, other_job.meta)
+
+        publish_span = self.get_finished_spans().by_attr(rq_attributes.JOB_ID, "job_id")
+        self.assertGreater(
+            publish_span.attributes[rq_attributes.JOB_DEADLINE_REMAINING], 29
+        )
+
+        consume_span = self.perform("job_id")
+        self.assertGreater(
+            consume_span.attributes[rq_attributes.JOB_DEADLINE_REMAINING_AT_END], 0
+        )
+        self.assertFalse(consume_span.attributes[rq_attributes.JOB_SLO_VIOLATED])
+
+    def test_slo_class(self):
+        """An SLO class gives its budget from the enqueue"""
+        with job_deadline(slo="interactive"):
+            self.queue.enqueue(tasks.task_normal, job_id="job_id")
+
+        job = Job.fetch("job_id", connection=self.fakeredis)
+        self.assertEqual(job.meta[SLO_META_KEY], "interactive")
+        self.assertAlmostEqual(job.meta[DEADLINE_META_KEY], time.time() + 5, delta=1)
+
+    def test_violation(self):
+        """Jobs ending after their deadline are marked and counted"""
+        with job_deadline(budget=0, slo="batch"):
+            self.queue.enqueue(tasks.task_normal, job_id="job_id")
+
+        consume_span = self.perform("job_id")
+        self.assertEqual(consume_span.attributes[rq_attributes.JOB_SLO], "batch")
+        self.assertLess(
+            consume_span.attributes[rq_attributes.JOB_DEADLINE_REMAINING], 0
+        )
+        self.assertTrue(consume_span.attributes[rq_attributes.JOB_SLO_VIOLATED])
+
+        metrics = {metric.name: metric for metric in self.get_sorted_metrics()}
+        (violations,) = metrics[rq_metrics.JOB_SLO_VIOLATIONS].data.data_points
+        self.assertEqual(violations.value, 1)
+        self.assertEqual(violations.attributes[rq_attributes.JOB_SLO], "batch")
+        self.assertEqual(
+            violations.attributes[rq_attributes.JOB_FUNCTION],
+            "tests.tasks.task_normal",
+        )
+
+    def test_inherited_deadline(self):
+        """Jobs enqueued by a job inherit its deadline"""
+
+        def enqueue_child():
+            self.queue.enqueue(tasks.task_normal, job_id="child_job_id")
+
+        with job_deadline(budget=30, slo="batch"):
+            self.queue.enqueue(tasks.task_normal, job_id="job_id")
+        with mock.patch.object(Job, "_execute", side_effect=enqueue_child):
+            self.perform("job_id")
+
+        job = Job.fetch("job_id", connection=self.fakeredis)
+        child_job = Job.fetch("child_job_id", connection=self.fakeredis)
+        self.assertEqual(child_job.meta[DEADLINE_META_KEY], job.meta[DEADLINE_META_KEY])
+        self.assertEqual(child_job.meta[SLO_META_KEY], "batch")
+
+    def test_without_deadline(self):
+        """Jobs without deadline get no deadline attributes"""
+        self.queue.enqueue(tasks.task_normal, job_id="job_id")
+
+        consume_span = self.perform("job_id")
+        self.assertNotIn(rq_attributes.JOB_SLO_VIOLATED, consume_span.attributes)
@@ -0,0 +1,135 @@
+"""Unit tests for opentelemetry_instrumentation_rq/dependents.py"""
+
+from unittest import mock
+
+import fakeredis
+from opentelemetry import trace
+from opentelemetry.semconv._incubating.attributes import messaging_attributes
+from opentelemetry.test.test_base import TestBase
+from redis.client import Pipeline
+from redis.exceptions import WatchError
+from rq.job import Job
+from rq.queue import Queue
+from rq.worker import Worker
+
+from opentelemetry_instrumentation_rq import RQInstrumentor, rq_attributes, rq_metrics
+from tests import tasks
+
+
+class TestDependentsRelease(TestBase):
+    """Unit test cases for `DependentsReleaseInstrumentation`"""
+
+    def setUp(self):
+        """Setup before testing
+        - Setup tracer from opentelemetry.test.test_base.TestBase
+        - Setup fake redis connection to mockup redis for rq
+        - Instrument rq
+        """
+        super().setUp()
+        RQInstrumentor().instrument()
+
+        self.fakeredis = fakeredis.FakeRedis()
+        self.queue = Queue(name="queue_name", connection=self.fakeredis)
+        self.worker = Worker(
+            queues=[self.queue], name="worker_name", connection=self.fakeredis
+        )
+
+    def tearDown(self):
+        """Teardown after testing
+        - Uninstrument rq
+        - Teardown tracer from opentelemetry.test.test_base.TestBase
+        """
+        RQInstrumentor().uninstrument()
+        self.fakeredis.close()
+        super().tearDown()
+
+    def get_spans(self, operation_name: str):
+        return [
+            span
+            for span in self.get_finished_spans()
+            if span.attributes[messaging_attributes.MESSAGING_OPERATION_NAME]
+            == operation_name
+        ]
+
+    def test_release(self):
+        """Released dependents are counted and link to the release"""
+        parent = self.queue.enqueue(tasks.task_normal, job_id="parent")
+        other = self.queue.enqueue(tasks.task_normal, job_id="other")
+        released = [
+            self.queue.enqueue(tasks.task_normal, depends_on=parent) for _ in range(2)
+        ]
+        self.queue.enqueue(tasks.task_normal, depends_on=[parent, other])
+        self.memory_exporter.clear()
+
+        self.worker.perform_job(
+            Job.fetch("parent", connection=self.fakeredis), self.queue
+        )
+
+        (release_span,) = self.get_spans("enqueue dependents")
+        self.assertEqual(release_span.kind, trace.SpanKind.PRODUCER)
+        self.assertEqual(release_span.name, "enqueue dependents queue_name")
+        self.assertEqual(release_span.attributes[rq_attributes.JOB_ID], "parent")
+        self.assertEqual(
+            release_span.attributes[rq_attributes.JOB_DEPENDENTS_CHECKED], 3
+        )
+        self.assertEqual(
+            release_span.attributes[rq_attributes.JOB_DEPENDENTS_ENQUEUED], 2
+        )
+        self.assertEqual(
+            release_span.attributes[rq_attributes.JOB_DEPENDENTS_DEFERRED], 1
+        )
+        (handle_span,) = self.get_spans("handle_job_success")
+        self.assertEqual(release_span.parent.span_id, handle_span.context.span_id)
+
+        publish_spans = self.get_spans("publish")
+        self.assertEqual(
+            sorted(span.attributes[rq_attributes.JOB_ID] for span in publish_spans),
+            sorted(job.id for job in released),
+        )
+        for span in publish_spans:
+            self.assertEqual(span.links[0].context, release_span.context)
+
+        metrics = {metric.name: metric for metric in self.get_sorted_metrics()}
+        (point,) = metrics[rq_metrics.JOB_DEPENDENTS_RELEASE_DURATION].data.data_points
+        self.assertEqual(point.count, 1)
+
+    def test_release_retry(self):
+        """Dependents checked again after a `WatchError` are counted once"""
+        parent = self.queue.enqueue(tasks.task_normal, job_id="parent")
+        other = self.queue.enqueue(tasks.task_normal, job_id="other")
+        for _ in range(2):
+            self.queue.enqueue(tasks.task_normal, depends_on=parent)
+        self.queue.enqueue(tasks.task_normal, depends_on=[parent, other])
+        self.memory_exporter.clear()
+
+        execute = Pipeline.execute
+        side_effects = [WatchError]
+
+        def execute_once(pipeline, *args, **kwargs):
+            # Only the transaction enqueuing the dependents
+            if side_effects and pipeline.explicit_transaction:
+                pipeline.reset()
+                raise side_effects.pop()
+            return execute(pipeline, *args, **kwargs)
+
+        with mock.patch.object(Pipeline, "execute", autospec=True) as mock_execute:
+            mock_execute.side_effect = execute_once
+            self.queue.enqueue_dependents(parent)
+
+        (release_span,) = self.get_spans("enqueue dependents")
+        self.assertEqual(
+            release_span.attributes[rq_attributes.JOB_DEPENDENTS_CHECKED], 3
+        )
+        self.assertEqual(
+            release_span.attributes[rq_attributes.JOB_DEPENDENTS_ENQUEUED], 2
+        )
+        self.assertEqual(len(self.get_spans("publish")), 4)
+
+    def test_no_dependents(self):
+        """Jobs without dependents have no `enqueue dependents` span"""
+        self.queue.enqueue(tasks.task_normal, job_id="job_id")
+        self.worker.perform_job(
+            Job.fetch("job_id", connection=self.fakeredis), self.queue
+        )
+
+        self.assertEqual(self.get_spans("enqueue dependents"), [])
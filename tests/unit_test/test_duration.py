@@ -0,0 +1,86 @@
+"""Unit tests for opentelemetry_instrumentation_rq/duration.py"""
+
+import fakeredis
+from opentelemetry import trace
+from opentelemetry.semconv._incubating.metrics import messaging_metrics
+from opentelemetry.test.test_base import TestBase
+from rq.job import Job
+from rq.queue import Queue
+from rq.worker import Worker
+
+from opentelemetry_instrumentation_rq import RQInstrumentor, rq_attributes, rq_metrics
+from tests import tasks
+
+
+class TestProcessDuration(TestBase):
+    """Unit test cases for `ProcessDurationHook` and metric exemplars"""
+
+    def setUp(self):
+        """Setup before testing
+        - Setup tracer from opentelemetry.test.test_base.TestBase
+        - Setup fake redis connection to mockup redis for rq
+        - Instrument rq
+        """
+        super().setUp()
+        RQInstrumentor().instrument()
+
+        self.fakeredis = fakeredis.FakeRedis()
+        self.queue = Queue(name="queue_name", connection=self.fakeredis)
+        self.worker = Worker(
+            queues=[self.queue], name="worker_name", connection=self.fakeredis
+        )
+
+    def tearDown(self):
+        """Teardown after testing
+        - Uninstrument rq
+        - Teardown tracer from opentelemetry.test.test_base.TestBase
+        """
+        RQInstrumentor().uninstrument()
+        self.fakeredis.close()
+        super().tearDown()
+
+    def test_exemplars(self):
+        """Worker histograms carry exemplars of the spans they were recorded in"""
+        self.queue.enqueue(tasks.task_normal, job_id="parent")
+        self.queue.enqueue(tasks.task_normal, depends_on="parent")
+
+        job = Job.fetch("parent", connection=self.fakeredis)
+        self.worker.perform_job(job, self.queue)
+
+        spans = {
+            span.attributes[rq_attributes.JOB_ID]: span
+            for span in self.get_finished_spans()
+            if span.kind == trace.SpanKind.CONSUMER
+        }
+        (release_span,) = [
+            span
+            for span in self.get_finished_spans()
+            if span.name == "enqueue dependents queue_name"
+        ]
+        metrics = {metric.name: metric for metric in self.get_sorted_metrics()}
+        for name, span in (
+            (messaging_metrics.MESSAGING_PROCESS_DURATION, spans["parent"]),
+            (rq_metrics.JOB_QUEUE_WAIT_DURATION, spans["parent"]),
+            (rq_metrics.JOB_DEPENDENTS_RELEASE_DURATION, release_span),
+        ):
+            (point,) = metrics[name].data.data_points
+            (exemplar,) = point.exemplars
+            self.assertEqual(exemplar.trace_id, span.context.trace_id)
+            self.assertEqual(exemplar.span_id, span.context.span_id)
+
+    def test_failed_job(self):
+        """The duration of a failed job is recorded, with its exemplar"""
+        self.queue.enqueue(tasks.task_exception, job_id="job_id")
+        job = Job.fetch("job_id", connection=self.fakeredis)
+        self.worker.perform_job(job, self.queue)
+
+        consume_span = self.get_finished_spans().by_name("consume queue_name")
+        consume_duration = (consume_span.end_time - consume_span.start_time) / 1e9
+        metrics = {metric.name: metric for metric in self.get_sorted_metrics()}
+        duration = metrics[messaging_metrics.MESSAGING_PROCESS_DURATION]
+        (point,) = duration.data.data_points
+        self.assertEqual(point.count, 1)
+        self.assertLessEqual(point.sum, consume_duration)
+        self.assertEqual(point.attributes[rq_attributes.JOB_FUNCTION], job.func_name)
+        (exemplar,) = point.exemplars
+        self.assertEqual(exemplar.span_id, consume_span.context.span_id)
@@ -0,0 +1,103 @@
+"""Unit tests for opentelemetry_instrumentation_rq/fork.py"""
+
+import os
+import time
+from unittest import mock
+
+import fakeredis
+from opentelemetry.test.test_base import TestBase
+from rq.job import Job
+from rq.queue import Queue
+from rq.worker import Worker
+
+from opentelemetry_instrumentation_rq import (
+    RQInstrumentor,
+    fork,
+    rq_attributes,
+    rq_metrics,
+)
+from tests import tasks
+
+
+class TestForkMonitor(TestBase):
+    """Unit test cases for `ForkMonitor` and `ForkTimingHook`"""
+
+    def setUp(self):
+        """Setup before testing
+        - Setup tracer from opentelemetry.test.test_base.TestBase
+        - Setup fake redis connection to mockup redis for rq
+        - Instrument rq
+        """
+        super().setUp()
+        RQInstrumentor().instrument()
+
+        self.fakeredis = fakeredis.FakeRedis()
+        self.queue = Queue(name="queue_name", connection=self.fakeredis)
+        self.worker = Worker(
+            queues=[self.queue], name="worker_name", connection=self.fakeredis
+        )
+        self.job = self.queue.enqueue(tasks.task_normal, job_id="job_id")
+
+    def tearDown(self):
+        """Teardown after testing
+        - Uninstrument rq
+        - Teardown tracer from opentelemetry.test.test_base.TestBase
+        """
+        RQInstrumentor().uninstrument()
+        self.fakeredis.close()
+        super().tearDown()
+
+    def test_fork_work_horse(self):
+        """The fork is timed in the parent, and its timestamps reach the horse"""
+        read_fd, write_fd = os.pipe()
+
+        def main_work_horse(job, queue):
+            # Within the horse, which exits right after
+            timed = fork._fork.start_time is not None and fork._fork.child_time
+            os.write(write_fd, b"1" if timed else b"0")
+
+        with mock.patch.object(Worker, "main_work_horse", side_effect=main_work_horse):
+            self.worker.fork_work_horse(self.job, self.queue)
+        os.waitpid(self.worker.horse_pid, 0)
+        os.close(write_fd)
+        with os.fdopen(read_fd, "rb") as pipe:
+            self.assertEqual(pipe.read(), b"1")
+        self.assertIsNone(fork._fork)
+
+        metrics = {metric.name: metric for metric in self.get_sorted_metrics()}
+        (fork_duration,) = metrics[rq_metrics.HORSE_FORK_DURATION].data.data_points
+        self.assertEqual(fork_duration.count, 1)
+        self.assertEqual(
+            fork_duration.attributes[rq_attributes.JOB_FUNCTION],
+            "tests.tasks.task_normal",
+        )
+
+    def test_time_to_perform(self):
+        """A horse reports the fork and its time-to-perform on `consume`"""
+        horse_fork = fork._Fork("job_id")
+        horse_fork.child_time = time.perf_counter_ns()
+        horse_fork.start_time = horse_fork.child_time - 1_000_000
+        job = Job.fetch("job_id", connection=self.fakeredis)
+        with mock.patch.object(fork, "_fork", horse_fork):
+            self.worker.perform_job(job, self.queue)
+            self.assertIsNone(fork._fork)
+
+        consume_span = self.get_finished_spans().by_name("consume queue_name")
+        self.assertEqual(
+            consume_span.attributes[rq_attributes.HORSE_FORK_DURATION], 0.001
+        )
+        self.assertGreater(
+            consume_span.attributes[rq_attributes.HORSE_TIME_TO_PERFORM], 0
+        )
+
+        metrics = {metric.name: metric for metric in self.get_sorted_metrics()}
+        (time_to_perform,) = metrics[rq_metrics.HORSE_TIME_TO_PERFORM].data.data_points
+        self.assertEqual(time_to_perform.count, 1)
+
+    def test_without_fork(self):
+        """Jobs performed without forking get no fork timing"""
+        job = Job.fetch("job_id", connection=self.fakeredis)
+        self.worker.perform_job(job, self.queue)
+
+        consume_span = self.get_finished_spans().by_name("consume queue_name")
+        self.assertNotIn(rq_attributes.HORSE_TIME_TO_PERFORM, consume_span.attributes)
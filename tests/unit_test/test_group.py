@@ -0,0 +1,139 @@
+"""Unit tests for opentelemetry_instrumentation_rq/group.py"""
+
+from unittest import mock
+
+import fakeredis
+from opentelemetry import trace
+from opentelemetry.semconv._incubating.attributes import messaging_attributes
+from opentelemetry.test.test_base import TestBase
+from redis.client import Pipeline
+from rq import Queue, SimpleWorker, Worker
+from rq.group import Group
+
+from opentelemetry_instrumentation_rq import RQInstrumentor, rq_attributes, rq_metrics
+from opentelemetry_instrumentation_rq.group import get_group_state_key
+from tests import tasks
+
+
+class TestGroup(TestBase):
+    """Unit test cases for `GroupInstrumentation` and `GroupCompletionHook`"""
+
+    def setUp(self):
+        """Setup before testing
+        - Setup tracer from opentelemetry.test.test_base.TestBase
+        - Setup fake redis connection to mockup redis for rq
+        """
+        super().setUp()
+        self.fakeredis = fakeredis.FakeRedis()
+        self.queue = Queue("queue_name", connection=self.fakeredis)
+
+    def tearDown(self):
+        """Teardown after testing
+        - Uninstrument rq
+        - Teardown tracer from opentelemetry.test.test_base.TestBase
+        """
+        RQInstrumentor().uninstrument()
+        self.fakeredis.close()
+        super().tearDown()
+
+    def run_group(self):
+        group = Group.create(connection=self.fakeredis, name="group_name")
+        jobs = group.enqueue_many(
+            self.queue,
+            [Queue.prepare_data(tasks.task_normal) for _ in range(3)],
+        )
+        SimpleWorker([self.queue], connection=self.fakeredis).work(burst=True)
+        return jobs
+
+    def get_spans(self, operation_name: str):
+        return [
+            span
+            for span in self.get_finished_spans()
+            if span.attributes[messaging_attributes.MESSAGING_OPERATION_NAME]
+            == operation_name
+        ]
+
+    def test_enqueue_many(self):
+        """The group span links to `publish` spans, the last job ends the group"""
+        RQInstrumentor().instrument()
+        jobs = self.run_group()
+
+        (group_span,) = self.get_spans("enqueue group")
+        self.assertEqual(group_span.kind, trace.SpanKind.PRODUCER)
+        self.assertEqual(group_span.attributes[rq_attributes.GROUP_ID], "group_name")
+        self.assertEqual(
+            group_span.attributes[messaging_attributes.MESSAGING_BATCH_MESSAGE_COUNT],
+            3,
+        )
+        publish_spans = self.get_spans("publish")
+        self.assertEqual(
+            [link.context.span_id for link in group_span.links],
+            [span.context.span_id for span in publish_spans],
+        )
+        self.assertEqual(
+            [link.attributes[rq_attributes.JOB_ID] for link in group_span.links],
+            [job.id for job in jobs],
+        )
+
+        success_spans = self.get_spans("handle_job_success")
+        for span in success_spans:
+            self.assertEqual(span.attributes[rq_attributes.GROUP_ID], "group_name")
+        self.assertNotIn(rq_attributes.GROUP_MAKESPAN, success_spans[0].attributes)
+        self.assertGreater(
+            success_spans[-1].attributes[rq_attributes.GROUP_MAKESPAN], 0
+        )
+
+        metrics = {metric.name: metric for metric in self.get_sorted_metrics()}
+        (point,) = metrics[rq_metrics.GROUP_MAKESPAN].data.data_points
+        self.assertEqual(point.count, 1)
+        self.assertEqual(self.fakeredis.keys("rq:group:group_name:*"), [])
+
+    def test_without_publish_spans(self):
+        """Without `publish` spans, jobs are consumed under the group span"""
+        RQInstrumentor().instrument(group_publish_spans=False)
+        self.run_group()
+
+        (group_span,) = self.get_spans("enqueue group")
+        self.assertEqual(self.get_spans("publish"), [])
+        consume_spans = self.get_spans("consume")
+        self.assertEqual(len(consume_spans), 3)
+        for span in consume_spans:
+            self.assertEqual(span.parent.span_id, group_span.context.span_id)
+
+    def test_pending_with_jobs(self):
+        """Pending jobs are counted ahead of the jobs, in the same transaction"""
+        RQInstrumentor().instrument()
+        group = Group.create(connection=self.fakeredis, name="group_name")
+        transactions = []
+        execute = Pipeline.execute
+
+        def record_execute(pipeline, *args, **kwargs):
+            transactions.append([command[0][0] for command in pipeline.command_stack])
+            return execute(pipeline, *args, **kwargs)
+
+        with mock.patch.object(Pipeline, "execute", autospec=True) as mock_execute:
+            mock_execute.side_effect = record_execute
+            group.enqueue_many(
+                self.queue, [Queue.prepare_data(tasks.task_normal) for _ in range(3)]
+            )
+
+        (transaction,) = [commands for commands in transactions if "RPUSH" in commands]
+        self.assertEqual(transaction[0], "HINCRBY")
+        key = get_group_state_key("group_name")
+        self.assertEqual(self.fakeredis.hget(key, "pending"), b"3")
+
+    def test_killed_horse(self):
+        """Jobs of killed work-horses end the group in the parent worker"""
+        RQInstrumentor().instrument()
+        group = Group.create(connection=self.fakeredis, name="group_name")
+        (job,) = group.enqueue_many(self.queue, [Queue.prepare_data(tasks.task_normal)])
+        worker = Worker([self.queue], connection=self.fakeredis)
+
+        worker.handle_job_failure(
+            job, queue=self.queue, exc_string="Work-horse terminated unexpectedly"
+        )
+
+        (failure_span,) = self.get_spans("handle_job_failure")
+        self.assertEqual(failure_span.attributes[rq_attributes.GROUP_ID], "group_name")
+        self.assertGreater(failure_span.attributes[rq_attributes.GROUP_MAKESPAN], 0)
+        self.assertEqual(self.fakeredis.keys("rq:group:group_name:*"), [])
@@ -0,0 +1,91 @@
+"""Unit tests for opentelemetry_instrumentation_rq/heartbeat.py"""
+
+from unittest import mock
+
+import fakeredis
+from opentelemetry.test.test_base import TestBase
+from rq import SimpleWorker, get_current_job
+from rq.job import Job
+from rq.queue import Queue
+
+from opentelemetry_instrumentation_rq import RQInstrumentor, rq_attributes, rq_metrics
+from tests import tasks
+
+
+class TestHeartbeatMonitor(TestBase):
+    """Unit test cases for `HeartbeatMonitor` and `LateHeartbeatHook`"""
+
+    def setUp(self):
+        """Setup before testing
+        - Setup tracer from opentelemetry.test.test_base.TestBase
+        - Setup fake redis connection to mockup redis for rq
+        - Instrument rq, any heartbeat sent while monitoring a job being late
+        """
+        super().setUp()
+        RQInstrumentor().instrument(heartbeat_late_threshold=0)
+
+        self.fakeredis = fakeredis.FakeRedis()
+        self.queue = Queue(name="queue_name", connection=self.fakeredis)
+        self.worker = SimpleWorker(
+            queues=[self.queue],
+            name="worker_name",
+            connection=self.fakeredis,
+            job_monitoring_interval=0,
+        )
+
+    def tearDown(self):
+        """Teardown after testing
+        - Uninstrument rq
+        - Teardown tracer from opentelemetry.test.test_base.TestBase
+        """
+        RQInstrumentor().uninstrument()
+        self.fakeredis.close()
+        super().tearDown()
+
+    def test_heartbeat(self):
+        """Intervals between heartbeats are recorded against their TTL"""
+        self.worker.heartbeat(10)
+        self.worker.heartbeat()
+
+        metrics = {metric.name: metric for metric in self.get_sorted_metrics()}
+        (interval,) = metrics[rq_metrics.WORKER_HEARTBEAT_INTERVAL].data.data_points
+        (ttl_usage,) = metrics[rq_metrics.WORKER_HEARTBEAT_TTL_USAGE].data.data_points
+        self.assertEqual(interval.attributes[rq_attributes.WORKER_NAME], "worker_name")
+        self.assertEqual(interval.count, 1)
+        self.assertAlmostEqual(ttl_usage.sum, interval.sum / 10)
+
+    def test_heartbeat_in_work_horse(self):
+        """A work-horse does not measure from the heartbeats of its worker"""
+        self.worker.heartbeat(10)
+        with mock.patch("os.getpid", return_value=-1):
+            self.worker.heartbeat()
+            self.worker.heartbeat()
+
+        metrics = {metric.name: metric for metric in self.get_sorted_metrics()}
+        (interval,) = metrics[rq_metrics.WORKER_HEARTBEAT_INTERVAL].data.data_points
+        self.assertEqual(interval.count, 1)
+
+    def test_late_heartbeat(self):
+        """Late heartbeats while performing the job are reported on `consume`"""
+
+        def maintain_heartbeats():
+            # As the parent worker does while monitoring the work-horse
+            for _ in range(2):
+                self.worker.maintain_heartbeats(get_current_job())
+
+        self.queue.enqueue(tasks.task_normal, job_id="job_id")
+        with mock.patch.object(Job, "_execute", side_effect=maintain_heartbeats):
+            job = Job.fetch("job_id", connection=self.fakeredis)
+            self.worker.execute_job(job, self.queue)
+
+        consume_span = self.get_finished_spans().by_name("consume queue_name")
+        (event,) = consume_span.events
+        self.assertEqual(event.name, "rq.worker.heartbeat.late")
+        self.assertEqual(event.attributes[rq_attributes.WORKER_HEARTBEAT_LATE_COUNT], 2)
+        self.assertGreater(
+            event.attributes[rq_attributes.WORKER_HEARTBEAT_LATE_DELAY], 0
+        )
+
+        metrics = {metric.name: metric for metric in self.get_sorted_metrics()}
+        (jitter,) = metrics[rq_metrics.WORKER_HEARTBEAT_JITTER].data.data_points
+        self.assertEqual(jitter.count, 2)
@@ -0,0 +1,68 @@
+"""Unit tests for opentelemetry_instrumentation_rq/horse.py"""
+
+import signal
+
+import fakeredis
+from opentelemetry import trace
+from opentelemetry.test.test_base import TestBase
+from rq.queue import Queue
+from rq.worker import Worker
+
+from opentelemetry_instrumentation_rq import RQInstrumentor, rq_attributes, rq_metrics
+from tests import tasks
+
+
+class TestHorseMonitor(TestBase):
+    """Unit test cases for `HorseMonitor`"""
+
+    def setUp(self):
+        """Setup before testing
+        - Setup tracer from opentelemetry.test.test_base.TestBase
+        - Setup fake redis connection to mockup redis for rq
+        - Instrument rq
+        """
+        super().setUp()
+        RQInstrumentor().instrument()
+
+        self.fakeredis = fakeredis.FakeRedis()
+        self.queue = Queue(name="queue_name", connection=self.fakeredis)
+        self.worker = Worker(
+            queues=[self.queue], name="worker_name", connection=self.fakeredis
+        )
+
+    def tearDown(self):
+        """Teardown after testing
+        - Uninstrument rq
+        - Teardown tracer from opentelemetry.test.test_base.TestBase
+        """
+        RQInstrumentor().uninstrument()
+        self.fakeredis.close()
+        super().tearDown()
+
+    def test_killed_horse(self):
+        """A killed work-horse leaves an error span in the job trace"""
+        job = self.queue.enqueue(tasks.task_killed)
+        self.worker.execute_job(job, self.queue)
+
+        publish_span = self.get_finished_spans().by_name("publish queue_name")
+        killed_span = self.get_finished_spans().by_name("horse_killed queue_name")
+
+        self.assertEqual(killed_span.status.status_code, trace.StatusCode.ERROR)
+        self.assertEqual(killed_span.parent.span_id, publish_span.context.span_id)
+        self.assertEqual(killed_span.attributes[rq_attributes.JOB_ID], job.id)
+        self.assertEqual(
+            killed_span.attributes[rq_attributes.HORSE_SIGNAL], signal.SIGKILL
+        )
+        self.assertGreater(killed_span.attributes[rq_attributes.HORSE_MAX_RSS], 0)
+        self.assertGreater(killed_span.end_time, killed_span.start_time)
+
+        metric_names = [metric.name for metric in self.get_sorted_metrics()]
+        self.assertIn(rq_metrics.HORSE_KILLED, metric_names)
+
+    def test_successful_horse(self):
+        """No span is emitted for a work-horse exiting normally"""
+        job = self.queue.enqueue(tasks.task_normal)
+        self.worker.execute_job(job, self.queue)
+
+        span_names = [span.name for span in self.get_finished_spans()]
+        self.assertNotIn("horse_killed queue_name", span_names)
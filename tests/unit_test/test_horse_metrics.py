@@ -0,0 +1,101 @@
+"""Unit tests for opentelemetry_instrumentation_rq/horse_metrics.py"""
+
+import os
+from unittest import mock
+
+import fakeredis
+from opentelemetry.test.test_base import TestBase
+from rq.queue import Queue
+from rq.worker import Worker
+
+from opentelemetry_instrumentation_rq import RQInstrumentor, horse_metrics
+from tests import tasks
+
+
+class TestHorseMetrics(TestBase):
+    """Unit test cases for measurements relayed from work-horses"""
+
+    def setUp(self):
+        """Setup before testing
+        - Setup tracer from opentelemetry.test.test_base.TestBase
+        - Setup fake redis connection to mockup redis for rq
+        - Instrument rq
+        """
+        super().setUp()
+        RQInstrumentor().instrument()
+
+        self.fakeredis = fakeredis.FakeRedis()
+        self.queue = Queue(name="queue_name", connection=self.fakeredis)
+        self.worker = Worker(
+            queues=[self.queue], name="worker_name", connection=self.fakeredis
+        )
+        self.job = self.queue.enqueue(tasks.task_normal, job_id="job_id")
+        meter = horse_metrics.get_meter(__name__)
+        self.histogram = meter.create_histogram("test.horse.histogram")
+        self.counter = meter.create_counter("test.horse.counter")
+
+    def tearDown(self):
+        """Teardown after testing
+        - Uninstrument rq
+        - Teardown tracer from opentelemetry.test.test_base.TestBase
+        """
+        RQInstrumentor().uninstrument()
+        self.fakeredis.close()
+        super().tearDown()
+
+    def run_horse(self, main_work_horse):
+        """Fork a work-horse running `main_work_horse`, then monitor it"""
+        with mock.patch.object(Worker, "main_work_horse", side_effect=main_work_horse):
+            self.worker.fork_work_horse(self.job, self.queue)
+        os.waitpid(self.worker.horse_pid, 0)
+        horse_metrics.monitor_work_horse(
+            lambda *args, **kwargs: None, self.worker, (self.job, self.queue), {}
+        )
+
+    def get_metrics(self):
+        return {metric.name: metric for metric in self.get_sorted_metrics()}
+
+    def test_record_in_worker(self):
+        """Horses measure into the series of their worker, with exemplars"""
+        tracer = self.tracer_provider.get_tracer(__name__)
+
+        def main_work_horse(job, queue):
+            self.histogram.record(1.5, {"queue": queue.name})
+            self.counter.add(1, {"queue": queue.name})
+            horse_metrics.flush()
+
+        with tracer.start_as_current_span("consume") as span:
+            for _ in range(3):
+                self.run_horse(main_work_horse)
+
+        metrics = self.get_metrics()
+        (histogram,) = metrics["test.horse.histogram"].data.data_points
+        self.assertEqual(histogram.count, 3)
+        self.assertEqual(histogram.sum, 4.5)
+        self.assertEqual(dict(histogram.attributes), {"queue": "queue_name"})
+        self.assertEqual(
+            histogram.exemplars[0].trace_id, span.get_span_context().trace_id
+        )
+        (counter,) = metrics["test.horse.counter"].data.data_points
+        self.assertEqual(counter.value, 3)
+        self.assertIsNone(horse_metrics._relay)
+
+    def test_horse_killed(self):
+        """Measurements cut short by the death of the horse are dropped"""
+
+        def main_work_horse(job, queue):
+            self.histogram.record(1)
+            horse_metrics._relay.file.write('["test.horse.histogram", 2')
+            horse_metrics.flush()
+
+        self.run_horse(main_work_horse)
+
+        (histogram,) = self.get_metrics()["test.horse.histogram"].data.data_points
+        self.assertEqual(histogram.count, 1)
+        self.assertEqual(histogram.sum, 1)
+
+    def test_record_without_fork(self):
+        """Measurements out of a work-horse are recorded right away"""
+        self.histogram.record(2)
+        (histogram,) = self.get_metrics()["test.horse.histogram"].data.data_points
+        self.assertEqual(histogram.count, 1)
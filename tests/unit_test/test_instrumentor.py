@@ -6,7 +6,8 @@ from typing import Any, Callable, Dict, List, Union
 import fakeredis
 import mock
 from opentelemetry import trace
-from opentelemetry.sdk.trace import Span
+from opentelemetry.sdk.trace import Span, TracerProvider
+from opentelemetry.sdk.trace.sampling import Decision, Sampler, SamplingResult
 from opentelemetry.semconv._incubating.attributes import messaging_attributes
 from opentelemetry.test.test_base import TestBase
 from opentelemetry.trace.propagation.tracecontext import TraceContextTextMapPropagator
@@ -548,3 +549,109 @@ class TestTraceInstrumentWrapper(TestBase):
             # Reset spans before next test case
             super().tearDown()
             super().setUp()
+
+    def test_call_hooks(self):
+        """Test `SpanHook` being called around the wrapped function"""
+        hook = mock.Mock(spec=instrumentor.SpanHook)
+        hook.on_start.return_value = "STATE"
+        exception = Exception("Unexpected error")
+
+        def mock_exception_func(*args, **kwargs):
+            raise exception
+
+        wrapper = instrumentor.TraceInstrumentWrapper(
+            span_kind=trace.SpanKind.CLIENT,
+            operation_type="process",
+            operation_name="perform",
+            should_propagate=False,
+            should_flush=False,
+            instance_info=self.job_instance_info,
+            argument_info_list=[],
+            hooks=[hook],
+        )
+
+        with self.assertRaises(Exception):
+            wrapper(func=mock_exception_func, instance=self.job, args=(), kwargs={})
+
+        hook.on_start.assert_called_once()
+        hook.on_end.assert_called_once()
+        _, rq_input, state, actual_exception = hook.on_end.call_args.args
+        self.assertIs(rq_input[utils.RQElementName.JOB], self.job)
+        self.assertEqual(state, "STATE")
+        self.assertIs(actual_exception, exception)
+
+    def test_call_hooks_order(self):
+        """Test hooks ending in reverse order, also when one fails to start"""
+        calls = mock.Mock()
+        hooks = []
+        for name in ("first", "second", "third"):
+            hook = mock.Mock(spec=instrumentor.SpanHook)
+            calls.attach_mock(hook, name)
+            hooks.append(hook)
+        func = mock.Mock()
+
+        wrapper = instrumentor.TraceInstrumentWrapper(
+            span_kind=trace.SpanKind.CLIENT,
+            operation_type="process",
+            operation_name="perform",
+            should_propagate=False,
+            should_flush=False,
+            instance_info=self.job_instance_info,
+            argument_info_list=[],
+            hooks=hooks,
+        )
+
+        wrapper(func=func, instance=self.job, args=(), kwargs={})
+        self.assertEqual(
+            [call[0] for call in calls.mock_calls],
+            [
+                "first.on_start",
+                "second.on_start",
+                "third.on_start",
+                "third.on_end",
+                "second.on_end",
+                "first.on_end",
+            ],
+        )
+
+        calls.reset_mock()
+        func.reset_mock()
+        exception = Exception("Unexpected error")
+        hooks[1].on_start.side_effect = exception
+        with self.assertRaises(Exception):
+            wrapper(func=func, instance=self.job, args=(), kwargs={})
+        self.assertEqual(
+            [call[0] for call in calls.mock_calls],
+            ["first.on_start", "second.on_start", "first.on_end"],
+        )
+        self.assertIs(hooks[0].on_end.call_args.args[3], exception)
+        func.assert_not_called()
+
+    def test_call_attributes_at_span_start(self):
+        """Test span attributes being visible to samplers"""
+        sampler = mock.Mock(spec=Sampler)
+        sampler.should_sample.return_value = SamplingResult(Decision.DROP)
+        tracer_provider = TracerProvider(sampler=sampler)
+
+        wrapper = instrumentor.TraceInstrumentWrapper(
+            span_kind=trace.SpanKind.PRODUCER,
+            operation_type="send",
+            operation_name="publish",
+            should_propagate=False,
+            should_flush=False,
+            instance_info=self.queue_instance_info,
+            argument_info_list=[self.job_argument_info],
+        )
+        wrapper.tracer = tracer_provider.get_tracer(__name__)
+        wrapper(
+            func=lambda *args, **kwargs: None,
+            instance=self.queue,
+            args=(self.job,),
+            kwargs={},
+        )
+
+        _, _, _, _, attributes, _ = sampler.should_sample.call_args.args
+        self.assertEqual(
+            attributes[messaging_attributes.MESSAGING_DESTINATION_NAME], "QUEUE_NAME"
+        )
+        self.assertEqual(attributes[rq_attributes.JOB_FUNCTION], "builtins.print")
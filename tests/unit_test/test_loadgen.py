@@ -0,0 +1,94 @@
+"""Unit tests for opentelemetry_instrumentation_rq/loadgen.py"""
+
+import tempfile
+
+import fakeredis
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.test.test_base import TestBase
+
+from opentelemetry_instrumentation_rq import RQInstrumentor, loadgen
+
+
+class TestLoadGenerator(TestBase):
+    """Unit test cases for `LoadGenerator`"""
+
+    def setUp(self):
+        """Setup before testing
+        - Setup tracer from opentelemetry.test.test_base.TestBase
+        - Setup fake redis server shared by the threads of the load generator
+        - Instrument rq
+        """
+        super().setUp()
+        RQInstrumentor().instrument()
+        self.server = fakeredis.FakeServer()
+
+    def tearDown(self):
+        """Teardown after testing
+        - Uninstrument rq
+        - Teardown tracer from opentelemetry.test.test_base.TestBase
+        """
+        RQInstrumentor().uninstrument()
+        super().tearDown()
+
+    def test_run(self):
+        """Every job of the mix ends and gets an end-to-end latency"""
+        config = loadgen.LoadConfig(
+            jobs=16,
+            workers=2,
+            payload_sizes=(16, 1024),
+            failure_ratio=0.2,
+            scheduled_ratio=0.2,
+            schedule_delay=0.1,
+            dependency_ratio=0.4,
+            fan_out=2,
+            fan_in=2,
+            callbacks=True,
+            seed=0,
+        )
+        generator = loadgen.LoadGenerator(
+            config, lambda: fakeredis.FakeRedis(server=self.server)
+        )
+
+        wall_time = generator.run()
+        result = loadgen.report(config, generator, wall_time, self.get_finished_spans())
+
+        self.assertEqual(result["jobs"], 16)
+        self.assertEqual(result["ended_jobs"], 16)
+        self.assertEqual(result["latency_ms"]["count"], 16)
+        self.assertCountEqual(
+            result["latency_ms_by_kind"],
+            [loadgen.PLAIN, loadgen.SCHEDULED, loadgen.FAN_OUT, loadgen.FAN_IN],
+        )
+
+    def test_span_files(self):
+        """Spans written to files give the same latencies as in memory"""
+        config = loadgen.LoadConfig(jobs=8, workers=2, dependency_ratio=0.5, seed=0)
+        generator = loadgen.LoadGenerator(
+            config, lambda: fakeredis.FakeRedis(server=self.server)
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            self.tracer_provider.add_span_processor(
+                SimpleSpanProcessor(loadgen.SpanFileExporter(directory))
+            )
+            generator.run()
+            spans = loadgen.read_span_files(directory)
+
+        self.assertEqual(
+            loadgen.job_latencies(spans),
+            loadgen.job_latencies(self.get_finished_spans()),
+        )
+        self.assertEqual(len(loadgen.job_latencies(spans)), 8)
+
+    def test_fork_needs_redis_url(self):
+        """Forked workers cannot share the memory of fakeredis"""
+        with self.assertRaises(SystemExit):
+            loadgen.main(["--fork"])
+
+    def test_summarize(self):
+        """Nearest-rank percentiles in milliseconds"""
+        summary = loadgen.summarize([index / 1000 for index in range(1, 101)])
+        self.assertEqual(summary["count"], 100)
+        self.assertAlmostEqual(summary["p50"], 50)
+        self.assertAlmostEqual(summary["p99"], 99)
+        self.assertAlmostEqual(summary["max"], 100)
+        self.assertEqual(loadgen.summarize([]), {"count": 0})
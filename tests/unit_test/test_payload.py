@@ -0,0 +1,104 @@
+"""Unit tests for opentelemetry_instrumentation_rq/payload.py"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List
+from unittest import mock
+
+import fakeredis
+from opentelemetry.semconv._incubating.attributes import messaging_attributes
+from opentelemetry.test.test_base import TestBase
+from rq.job import Job
+from rq.queue import Queue
+
+from opentelemetry_instrumentation_rq import RQInstrumentor, rq_attributes, rq_metrics
+from tests import tasks
+
+
+class TestPayloadSizeHook(TestBase):
+    """Unit test cases for `PayloadSizeHook`"""
+
+    def setUp(self):
+        """Setup before testing
+        - Setup tracer from opentelemetry.test.test_base.TestBase
+        - Setup fake redis connection to mockup redis for rq
+        - Instrument rq
+        """
+        super().setUp()
+        RQInstrumentor().instrument()
+
+        self.fakeredis = fakeredis.FakeRedis()
+        self.queue = Queue(name="queue_name", connection=self.fakeredis)
+
+    def tearDown(self):
+        """Teardown after testing
+        - Uninstrument rq
+        - Teardown tracer from opentelemetry.test.test_base.TestBase
+        """
+        RQInstrumentor().uninstrument()
+        self.fakeredis.close()
+        super().tearDown()
+
+    def test_payload_size(self):
+        """Test payload sizes on `publish` and `schedule` spans"""
+
+        @dataclass
+        class TestCase:
+            name: str
+            enqueue: Callable[[Queue, Job], None]
+            expected_span_name: str
+            description: str
+
+        test_cases: List[TestCase] = [
+            TestCase(
+                name="Publish",
+                enqueue=lambda queue, job: queue._enqueue_job(job),
+                expected_span_name="publish queue_name",
+                description="Sizes set on span of `Queue._enqueue_job`",
+            ),
+            TestCase(
+                name="Schedule",
+                enqueue=lambda queue, job: queue.schedule_job(job, datetime.now()),
+                expected_span_name="schedule queue_name",
+                description="Sizes set on span of `Queue.schedule_job`",
+            ),
+        ]
+
+        for test_case in test_cases:
+            self.memory_exporter.clear()
+            job = Job.create(
+                func=tasks.task_normal,
+                args=("x" * 1000,),
+                connection=self.fakeredis,
+            )
+            test_case.enqueue(self.queue, job)
+
+            span = self.get_finished_spans().by_name(test_case.expected_span_name)
+            self.assertEqual(
+                span.attributes[messaging_attributes.MESSAGING_MESSAGE_BODY_SIZE],
+                len(job.data),
+                msg="Failed test case ({}), unexpected body size".format(
+                    test_case.name
+                ),
+            )
+            self.assertEqual(
+                span.attributes[rq_attributes.JOB_META_SIZE],
+                len(job.serializer.dumps(job.meta)),
+                msg="Failed test case ({}), unexpected meta size".format(
+                    test_case.name
+                ),
+            )
+
+        metric_names = [metric.name for metric in self.get_sorted_metrics()]
+        self.assertIn(rq_metrics.JOB_BODY_SIZE, metric_names)
+
+    def test_job_data_serialized_once(self):
+        """Body size reuses the job data serialized by rq"""
+        job = Job.create(func=tasks.task_normal, connection=self.fakeredis)
+        with mock.patch.object(
+            job.serializer, "dumps", wraps=job.serializer.dumps
+        ) as dumps:
+            self.queue._enqueue_job(job)
+
+        job_tuples = [c for c in dumps.call_args_list if isinstance(c.args[0], tuple)]
+        self.assertEqual(len(job_tuples), 1)
@@ -0,0 +1,134 @@
+"""Unit tests for opentelemetry_instrumentation_rq/process_metrics.py"""
+
+import os
+import subprocess
+import sys
+import unittest
+from unittest import mock
+
+import fakeredis
+from opentelemetry.semconv._incubating.attributes import process_attributes
+from opentelemetry.semconv._incubating.metrics import process_metrics
+from opentelemetry.test.test_base import TestBase
+from rq.queue import Queue
+from rq.worker import Worker
+
+from opentelemetry_instrumentation_rq import RQInstrumentor, rq_attributes
+from opentelemetry_instrumentation_rq.process_metrics import ProcessMetrics
+
+
+@unittest.skipUnless(os.path.isdir("/proc/self"), "requires /proc")
+class TestProcessMetrics(TestBase):
+    """Unit test cases for `ProcessMetrics`"""
+
+    def setUp(self):
+        """Setup before testing
+        - Setup tracer from opentelemetry.test.test_base.TestBase
+        - Setup fake redis connection to mockup redis for rq
+        - Instrument rq
+        """
+        super().setUp()
+        RQInstrumentor().instrument()
+
+        self.fakeredis = fakeredis.FakeRedis()
+        self.worker = Worker(
+            queues=[Queue("first", connection=self.fakeredis), "second"],
+            name="worker_name",
+            connection=self.fakeredis,
+        )
+        # Stand-in for the work-horse
+        self.horse = subprocess.Popen(
+            [sys.executable, "-c", "input()"], stdin=subprocess.PIPE
+        )
+
+    def tearDown(self):
+        """Teardown after testing
+        - Uninstrument rq
+        - Teardown tracer from opentelemetry.test.test_base.TestBase
+        """
+        self.horse.communicate(b"\n")
+        RQInstrumentor().uninstrument()
+        self.fakeredis.close()
+        super().tearDown()
+
+    def get_points(self):
+        metrics = {metric.name: metric for metric in self.get_sorted_metrics()}
+        return {
+            name: {
+                (
+                    point.attributes[rq_attributes.PROCESS_ROLE],
+                    point.attributes.get(
+                        process_attributes.PROCESS_CONTEXT_SWITCH_TYPE
+                    ),
+                ): point
+                for point in metrics[name].data.data_points
+            }
+            for name in metrics
+            if name.startswith("process.")
+        }
+
+    def test_gauges(self):
+        """Worker and work-horse processes are observed from `/proc`"""
+        self.worker.register_birth()
+        self.worker._horse_pid = self.horse.pid
+
+        with mock.patch(
+            "opentelemetry_instrumentation_rq.process_metrics._SNAPSHOT_TTL", 0
+        ):
+            self.get_points()
+            points = self.get_points()
+
+        for role in ("worker", "horse"):
+            memory_usage = points[process_metrics.PROCESS_MEMORY_USAGE][(role, None)]
+            self.assertGreater(memory_usage.value, 0)
+            self.assertEqual(
+                memory_usage.attributes[rq_attributes.WORKER_NAME], "worker_name"
+            )
+            self.assertEqual(
+                memory_usage.attributes[rq_attributes.WORKER_QUEUES], "first,second"
+            )
+            self.assertGreater(
+                points[process_metrics.PROCESS_OPEN_FILE_DESCRIPTOR_COUNT][
+                    (role, None)
+                ].value,
+                2,
+            )
+            self.assertGreaterEqual(
+                points[process_metrics.PROCESS_THREAD_COUNT][(role, None)].value, 1
+            )
+            self.assertGreaterEqual(
+                points[process_metrics.PROCESS_CPU_UTILIZATION][(role, None)].value, 0
+            )
+            for switch_type in ("voluntary", "involuntary"):
+                self.assertIn(
+                    (role, switch_type),
+                    points[process_metrics.PROCESS_CONTEXT_SWITCHES],
+                )
+
+    def test_dead_worker(self):
+        """Workers are no longer observed once dead"""
+        self.worker.register_birth()
+        self.worker.register_death()
+
+        self.assertEqual(self.get_points(), {})
+
+    def test_context_switches_new_horse(self):
+        """Context switches of work-horses add up across horses"""
+        process_metrics_instance = ProcessMetrics()
+        attributes = {rq_attributes.PROCESS_ROLE: "horse"}
+        first_horse = mock.Mock(voluntary_switches=100, involuntary_switches=10)
+        second_horse = mock.Mock(voluntary_switches=5, involuntary_switches=1)
+
+        values = []
+        for pid, snapshot in ((1001, first_horse), (1002, second_horse)):
+            with mock.patch.object(
+                process_metrics_instance,
+                "snapshots",
+                return_value=[(pid, snapshot, attributes)],
+            ):
+                observations = process_metrics_instance.observe_context_switches(
+                    mock.Mock()
+                )
+                values.append([observation.value for observation in observations])
+
+        self.assertEqual(values, [[100, 10], [105, 11]])
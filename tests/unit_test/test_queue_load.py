@@ -0,0 +1,108 @@
+"""Unit tests for opentelemetry_instrumentation_rq/queue_load.py"""
+
+from unittest import mock
+
+import fakeredis
+from opentelemetry.test.test_base import TestBase
+from rq import SimpleWorker
+from rq.job import Job
+from rq.queue import Queue
+
+from opentelemetry_instrumentation_rq import RQInstrumentor, queue_load, rq_metrics
+from tests import tasks
+
+
+class TestQueueLoadMetrics(TestBase):
+    """Unit test cases for `QueueLoadMetrics`"""
+
+    def setUp(self):
+        """Setup before testing
+        - Setup tracer from opentelemetry.test.test_base.TestBase
+        - Setup fake redis connection to mockup redis for rq
+        - Instrument rq with the load gauges, from a fresh process state
+        """
+        super().setUp()
+        patcher = mock.patch.object(queue_load, "_queue_loads", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        RQInstrumentor().instrument(autoscaling_window=60)
+
+        self.fakeredis = fakeredis.FakeRedis()
+        self.queue = Queue(name="queue_name", connection=self.fakeredis)
+        self.worker = SimpleWorker(
+            queues=[self.queue], name="worker_name", connection=self.fakeredis
+        )
+
+    def tearDown(self):
+        """Teardown after testing
+        - Uninstrument rq
+        - Teardown tracer from opentelemetry.test.test_base.TestBase
+        """
+        RQInstrumentor().uninstrument()
+        self.fakeredis.close()
+        super().tearDown()
+
+    def get_values(self):
+        values = {}
+        for metric in self.get_sorted_metrics():
+            if metric.name.startswith("rq.queue."):
+                (point,) = metric.data.data_points
+                values[metric.name] = point.value
+        return values
+
+    def execute(self, job):
+        # As dequeued by the worker
+        self.queue.remove(job)
+        self.worker.execute_job(job, self.queue)
+
+    def test_signals(self):
+        """Rates, utilisation and time to drain over the window"""
+        clock = mock.Mock(monotonic=mock.Mock(return_value=100.0))
+
+        def perform():
+            # Jobs run for 2 seconds
+            clock.monotonic.return_value += 2
+
+        with mock.patch.object(queue_load, "time", clock), mock.patch.object(
+            Job, "_execute", side_effect=perform
+        ):
+            self.execute(self.queue.enqueue(tasks.task_normal))
+            jobs = [self.queue.enqueue(tasks.task_normal) for _ in range(3)]
+
+            clock.monotonic.return_value = 100.0
+            values = self.get_values()
+            self.assertEqual(values[rq_metrics.QUEUE_BACKLOG], 3)
+            self.assertEqual(values[rq_metrics.QUEUE_IN_FLIGHT], 0)
+            self.assertNotIn(rq_metrics.QUEUE_SERVICE_RATE, values)
+
+            self.queue.enqueue(tasks.task_normal)
+            for job in jobs:
+                self.execute(job)
+            clock.monotonic.return_value = 110.0
+            values = self.get_values()
+
+        self.assertEqual(values[rq_metrics.QUEUE_BACKLOG], 1)
+        self.assertAlmostEqual(values[rq_metrics.QUEUE_ARRIVAL_RATE], 0.1)
+        self.assertAlmostEqual(values[rq_metrics.QUEUE_SERVICE_RATE], 0.3)
+        self.assertAlmostEqual(values[rq_metrics.QUEUE_UTILIZATION], 0.6)
+        # The backlog went from 3 to 1 in 10 seconds
+        self.assertAlmostEqual(values[rq_metrics.QUEUE_TIME_TO_DRAIN], 5)
+
+    def test_empty_queue(self):
+        """An empty queue is drained"""
+        job = self.queue.enqueue(tasks.task_normal)
+        self.execute(job)
+
+        values = self.get_values()
+        self.assertEqual(values[rq_metrics.QUEUE_BACKLOG], 0)
+        self.assertEqual(values[rq_metrics.QUEUE_TIME_TO_DRAIN], 0)
+
+    def test_idle_worker(self):
+        """Workers report the backlog of their queues before executing jobs"""
+        for _ in range(2):
+            self.queue.enqueue(tasks.task_normal)
+        self.worker.register_birth()
+
+        values = self.get_values()
+        self.assertEqual(values[rq_metrics.QUEUE_BACKLOG], 2)
+        self.assertEqual(values[rq_metrics.QUEUE_IN_FLIGHT], 0)
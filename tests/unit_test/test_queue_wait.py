@@ -0,0 +1,102 @@
+"""Unit tests for opentelemetry_instrumentation_rq/queue_wait.py"""
+
+import fakeredis
+from opentelemetry import trace
+from opentelemetry.test.test_base import TestBase
+from rq import Queue, SimpleWorker
+from rq.job import Job
+
+from opentelemetry_instrumentation_rq import RQInstrumentor, rq_attributes, rq_metrics
+from tests import tasks
+
+
+class TestQueueWait(TestBase):
+    """Unit test cases for `QueueWaitHook`"""
+
+    def setUp(self):
+        """Setup before testing
+        - Setup tracer from opentelemetry.test.test_base.TestBase
+        - Setup fake redis connection to mockup redis for rq
+        - Instrument rq with the `queue_wait` span
+        """
+        super().setUp()
+        RQInstrumentor().instrument(queue_wait_span=True)
+        self.fakeredis = fakeredis.FakeRedis()
+        self.queue = Queue("queue_name", connection=self.fakeredis)
+
+    def tearDown(self):
+        """Teardown after testing
+        - Uninstrument rq
+        - Teardown tracer from opentelemetry.test.test_base.TestBase
+        """
+        RQInstrumentor().uninstrument()
+        self.fakeredis.close()
+        super().tearDown()
+
+    def test_queue_wait(self):
+        """The wait is split at the dequeue and covered by a `queue_wait` span"""
+        job = self.queue.enqueue(tasks.task_normal)
+        SimpleWorker([self.queue], connection=self.fakeredis).work(burst=True)
+
+        spans = {span.kind: span for span in self.get_finished_spans()}
+        consume_span = spans[trace.SpanKind.CONSUMER]
+        wait_span = spans[trace.SpanKind.INTERNAL]
+        self.assertEqual(wait_span.name, "queue_wait queue_name")
+        self.assertEqual(wait_span.parent, consume_span.parent)
+        self.assertEqual(wait_span.attributes[rq_attributes.JOB_ID], job.id)
+        self.assertLessEqual(wait_span.end_time, consume_span.end_time)
+
+        duration = consume_span.attributes[rq_attributes.JOB_QUEUE_WAIT_DURATION]
+        self.assertGreater(duration, 0)
+        self.assertAlmostEqual(
+            consume_span.attributes[rq_attributes.JOB_QUEUE_WAIT_IN_QUEUE]
+            + consume_span.attributes[rq_attributes.JOB_QUEUE_WAIT_DISPATCH],
+            duration,
+        )
+        self.assertAlmostEqual(
+            (wait_span.end_time - wait_span.start_time) / 1e9, duration
+        )
+
+        metrics = {metric.name: metric for metric in self.get_sorted_metrics()}
+        (point,) = metrics[rq_metrics.JOB_QUEUE_WAIT_DURATION].data.data_points
+        self.assertEqual(point.count, 1)
+        self.assertEqual(point.attributes[rq_attributes.JOB_FUNCTION], job.func_name)
+
+    def test_failed_job(self):
+        """The wait of a failed job is recorded as well"""
+        self.queue.enqueue(tasks.task_exception)
+        SimpleWorker([self.queue], connection=self.fakeredis).work(burst=True)
+
+        consume_span = self.get_finished_spans().by_name("consume queue_name")
+        self.assertGreater(
+            consume_span.attributes[rq_attributes.JOB_QUEUE_WAIT_DURATION], 0
+        )
+        metrics = {metric.name: metric for metric in self.get_sorted_metrics()}
+        (point,) = metrics[rq_metrics.JOB_QUEUE_WAIT_DURATION].data.data_points
+        self.assertEqual(point.count, 1)
+
+    def test_without_dequeue(self):
+        """Jobs not dequeued by the worker have a wait, without split"""
+        job = self.queue.enqueue(tasks.task_normal)
+        worker = SimpleWorker([self.queue], connection=self.fakeredis)
+        worker.perform_job(Job.fetch(job.id, connection=self.fakeredis), self.queue)
+
+        consume_span = self.get_finished_spans().by_name("consume queue_name")
+        self.assertIn(rq_attributes.JOB_QUEUE_WAIT_DURATION, consume_span.attributes)
+        self.assertNotIn(rq_attributes.JOB_QUEUE_WAIT_IN_QUEUE, consume_span.attributes)
+        self.assertNotIn(rq_attributes.JOB_QUEUE_WAIT_DISPATCH, consume_span.attributes)
+
+    def test_not_enqueued(self):
+        """Jobs performed without being enqueued have no wait"""
+        job = Job.create(func=tasks.task_normal, connection=self.fakeredis)
+        worker = SimpleWorker([self.queue], connection=self.fakeredis)
+        worker.perform_job(job, self.queue)
+
+        consume_span = self.get_finished_spans().by_name("consume queue_name")
+        self.assertNotIn(rq_attributes.JOB_QUEUE_WAIT_DURATION, consume_span.attributes)
+        self.assertNotIn(
+            "queue_wait queue_name",
+            [span.name for span in self.get_finished_spans()],
+        )
+        metrics = {metric.name: metric for metric in self.get_sorted_metrics()}
+        self.assertNotIn(rq_metrics.JOB_QUEUE_WAIT_DURATION, metrics)
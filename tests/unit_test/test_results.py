@@ -0,0 +1,137 @@
+"""Unit tests for opentelemetry_instrumentation_rq/results.py"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List
+from unittest import mock
+
+import fakeredis
+from opentelemetry.test.test_base import TestBase
+from redis.client import Pipeline
+from rq.job import Job
+from rq.queue import Queue
+from rq.registry import StartedJobRegistry
+from rq.worker import Worker
+
+from opentelemetry_instrumentation_rq import (
+    RQInstrumentor,
+    results,
+    rq_attributes,
+    rq_metrics,
+)
+from tests import tasks
+
+
+class TestResultPersistenceInstrumentation(TestBase):
+    """Unit test cases for `ResultPersistenceInstrumentation`"""
+
+    def setUp(self):
+        """Setup before testing
+        - Setup tracer from opentelemetry.test.test_base.TestBase
+        - Setup fake redis connection to mockup redis for rq
+        - Instrument rq
+        """
+        super().setUp()
+        RQInstrumentor().instrument()
+
+        self.fakeredis = fakeredis.FakeRedis()
+        self.queue = Queue(name="queue_name", connection=self.fakeredis)
+        self.worker = Worker(
+            queues=[self.queue], name="worker_name", connection=self.fakeredis
+        )
+
+    def tearDown(self):
+        """Teardown after testing
+        - Uninstrument rq
+        - Teardown tracer from opentelemetry.test.test_base.TestBase
+        """
+        RQInstrumentor().uninstrument()
+        self.fakeredis.close()
+        super().tearDown()
+
+    def test_handle_job_success(self):
+        """Test result size and save duration on `handle_job_success`"""
+
+        @dataclass
+        class TestCase:
+            name: str
+            supports_redis_streams: bool
+            description: str
+
+        test_cases: List[TestCase] = [
+            TestCase(
+                name="Result stream",
+                supports_redis_streams=True,
+                description="Result saved by `rq.results.Result`",
+            ),
+            TestCase(
+                name="Legacy result",
+                supports_redis_streams=False,
+                description="Result saved in the job hash",
+            ),
+        ]
+
+        for test_case in test_cases:
+            self.memory_exporter.clear()
+            job = Job.create(func=tasks.task_normal, connection=self.fakeredis)
+            job.started_at = datetime.now()
+            job.ended_at = datetime.now()
+            job._result = "x" * 1000
+
+            with mock.patch.object(
+                Job,
+                "supports_redis_streams",
+                new_callable=mock.PropertyMock,
+                return_value=test_case.supports_redis_streams,
+            ):
+                self.worker.handle_job_success(
+                    job=job, queue=self.queue, started_job_registry=StartedJobRegistry
+                )
+
+            span = self.get_finished_spans().by_name("handle_job_success queue_name")
+            self.assertGreaterEqual(
+                span.attributes[rq_attributes.JOB_RESULT_SIZE],
+                1000,
+                msg="Failed test case ({}), unexpected result size".format(
+                    test_case.name
+                ),
+            )
+            self.assertIn(rq_attributes.JOB_RESULT_SAVE_DURATION, span.attributes)
+
+        metric_names = [metric.name for metric in self.get_sorted_metrics()]
+        self.assertIn(rq_metrics.JOB_RESULT_SIZE, metric_names)
+        self.assertIn(rq_metrics.JOB_RESULT_SAVE_DURATION, metric_names)
+
+    def test_save_duration(self):
+        """The save is timed until the pipeline of the worker is executed"""
+        clock = mock.Mock(perf_counter=mock.Mock(return_value=100.0))
+        execute = Pipeline.execute
+
+        def slow_execute(pipeline, *args, **kwargs):
+            clock.perf_counter.return_value += 2
+            return execute(pipeline, *args, **kwargs)
+
+        job = Job.create(func=tasks.task_normal, connection=self.fakeredis)
+        job.started_at = datetime.now()
+        job.ended_at = datetime.now()
+        with mock.patch.object(results, "time", clock), mock.patch.object(
+            Pipeline, "execute", autospec=True, side_effect=slow_execute
+        ):
+            self.worker.handle_job_success(
+                job=job, queue=self.queue, started_job_registry=StartedJobRegistry
+            )
+
+        span = self.get_finished_spans().by_name("handle_job_success queue_name")
+        self.assertEqual(span.attributes[rq_attributes.JOB_RESULT_SAVE_DURATION], 2)
+
+    def test_no_result_saved(self):
+        """Jobs with a `result_ttl` of 0 save no result"""
+        job = self.queue.enqueue(tasks.task_normal, result_ttl=0)
+        job.started_at = datetime.now()
+        job.ended_at = datetime.now()
+        self.worker.handle_job_success(
+            job=job, queue=self.queue, started_job_registry=StartedJobRegistry
+        )
+
+        span = self.get_finished_spans().by_name("handle_job_success queue_name")
+        self.assertNotIn(rq_attributes.JOB_RESULT_SAVE_DURATION, span.attributes)
@@ -0,0 +1,99 @@
+"""Unit tests for opentelemetry_instrumentation_rq/retry.py"""
+
+import fakeredis
+from opentelemetry import trace
+from opentelemetry.test.test_base import TestBase
+from rq import Retry
+from rq.job import Job
+from rq.queue import Queue
+from rq.worker import Worker
+
+from opentelemetry_instrumentation_rq import RQInstrumentor, rq_attributes, rq_metrics
+from opentelemetry_instrumentation_rq.retry import (
+    ATTEMPT_META_KEY,
+    PREVIOUS_ATTEMPT_META_KEY,
+)
+from tests import tasks
+
+
+class TestRetry(TestBase):
+    """Unit test cases for `RetryHook` and `RetryCounter`"""
+
+    def setUp(self):
+        """Setup before testing
+        - Setup tracer from opentelemetry.test.test_base.TestBase
+        - Setup fake redis connection to mockup redis for rq
+        - Instrument rq
+        """
+        super().setUp()
+        RQInstrumentor().instrument()
+
+        self.fakeredis = fakeredis.FakeRedis()
+        self.queue = Queue(name="queue_name", connection=self.fakeredis)
+        self.worker = Worker(
+            queues=[self.queue], name="worker_name", connection=self.fakeredis
+        )
+
+    def tearDown(self):
+        """Teardown after testing
+        - Uninstrument rq
+        - Teardown tracer from opentelemetry.test.test_base.TestBase
+        """
+        RQInstrumentor().uninstrument()
+        self.fakeredis.close()
+        super().tearDown()
+
+    def test_retried_job(self):
+        """Attempts carry their index and link to the previous attempt"""
+        self.queue.enqueue(tasks.task_exception, job_id="job_id", retry=Retry(max=2))
+        for _ in range(3):
+            job = Job.fetch("job_id", connection=self.fakeredis)
+            self.worker.perform_job(job, self.queue)
+
+        consume_spans = [
+            span
+            for span in self.get_finished_spans()
+            if span.kind == trace.SpanKind.CONSUMER
+        ]
+        self.assertEqual(
+            [span.attributes[rq_attributes.JOB_ATTEMPT] for span in consume_spans],
+            [1, 2, 3],
+        )
+        self.assertEqual(
+            [span.attributes[rq_attributes.JOB_RETRIES_LEFT] for span in consume_spans],
+            [2, 1, 0],
+        )
+        self.assertEqual(len(consume_spans[0].links), 0)
+        for previous, current in zip(consume_spans, consume_spans[1:]):
+            self.assertEqual(current.links[0].context.span_id, previous.context.span_id)
+
+        metrics = {metric.name: metric for metric in self.get_sorted_metrics()}
+        retries = metrics[rq_metrics.JOB_RETRIES].data.data_points
+        self.assertEqual(sum(point.value for point in retries), 2)
+
+    def test_job_without_retry(self):
+        """A failed job without retry is neither counted nor given retries left"""
+        self.queue.enqueue(tasks.task_exception, job_id="job_id")
+        job = Job.fetch("job_id", connection=self.fakeredis)
+        self.worker.perform_job(job, self.queue)
+
+        consume_span = self.get_finished_spans().by_name("consume queue_name")
+        self.assertEqual(consume_span.attributes[rq_attributes.JOB_ATTEMPT], 1)
+        self.assertNotIn(rq_attributes.JOB_RETRIES_LEFT, consume_span.attributes)
+
+        metrics = {metric.name: metric for metric in self.get_sorted_metrics()}
+        self.assertNotIn(rq_metrics.JOB_RETRIES, metrics)
+
+    def test_invalid_previous_attempt(self):
+        """An altered context of the previous attempt is not linked"""
+        self.queue.enqueue(
+            tasks.task_exception,
+            job_id="job_id",
+            meta={ATTEMPT_META_KEY: 1, PREVIOUS_ATTEMPT_META_KEY: {"traceparent": "-"}},
+        )
+        job = Job.fetch("job_id", connection=self.fakeredis)
+        self.worker.perform_job(job, self.queue)
+
+        consume_span = self.get_finished_spans().by_name("consume queue_name")
+        self.assertEqual(consume_span.attributes[rq_attributes.JOB_ATTEMPT], 2)
+        self.assertEqual(len(consume_span.links), 0)
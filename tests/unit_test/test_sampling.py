@@ -0,0 +1,285 @@
+"""Unit tests for opentelemetry_instrumentation_rq/sampling.py"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.semconv._incubating.attributes import messaging_attributes
+from opentelemetry.test.test_base import TestBase
+
+from opentelemetry_instrumentation_rq import instrumentor, rq_attributes, sampling
+
+CONSUME = {messaging_attributes.MESSAGING_OPERATION_NAME: "consume"}
+
+
+class TestTailSamplingSpanProcessor(TestBase):
+    """Unit test cases for `TailSamplingSpanProcessor`"""
+
+    def create_tracer(self, **kwargs) -> trace.Tracer:
+        """Create a tracer exporting through a `TailSamplingSpanProcessor`"""
+        self.exporter = InMemorySpanExporter()
+        provider = TracerProvider()
+        provider.add_span_processor(
+            sampling.TailSamplingSpanProcessor(
+                SimpleSpanProcessor(self.exporter), **kwargs
+            )
+        )
+        return provider.get_tracer(instrumentor.__name__)
+
+    def consume(
+        self, tracer: trace.Tracer, function_name: str = "tasks.f", fail: bool = False
+    ):
+        """Emulate spans of one job inside the worker"""
+        with tracer.start_as_current_span(
+            "consume queue",
+            kind=trace.SpanKind.CONSUMER,
+            attributes={rq_attributes.JOB_FUNCTION: function_name, **CONSUME},
+        ):
+            with tracer.start_as_current_span(
+                "perform queue", kind=trace.SpanKind.CLIENT
+            ) as perform_span:
+                if fail:
+                    perform_span.set_status(trace.Status(trace.StatusCode.ERROR))
+
+    def test_decision(self):
+        """Test which jobs are kept"""
+
+        @dataclass
+        class TestCase:
+            name: str
+            description: str
+            fail: bool
+            expected_decision: Optional[str]
+            processor_kwargs: Dict = field(default_factory=dict)
+
+        test_cases: List[TestCase] = [
+            TestCase(
+                name="Fast and successful job",
+                description="Dropped without keep-rate",
+                fail=False,
+                expected_decision=None,
+            ),
+            TestCase(
+                name="Failed job",
+                description="Kept because one of its spans failed",
+                fail=True,
+                expected_decision=sampling.TailSamplingDecision.ERROR,
+            ),
+            TestCase(
+                name="Slow job by function",
+                description="Kept because it exceeds the function threshold",
+                fail=False,
+                expected_decision=sampling.TailSamplingDecision.SLOW,
+                processor_kwargs={
+                    "function_duration_thresholds": {"tasks.f": 0},
+                    "default_duration_threshold": 60,
+                },
+            ),
+            TestCase(
+                name="Baseline",
+                description="Kept by baseline keep-rate",
+                fail=False,
+                expected_decision=sampling.TailSamplingDecision.BASELINE,
+                processor_kwargs={"keep_rate": 1.0},
+            ),
+        ]
+
+        for test_case in test_cases:
+            tracer = self.create_tracer(**test_case.processor_kwargs)
+            self.consume(tracer, fail=test_case.fail)
+            spans = self.exporter.get_finished_spans()
+
+            if test_case.expected_decision is None:
+                self.assertEqual(
+                    len(spans),
+                    0,
+                    msg="Failed test case ({}), expected job dropped".format(
+                        test_case.name
+                    ),
+                )
+                continue
+
+            self.assertEqual(
+                [span.name for span in spans],
+                ["perform queue", "consume queue"],
+                msg="Failed test case ({}), expected all spans kept".format(
+                    test_case.name
+                ),
+            )
+            self.assertEqual(
+                spans[1].attributes[rq_attributes.SAMPLING_DECISION],
+                test_case.expected_decision,
+                msg="Failed test case ({}), expected decision {}".format(
+                    test_case.name, test_case.expected_decision
+                ),
+            )
+
+    def test_span_outside_job(self):
+        """Spans outside of a `consume` trace are not buffered"""
+        tracer = self.create_tracer()
+        with tracer.start_as_current_span("publish queue"):
+            pass
+
+        self.assertEqual(len(self.exporter.get_finished_spans()), 1)
+
+    def test_bounded_memory(self):
+        """The oldest in-flight job is decided when the buffer is full"""
+        tracer = self.create_tracer(max_buffered_jobs=1, max_spans_per_job=1)
+
+        first = tracer.start_span(
+            "consume first", kind=trace.SpanKind.CONSUMER, attributes=CONSUME
+        )
+        first_context = trace.set_span_in_context(first)
+        failed = tracer.start_span("perform first", context=first_context)
+        failed.set_status(trace.Status(trace.StatusCode.ERROR))
+        failed.end()
+        tracer.start_span("perform first again", context=first_context).end()
+
+        # Second job evicts the first one, which is kept due to error
+        self.consume(tracer)
+        first.end()
+
+        self.assertEqual(
+            [span.name for span in self.exporter.get_finished_spans()],
+            ["perform first", "consume first"],
+        )
+        self.assertEqual(
+            self.exporter.get_finished_spans()[1].attributes[
+                rq_attributes.SAMPLING_DECISION
+            ],
+            sampling.TailSamplingDecision.ERROR,
+        )
+
+    def test_dropped_spans(self):
+        """Spans beyond `max_spans_per_job` are counted on the `consume` span"""
+        tracer = self.create_tracer(keep_rate=1.0, max_spans_per_job=1)
+        with self.assertLogs(sampling.__name__, level="WARNING"):
+            with tracer.start_as_current_span(
+                "consume queue", kind=trace.SpanKind.CONSUMER, attributes=CONSUME
+            ):
+                for index in range(3):
+                    tracer.start_span(f"perform {index}").end()
+
+        spans = self.exporter.get_finished_spans()
+        self.assertEqual([span.name for span in spans], ["perform 0", "consume queue"])
+        self.assertEqual(spans[1].attributes[rq_attributes.SAMPLING_DROPPED_SPANS], 2)
+
+    def test_other_consumer_span(self):
+        """Consumer spans other than `consume` do not end the job"""
+        tracer = self.create_tracer()
+        with tracer.start_as_current_span(
+            "consume queue", kind=trace.SpanKind.CONSUMER, attributes=CONSUME
+        ) as consume_span:
+            tracer.start_span(
+                "horse_killed queue",
+                kind=trace.SpanKind.CONSUMER,
+                attributes={
+                    messaging_attributes.MESSAGING_OPERATION_NAME: "horse_killed"
+                },
+            ).end()
+            # Still buffered, the job is not decided yet
+            self.assertEqual(len(self.exporter.get_finished_spans()), 0)
+            consume_span.set_status(trace.Status(trace.StatusCode.ERROR))
+
+        self.assertEqual(
+            [span.name for span in self.exporter.get_finished_spans()],
+            ["horse_killed queue", "consume queue"],
+        )
+
+
+class TestRateLimitingSampler(TestBase):
+    """Unit test cases for `RateLimitingSampler`"""
+
+    def sample(
+        self, sampler: sampling.RateLimitingSampler, attributes: Dict, times: int
+    ) -> int:
+        """Count sampled spans out of `times` attempts"""
+        results = [
+            sampler.should_sample(
+                parent_context=None, trace_id=1, name="publish", attributes=attributes
+            )
+            for _ in range(times)
+        ]
+        return len([r for r in results if r.decision.is_sampled()])
+
+    def test_should_sample(self):
+        """Test rate limit by queue and function"""
+
+        @dataclass
+        class TestCase:
+            name: str
+            description: str
+            attributes: Dict
+            expected_sampled: int
+
+        test_cases: List[TestCase] = [
+            TestCase(
+                name="Default rate",
+                description="Burst of default rate is sampled, the rest dropped",
+                attributes={
+                    messaging_attributes.MESSAGING_DESTINATION_NAME: "noisy",
+                    rq_attributes.JOB_FUNCTION: "tasks.f",
+                },
+                expected_sampled=10,
+            ),
+            TestCase(
+                name="Queue rate",
+                description="Queue specific rate is preferred over default rate",
+                attributes={
+                    messaging_attributes.MESSAGING_DESTINATION_NAME: "rare",
+                    rq_attributes.JOB_FUNCTION: "tasks.f",
+                },
+                expected_sampled=100,
+            ),
+            TestCase(
+                name="Function rate",
+                description="Function specific rate is preferred over queue rate",
+                attributes={
+                    messaging_attributes.MESSAGING_DESTINATION_NAME: "rare",
+                    rq_attributes.JOB_FUNCTION: "tasks.disabled",
+                },
+                expected_sampled=0,
+            ),
+            TestCase(
+                name="Not a rq span",
+                description="Spans without rq attributes are handled by fallback",
+                attributes={},
+                expected_sampled=100,
+            ),
+        ]
+
+        for test_case in test_cases:
+            sampler = sampling.RateLimitingSampler(
+                spans_per_second=10,
+                queue_rates={"rare": 1000},
+                function_rates={"tasks.disabled": 0},
+            )
+            actual_sampled = self.sample(sampler, test_case.attributes, 100)
+
+            self.assertEqual(
+                test_case.expected_sampled,
+                actual_sampled,
+                msg="Failed test case ({}), expected: {}, actual: {}".format(
+                    test_case.name, test_case.expected_sampled, actual_sampled
+                ),
+            )
+
+    def test_max_buckets(self):
+        """The least recently used bucket is dropped beyond `max_buckets`"""
+        sampler = sampling.RateLimitingSampler(spans_per_second=1, max_buckets=2)
+
+        def attributes(queue_name: str) -> Dict:
+            return {messaging_attributes.MESSAGING_DESTINATION_NAME: queue_name}
+
+        self.assertEqual(1, self.sample(sampler, attributes("a"), 2))
+        self.assertEqual(1, self.sample(sampler, attributes("b"), 2))
+        self.assertEqual(0, self.sample(sampler, attributes("a"), 1))
+        self.assertEqual(1, self.sample(sampler, attributes("c"), 2))
+
+        self.assertEqual(2, len(sampler._buckets))
+        # Bucket of "b" was dropped and starts full, the one of "a" was kept
+        self.assertEqual(1, self.sample(sampler, attributes("b"), 1))
+        self.assertEqual(0, self.sample(sampler, attributes("c"), 1))
@@ -0,0 +1,107 @@
+"""Unit tests for opentelemetry_instrumentation_rq/serialization.py"""
+
+import threading
+
+import fakeredis
+from opentelemetry import trace
+from opentelemetry.test.test_base import TestBase
+from rq.job import Job
+from rq.queue import Queue
+from rq.serializers import DefaultSerializer
+from rq.worker import Worker
+
+from opentelemetry_instrumentation_rq import RQInstrumentor, rq_attributes, rq_metrics
+from tests import tasks
+
+
+class TestSerializerCost(TestBase):
+    """Unit test cases for `SerializationHook` and `DeserializationHook`"""
+
+    def setUp(self):
+        """Setup before testing
+        - Setup tracer from opentelemetry.test.test_base.TestBase
+        - Setup fake redis connection to mockup redis for rq
+        - Instrument rq with serializer timing
+        """
+        super().setUp()
+        RQInstrumentor().instrument(serializer_timing=True)
+
+        self.fakeredis = fakeredis.FakeRedis()
+        self.queue = Queue(name="queue_name", connection=self.fakeredis)
+        self.worker = Worker(
+            queues=[self.queue], name="worker_name", connection=self.fakeredis
+        )
+
+    def tearDown(self):
+        """Teardown after testing
+        - Uninstrument rq
+        - Teardown tracer from opentelemetry.test.test_base.TestBase
+        """
+        RQInstrumentor().uninstrument()
+        self.fakeredis.close()
+        super().tearDown()
+
+    def test_publish_and_consume(self):
+        """Serializer cost is reported on both sides"""
+        job = Job.create(
+            func=tasks.task_normal,
+            args=("x" * 1000,),
+            id="job_id",
+            connection=self.fakeredis,
+        )
+        self.queue._enqueue_job(job)
+        self.assertIs(job.serializer, DefaultSerializer)
+
+        publish_span = self.get_finished_spans().by_name("publish queue_name")
+        self.assertGreater(
+            publish_span.attributes[rq_attributes.SERIALIZER_DUMPS_SIZE], 1000
+        )
+        self.assertIn(rq_attributes.SERIALIZER_DUMPS_DURATION, publish_span.attributes)
+
+        fetched_job = Job.fetch("job_id", connection=self.fakeredis)
+        self.worker.perform_job(fetched_job, self.queue)
+
+        consume_span = self.get_finished_spans().by_name("consume queue_name")
+        self.assertEqual(
+            consume_span.attributes[rq_attributes.SERIALIZER_LOADS_SIZE],
+            len(fetched_job.data),
+        )
+        self.assertIn(rq_attributes.SERIALIZER_LOADS_DURATION, consume_span.attributes)
+
+        metrics = {metric.name: metric for metric in self.get_sorted_metrics()}
+        operations = {
+            point.attributes[rq_attributes.SERIALIZER_OPERATION]
+            for point in metrics[rq_metrics.SERIALIZER_DURATION].data.data_points
+        }
+        self.assertEqual(operations, {"dumps", "loads"})
+
+    def test_publish_failure(self):
+        """A failing serializer is restored and reports no cost"""
+        job = Job.create(
+            func=tasks.task_normal,
+            args=(threading.Lock(),),
+            id="job_id",
+            connection=self.fakeredis,
+        )
+        with self.assertRaises(TypeError):
+            self.queue._enqueue_job(job)
+        self.assertIs(job.serializer, DefaultSerializer)
+
+        publish_span = self.get_finished_spans().by_name("publish queue_name")
+        self.assertEqual(publish_span.status.status_code, trace.StatusCode.ERROR)
+        self.assertNotIn(rq_attributes.SERIALIZER_DUMPS_SIZE, publish_span.attributes)
+
+        metrics = {metric.name: metric for metric in self.get_sorted_metrics()}
+        self.assertNotIn(rq_metrics.SERIALIZER_DURATION, metrics)
+
+    def test_consume_failed_job(self):
+        """Deserialization is reported on the `consume` span of a failed job"""
+        self.queue.enqueue(tasks.task_exception, job_id="job_id")
+        job = Job.fetch("job_id", connection=self.fakeredis)
+        self.worker.perform_job(job, self.queue)
+
+        consume_span = self.get_finished_spans().by_name("consume queue_name")
+        self.assertEqual(
+            consume_span.attributes[rq_attributes.SERIALIZER_LOADS_SIZE],
+            len(job.data),
+        )
@@ -0,0 +1,180 @@
+"""Unit tests for opentelemetry_instrumentation_rq/worker_pool.py"""
+
+import time
+from multiprocessing import Process
+from unittest import mock
+
+import fakeredis
+from opentelemetry import trace
+from opentelemetry.sdk.trace.export import SpanExportResult
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.test.test_base import TestBase
+from rq.worker_pool import WorkerPool
+
+from opentelemetry_instrumentation_rq import RQInstrumentor, rq_attributes, rq_metrics
+from opentelemetry_instrumentation_rq.worker_pool import (
+    PoolSpanExporter,
+    WorkerPoolInstrumentation,
+    from_portable_span,
+    to_portable_span,
+)
+
+
+class TestWorkerPoolInstrumentation(TestBase):
+    """Unit test cases for `WorkerPoolInstrumentation`"""
+
+    def setUp(self):
+        """Setup before testing
+        - Setup tracer from opentelemetry.test.test_base.TestBase
+        - Setup fake redis connection to mockup redis for rq
+        - Instrument rq
+        """
+        super().setUp()
+        RQInstrumentor().instrument()
+
+        self.fakeredis = fakeredis.FakeRedis()
+        self.pool = WorkerPool(["queue_name"], connection=self.fakeredis)
+
+    def tearDown(self):
+        """Teardown after testing
+        - Uninstrument rq
+        - Teardown tracer from opentelemetry.test.test_base.TestBase
+        """
+        RQInstrumentor().uninstrument()
+        self.fakeredis.close()
+        super().tearDown()
+
+    def test_worker_lifecycle(self):
+        """Test spans and metrics for worker start, death and restart"""
+        with mock.patch.object(
+            self.pool,
+            "get_worker_process",
+            side_effect=lambda *args, **kwargs: Process(target=time.sleep, args=(0,)),
+        ):
+            self.pool.start_worker()
+            for worker_data in self.pool.worker_dict.values():
+                worker_data.process.join()
+            self.pool.check_workers(respawn=True)
+
+        spans = self.get_finished_spans()
+        self.assertEqual(
+            [span.name for span in spans],
+            ["start_worker", "handle_dead_worker", "start_worker"],
+        )
+        self.assertFalse(spans[0].attributes[rq_attributes.WORKER_POOL_RESTART])
+        self.assertEqual(
+            spans[1].attributes[rq_attributes.WORKER_NAME],
+            spans[0].attributes[rq_attributes.WORKER_NAME],
+        )
+        self.assertEqual(spans[1].attributes["process.exit.code"], 0)
+        self.assertTrue(spans[2].attributes[rq_attributes.WORKER_POOL_RESTART])
+
+        metrics = {metric.name: metric for metric in self.get_sorted_metrics()}
+        starts = metrics[rq_metrics.WORKER_POOL_WORKER_STARTS].data.data_points
+        self.assertEqual(sum(point.value for point in starts), 2)
+        deaths = metrics[rq_metrics.WORKER_POOL_WORKER_DEATHS].data.data_points
+        self.assertEqual(sum(point.value for point in deaths), 1)
+
+        for worker_data in self.pool.worker_dict.values():
+            worker_data.process.join()
+
+    def test_utilization(self):
+        """Busy workers are read from worker state in Redis"""
+        with mock.patch.object(
+            self.pool,
+            "get_worker_process",
+            side_effect=lambda *args, **kwargs: Process(target=time.sleep, args=(0,)),
+        ):
+            self.pool.num_workers = 2
+            self.pool.start_workers()
+
+        busy_worker_name = next(iter(self.pool.worker_dict))
+        self.fakeredis.hset(f"rq:worker:{busy_worker_name}", "state", "busy")
+
+        with mock.patch.object(
+            WorkerPoolInstrumentation,
+            "count_busy_workers",
+            autospec=True,
+            side_effect=WorkerPoolInstrumentation.count_busy_workers,
+        ) as count_busy_workers:
+            metrics = {metric.name: metric for metric in self.get_sorted_metrics()}
+        busy_workers = metrics[rq_metrics.WORKER_POOL_BUSY_WORKERS].data.data_points
+        utilization = metrics[rq_metrics.WORKER_POOL_UTILIZATION].data.data_points
+        self.assertEqual([point.value for point in busy_workers], [1])
+        self.assertEqual([point.value for point in utilization], [0.5])
+        # One read of Redis for both gauges
+        count_busy_workers.assert_called_once()
+
+        for worker_data in self.pool.worker_dict.values():
+            worker_data.process.join()
+
+
+class TestPoolSpanExporter(TestBase):
+    """Unit test cases for `PoolSpanExporter`"""
+
+    def test_portable_span(self):
+        """Portable copies rebuild the same span"""
+        tracer = trace.get_tracer(__name__)
+        with tracer.start_as_current_span("parent"):
+            with tracer.start_as_current_span(
+                "child", attributes={"key": "value"}
+            ) as span:
+                span.add_event("event", {"count": 1})
+                span.set_status(trace.Status(trace.StatusCode.ERROR, "failed"))
+        child = self.get_finished_spans().by_name("child")
+
+        rebuilt = from_portable_span(to_portable_span(child))
+        self.assertEqual(rebuilt.to_json(), child.to_json())
+
+    def test_forward_from_worker(self):
+        """Spans exported by worker processes are exported by the manager"""
+        tracer = trace.get_tracer(__name__)
+        with tracer.start_as_current_span("job"):
+            pass
+        span = self.get_finished_spans()[0]
+
+        downstream = InMemorySpanExporter()
+        exporter = PoolSpanExporter(downstream)
+        exporter.export([span])
+        self.assertEqual(len(downstream.get_finished_spans()), 1)
+
+        def export_in_worker():
+            exporter.export([span])
+
+        worker = Process(target=export_in_worker)
+        worker.start()
+        worker.join()
+        exporter.shutdown()
+
+        self.assertEqual(
+            [exported.to_json() for exported in downstream.get_finished_spans()],
+            [span.to_json(), span.to_json()],
+        )
+
+    def test_export_failure(self):
+        """A failed export does not stop the manager from receiving spans"""
+        tracer = trace.get_tracer(__name__)
+        with tracer.start_as_current_span("job"):
+            pass
+        span = self.get_finished_spans()[0]
+
+        downstream = InMemorySpanExporter()
+        exporter = PoolSpanExporter(downstream)
+
+        def export_in_worker():
+            exporter.export([span])
+            exporter.export([span])
+
+        with mock.patch.object(
+            downstream,
+            "export",
+            side_effect=[Exception("Unexpected error"), SpanExportResult.SUCCESS],
+        ) as export, self.assertLogs(
+            "opentelemetry_instrumentation_rq.worker_pool", "ERROR"
+        ):
+            worker = Process(target=export_in_worker)
+            worker.start()
+            worker.join()
+            exporter.shutdown()
+
+        self.assertEqual(export.call_count, 2)